@@ -0,0 +1,32 @@
+"""
+Times bucketed aggregation and LTTB downsampling of a long 1 Hz numeric series.
+Requires numpy.
+
+Usage: python benchmarks/aggregate.py [points]
+"""
+import sys
+import time
+
+import numpy as np
+
+from homeassistant_api.series import aggregate, lttb
+
+
+def main(points: int = 1_000_000) -> None:
+    """Times each reduction and prints a summary table."""
+    timestamps = np.arange(points, dtype=float)
+    values = np.sin(timestamps / 3600) + np.random.default_rng(0).random(points)
+    values[::100] = np.nan  # Some unavailable states.
+    print(f"{'reduction':<22}{'ms':>10}{'output':>10}")
+    for name, reduce in (
+        ("aggregate 1 minute", lambda: aggregate(timestamps, values, 60)["time"]),
+        ("aggregate 1 hour", lambda: aggregate(timestamps, values, 3600)["time"]),
+        ("lttb 1000 points", lambda: lttb(timestamps, values, 1000)[0]),
+    ):
+        started = time.perf_counter()
+        output = reduce()
+        print(f"{name:<22}{(time.perf_counter() - started) * 1e3:>10.1f}{len(output):>10}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
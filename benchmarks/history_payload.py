@@ -0,0 +1,109 @@
+"""
+Compares :code:`get_entity_histories` with and without :code:`minimal_response` and :code:`no_attributes`.
+Traffic is replayed from a generated recording shaped like Home Assistant's responses,
+so the times are client-side parse cost only and the bytes column is what would have crossed the network.
+
+Usage: python benchmarks/history_payload.py [entities] [states_per_entity]
+"""
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+from homeassistant_api import Client, Recorder, ReplaySession
+
+API_URL = "http://replay.invalid/api"
+START = datetime(2023, 3, 11, tzinfo=timezone.utc)
+ROUNDS = 5
+MODES = (
+    ("full", False, False),
+    ("no_attributes", False, True),
+    ("minimal", True, False),
+    ("minimal+no_attr", True, True),
+)
+
+
+def history(entity: int, states: int, minimal: bool, no_attributes: bool) -> list:
+    """Builds the states of one entity the way the history endpoint sends them."""
+    attributes = {
+        "unit_of_measurement": "W",
+        "device_class": "power",
+        "state_class": "measurement",
+        "friendly_name": f"Sensor {entity}",
+    }
+    rows = []
+    for i in range(states):
+        changed = (START + timedelta(seconds=i * 30)).isoformat()
+        if minimal and 0 < i < states - 1:
+            rows.append({"state": str(i % 100), "last_changed": changed})
+            continue
+        rows.append(
+            {
+                "entity_id": f"sensor.sensor_{entity}",
+                "state": str(i % 100),
+                "attributes": {} if no_attributes else attributes,
+                "last_changed": changed,
+                "last_updated": changed,
+            }
+        )
+    return rows
+
+
+def record(path: str, entities: int, states: int) -> dict:
+    """Writes one recorded response per mode and returns their sizes."""
+    recorder = Recorder(path)
+    sizes = {}
+    for mode, minimal, no_attributes in MODES:
+        query = "filter_entity_id=" + ",".join(
+            f"sensor.sensor_{entity}" for entity in range(entities)
+        )
+        if minimal:
+            query += "&minimal_response"
+        if no_attributes:
+            query += "&no_attributes"
+        body = json.dumps(
+            [history(entity, states, minimal, no_attributes) for entity in range(entities)]
+        ).encode()
+        sizes[mode] = len(body)
+        recorder.record(
+            "GET",
+            f"{API_URL}/history/period/{quote(START.isoformat())}?{query}",
+            status=200,
+            headers={"Content-Type": "application/json"},
+            body=body,
+            elapsed=0.0,
+        )
+    recorder.close()
+    return sizes
+
+
+def main(entities: int = 20, states: int = 2000) -> None:
+    """Times every mode and prints a summary table."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "history.jsonl")
+        sizes = record(path, entities, states)
+        client = Client(API_URL, "token", cache_session=ReplaySession(path, loop=True))
+        sensors = client.prepare_entities(
+            [{"entity_id": f"sensor.sensor_{entity}", "state": "0"} for entity in range(entities)]
+        )["sensor"]
+        selected = tuple(sensors.entities[f"sensor_{entity}"] for entity in range(entities))
+        print(f"{'mode':<18}{'ms/request':>12}{'bytes':>12}")
+        for mode, minimal, no_attributes in MODES:
+            started = time.perf_counter()
+            for _ in range(ROUNDS):
+                for _history in client.get_entity_histories(
+                    selected,
+                    start_timestamp=START,
+                    minimal_response=minimal,
+                    no_attributes=no_attributes,
+                ):
+                    pass
+            per_request = (time.perf_counter() - started) / ROUNDS * 1e3
+            print(f"{mode:<18}{per_request:>12.1f}{sizes[mode]:>12}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,87 @@
+"""
+Measures the startup cost of the library with :code:`python -X importtime`
+and fails when a scenario goes over its budget.
+
+Usage: python benchmarks/import_time.py [budget_scale]
+"""
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+SCENARIOS: Dict[str, str] = {
+    "import": "import homeassistant_api",
+    "sync": (
+        "from homeassistant_api import Client\n"
+        "Client('http://localhost:8123/api', 'token')"
+    ),
+    "sync (no cache)": (
+        "from homeassistant_api import Client\n"
+        "Client('http://localhost:8123/api', 'token', cache_session=False)"
+    ),
+    "async": (
+        "import asyncio\n"
+        "from homeassistant_api import Client\n"
+        "async def main():\n"
+        "    Client('http://localhost:8123/api', 'token', use_async=True)\n"
+        "asyncio.run(main())"
+    ),
+}
+# Budgets in milliseconds, multiplied by the optional command line argument.
+BUDGETS: Dict[str, float] = {
+    "import": 150,
+    "sync": 350,
+    "sync (no cache)": 300,
+    "async": 500,
+}
+RUNS = 5
+
+
+def import_times(code: str) -> List[Tuple[str, int]]:
+    """Returns the top level imports of running :code:`code` with their cumulative time in us."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # Nested imports are indented further.
+            times.append((name.strip(), int(cumulative)))
+    return times
+
+
+def measure(code: str, baseline: set) -> Tuple[float, List[str]]:
+    """Returns the best import time in ms of running :code:`code` and the modules it loaded."""
+    best = float("inf")
+    modules: List[str] = []
+    for _ in range(RUNS):
+        times = [(name, us) for name, us in import_times(code) if name not in baseline]
+        total = sum(us for _, us in times) / 1000
+        if total < best:
+            best = total
+            modules = [name for name, _ in sorted(times, key=lambda t: -t[1])]
+    return best, modules
+
+
+def main(scale: float = 1.0) -> int:
+    """Runs every scenario and returns the number of scenarios over budget."""
+    baseline = {name for name, _ in import_times("pass")}
+    failures = 0
+    print(f"{'scenario':<20}{'ms':>10}{'budget':>10}  top level imports")
+    for scenario, code in SCENARIOS.items():
+        elapsed, modules = measure(code, baseline)
+        budget = BUDGETS[scenario] * scale
+        failures += elapsed > budget
+        print(
+            f"{scenario:<20}{elapsed:>10.1f}{budget:>10.0f}  "
+            f"{', '.join(modules[:6])}{' OVER BUDGET' if elapsed > budget else ''}"
+        )
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(float(arg) for arg in sys.argv[1:2])))
@@ -0,0 +1,67 @@
+"""
+Replays a recording made with :code:`Client(..., record_to=...)` as fast as possible
+and reports how long response processing and model parsing take per endpoint.
+
+Usage: python benchmarks/replay.py traffic.jsonl.gz [repeat]
+"""
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+from homeassistant_api import Client, History, LogbookEntry, ReplaySession, State
+from homeassistant_api.models import Domain
+
+API_URL = "http://replay.invalid/api"
+
+
+def parse_models(client: Client, path: str, data: Any) -> Any:
+    """Builds the models the client methods would build for an endpoint."""
+    parsers: Dict[str, Callable[[Any], Any]] = {
+        "states": lambda data: [State.from_json(state) for state in data],
+        "history/period": lambda data: [History.model_validate({"states": s}) for s in data],
+        "logbook": lambda data: [LogbookEntry.model_validate(entry) for entry in data],
+        "services": lambda data: [Domain.from_json(d, client=client) for d in data],
+    }
+    for prefix, parser in parsers.items():
+        if path == prefix or path.startswith(prefix + "/"):
+            if isinstance(data, list):
+                return parser(data)
+    return data
+
+
+def main(path: str, repeat: int = 5) -> None:
+    """Runs the replay benchmark and prints a summary table."""
+    session = ReplaySession(path, loop=True)
+    client = Client(API_URL, "token", cache_session=session)
+    timings: Dict[str, List[float]] = defaultdict(list)
+    sizes: Dict[str, int] = defaultdict(int)
+    for _ in range(repeat):
+        session.recording.rewind()
+        for exchange in session.recording:
+            endpoint = exchange.url.split("/api/", 1)[-1]
+            started = time.perf_counter()
+            data = client.request(
+                endpoint,
+                method=exchange.method,
+                params=exchange.query or None,
+                data=exchange.request_body or None,
+            )
+            parse_models(client, endpoint, data)
+            name = f"{exchange.method} {endpoint.split('/')[0] or '/'}"
+            timings[name].append(time.perf_counter() - started)
+            sizes[name] += len(exchange.body)
+    print(f"{'endpoint':<24}{'calls':>8}{'mean ms':>12}{'p95 ms':>12}{'MB':>10}")
+    for name, values in sorted(timings.items()):
+        values.sort()
+        print(
+            f"{name:<24}{len(values):>8}"
+            f"{statistics.mean(values) * 1000:>12.3f}"
+            f"{values[min(len(values) - 1, int(len(values) * 0.95))] * 1000:>12.3f}"
+            f"{sizes[name] / 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], *(int(arg) for arg in sys.argv[2:3]))
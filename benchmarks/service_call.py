@@ -0,0 +1,44 @@
+"""
+Measures the overhead of calling a :py:class:`Service` (:code:`domain.service(...)`)
+as the number of live objects on the heap grows. The request itself is stubbed out.
+
+Usage: python benchmarks/service_call.py
+"""
+import gc
+import time
+from typing import Any, List
+
+from homeassistant_api import Client
+from homeassistant_api.models import Domain
+
+CALLS = 10_000
+HEAP_SIZES = (0, 100_000, 1_000_000, 5_000_000)
+
+
+class StubClient(Client):
+    """A client whose service calls never leave the process."""
+
+    def trigger_service(self, domain: str, service: str, **service_data) -> Any:
+        return ()
+
+
+def main() -> None:
+    """Times service calls against increasingly large heaps."""
+    client = StubClient("http://localhost:8123/api", "token", cache_session=False)
+    light = Domain.from_json(
+        {"domain": "light", "services": {"toggle": {"name": "Toggle"}}},
+        client=client,
+    )
+    heap: List[Any] = []
+    print(f"{'heap objects':>14}{'tracked objects':>18}{'us/call':>10}")
+    for size in HEAP_SIZES:
+        heap.extend([i] for i in range(size - len(heap)))  # Lists are gc tracked.
+        started = time.perf_counter()
+        for _ in range(CALLS):
+            light.toggle(entity_id="light.kitchen")
+        per_call = (time.perf_counter() - started) / CALLS * 1e6
+        print(f"{size:>14}{len(gc.get_objects()):>18}{per_call:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
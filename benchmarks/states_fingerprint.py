@@ -0,0 +1,84 @@
+"""
+Compares polling :code:`GET /api/states` with polling through the :code:`states_fingerprint` freshness check
+on a quiet installation, where the fingerprint never changes.
+Traffic is replayed from a generated recording, so the times are client-side cost only
+and the bytes column is what would have crossed the network.
+
+Usage: python benchmarks/states_fingerprint.py [entities]
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from homeassistant_api import Client, Recorder, ReplaySession
+from homeassistant_api.freshness import FINGERPRINT_TEMPLATE
+
+API_URL = "http://replay.invalid/api"
+POLLS = 200
+
+
+def record(path: str, entities: int) -> int:
+    """Writes a recording with one large states response and one fingerprint response."""
+    states = [
+        {
+            "entity_id": f"sensor.sensor_{i}",
+            "state": str(i),
+            "attributes": {"friendly_name": f"Sensor {i}", "unit_of_measurement": "W"},
+            "last_changed": "2023-03-11T22:41:05.123456+00:00",
+            "last_updated": "2023-03-11T22:41:05.123456+00:00",
+            "context": {"id": f"01GV9{i:021d}"},
+        }
+        for i in range(entities)
+    ]
+    body = json.dumps(states).encode()
+    recorder = Recorder(path)
+    recorder.record(
+        "GET",
+        f"{API_URL}/states",
+        status=200,
+        headers={"Content-Type": "application/json"},
+        body=body,
+        elapsed=0.0,
+    )
+    recorder.record(
+        "POST",
+        f"{API_URL}/template",
+        status=200,
+        headers={"Content-Type": "text/plain"},
+        body=f"{entities}|2023-03-11 22:41:05.123456+00:00".encode(),
+        elapsed=0.0,
+        request_body={"template": FINGERPRINT_TEMPLATE},
+    )
+    recorder.close()
+    return len(body)
+
+
+def main(entities: int = 2000) -> None:
+    """Times both ways of polling and prints a summary table."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / "states.jsonl")
+        states_bytes = record(path, entities)
+        fingerprint_bytes = len(f"{entities}|2023-03-11 22:41:05.123456+00:00")
+        print(f"{'mode':<14}{'ms/poll':>10}{'bytes/poll':>12}")
+        for mode, enabled, size in (
+            ("full", False, states_bytes),
+            ("fingerprint", True, fingerprint_bytes),
+        ):
+            client = Client(
+                API_URL,
+                "token",
+                cache_session=ReplaySession(path, loop=True),
+                states_fingerprint=enabled,
+            )
+            client.poll_changes()  # The first poll always downloads all states.
+            started = time.perf_counter()
+            for _ in range(POLLS):
+                client.poll_changes()
+            per_poll = (time.perf_counter() - started) / POLLS * 1e3
+            print(f"{mode:<14}{per_poll:>10.3f}{size:>12}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -1,5 +1,6 @@
 """Interact with your Homeassistant Instance remotely."""
-
+import importlib
+from typing import Any
 
 __all__ = (
     "Client",
@@ -11,7 +12,25 @@ __all__ = (
     "Entity",
     "Domain",
     "Processing",
+    "align_histories",
+    "merge_timeline",
     "LogbookEntry",
+    "EntityIndex",
+    "AreaIndex",
+    "DeviceIndex",
+    "ChangeTracker",
+    "StateChanges",
+    "ServiceRegistry",
+    "MetadataSnapshot",
+    "PollScheduler",
+    "RenderedTemplates",
+    "TemplateCache",
+    "LogbookCache",
+    "ResponseCache",
+    "Recorder",
+    "Recording",
+    "ReplaySession",
+    "AsyncReplaySession",
     "APIConfigurationError",
     "EndpointNotFoundError",
     "HomeassistantAPIError",
@@ -19,6 +38,7 @@ __all__ = (
     "MalformedInputError",
     "MethodNotAllowedError",
     "ParameterMissingError",
+    "ReplayMissError",
     "RequestError",
     "UnauthorizedError",
 )
@@ -32,16 +52,40 @@ from .errors import (
     MalformedInputError,
     MethodNotAllowedError,
     ParameterMissingError,
+    ReplayMissError,
     RequestError,
     UnauthorizedError,
 )
 from .models import Domain, Entity, Event, Group, History, LogbookEntry, Service, State
 from .processing import Processing
 
-Domain.model_rebuild()
-Entity.model_rebuild()
-Event.model_rebuild()
-Group.model_rebuild()
-History.model_rebuild()
-Service.model_rebuild()
-State.model_rebuild()
+# Names that pull in an http library, or that a client only needs once a feature is used,
+# are only imported when first accessed.
+_LAZY_IMPORTS = {
+    "AreaIndex": ".areas",
+    "DeviceIndex": ".areas",
+    "ChangeTracker": ".changes",
+    "StateChanges": ".changes",
+    "EntityIndex": ".index",
+    "LogbookCache": ".logbook",
+    "MetadataSnapshot": ".metadata",
+    "ServiceRegistry": ".registry",
+    "ResponseCache": ".responsecache",
+    "PollScheduler": ".scheduler",
+    "align_histories": ".series",
+    "merge_timeline": ".timeline",
+    "RenderedTemplates": ".templates",
+    "TemplateCache": ".templates",
+    "Recorder": ".recording",
+    "Recording": ".recording",
+    "ReplaySession": ".recording",
+    "AsyncReplaySession": ".recording",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
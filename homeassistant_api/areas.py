@@ -0,0 +1,205 @@
+"""Module for indexing entities by the area and device they belong to."""
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from .errors import MalformedDataError
+from .models import Entity, Group
+
+# Renders {"areas": {area_id: [name, entity_ids, device_ids]}, "devices": {device_id: [name, area_id, entity_ids]}}.
+# Every device that has an entity or is assigned to an area is included.
+AREA_TEMPLATE = (
+    '{"areas": {'
+    "{%- for a in areas() -%}"
+    "{%- if not loop.first %},{% endif -%}"
+    "{{ a | to_json }}: {{ [area_name(a), area_entities(a), area_devices(a)] | to_json }}"
+    "{%- endfor -%}"
+    '}, "devices": {'
+    "{%- set ns = namespace(devices=[]) -%}"
+    "{%- for a in areas() -%}{%- set ns.devices = ns.devices + area_devices(a) -%}{%- endfor -%}"
+    "{%- for d in (states | map(attribute='entity_id') | map('device_id') | reject('none') | list"
+    " + ns.devices) | unique -%}"
+    "{%- if not loop.first %},{% endif -%}"
+    "{{ d | to_json }}: {{ [device_attr(d, 'name_by_user') or device_attr(d, 'name'), area_id(d),"
+    " device_entities(d)] | to_json }}"
+    "{%- endfor -%}"
+    "}}"
+)
+
+
+class Area(NamedTuple):
+    """An area of Home Assistant and the entities and devices in it."""
+
+    area_id: str
+    name: str
+    entity_ids: Tuple[str, ...]
+    device_ids: Tuple[str, ...]
+
+
+class Device(NamedTuple):
+    """A device of Home Assistant and its entities."""
+
+    device_id: str
+    name: Optional[str]
+    area_id: Optional[str]
+    entity_ids: Tuple[str, ...]
+
+
+def select_entities(
+    entities: Mapping[str, Group], entity_ids: Iterable[str]
+) -> List[Entity]:
+    """Looks up :code:`entity_ids` in the result of :py:meth:`Client.get_entities` without any requests."""
+    selected = []
+    for entity_id in entity_ids:
+        group_id, slug = entity_id.split(".", 1)
+        group = entities.get(group_id)
+        if group is not None and (entity := group.get_entity(slug)) is not None:
+            selected.append(entity)
+    return selected
+
+
+class DeviceIndex:
+    """Devices indexed by :code:`device_id`, with the device of each entity."""
+
+    def __init__(self, devices: Iterable[Device] = ()) -> None:
+        self.devices: Dict[str, Device] = {}
+        self._entity_devices: Dict[str, str] = {}
+        for device in devices:
+            self.devices[device.device_id] = device
+            for entity_id in device.entity_ids:
+                self._entity_devices[entity_id] = device.device_id
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {len(self.devices)} devices>"
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __contains__(self, device_id: object) -> bool:
+        return device_id in self.devices
+
+    def get(self, device_id: str) -> Optional[Device]:
+        """Returns a :py:class:`Device` by its id."""
+        return self.devices.get(device_id)
+
+    def device_of(self, entity_id: str) -> Optional[Device]:
+        """Returns the device an entity belongs to."""
+        device_id = self._entity_devices.get(entity_id)
+        return None if device_id is None else self.devices[device_id]
+
+    def entity_ids(self, device_id: str) -> Tuple[str, ...]:
+        """Returns the :code:`entity_id`'s of a device."""
+        device = self.devices.get(device_id)
+        return () if device is None else device.entity_ids
+
+    def entities(self, entities: Mapping[str, Group], device_id: str) -> List[Entity]:
+        """Returns the entities of a device from a :py:meth:`Client.get_entities` result."""
+        return select_entities(entities, self.entity_ids(device_id))
+
+
+class AreaIndex:
+    """
+    Areas and devices of Home Assistant, with the entities in each of them.
+    Everything is fetched with a single template render and cached for :code:`ttl` seconds.
+
+    :param ttl: Seconds until the index is fetched again. :code:`None` never expires it.
+    """
+
+    template = AREA_TEMPLATE
+    ttl: Optional[float]
+
+    def __init__(self, ttl: Optional[float] = 300) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.areas: Dict[str, Area] = {}
+        self.devices = DeviceIndex()
+        self._entity_areas: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+        self._updated_at: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {len(self.areas)} areas "
+            f"{len(self.devices)} devices>"
+        )
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def __contains__(self, area: object) -> bool:
+        return isinstance(area, str) and self._resolve(area) is not None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been fetched at least once."""
+        return self._updated_at is not None
+
+    @property
+    def stale(self) -> bool:
+        """Whether the index needs to be fetched from Home Assistant again."""
+        if self._updated_at is None:
+            return True
+        return self.ttl is not None and time.monotonic() - self._updated_at > self.ttl
+
+    def invalidate(self) -> None:
+        """Marks the index as stale so the next lookup fetches it again."""
+        self._updated_at = None
+
+    def update(self, rendered: str) -> "AreaIndex":
+        """Replaces the index with the output of :py:data:`AREA_TEMPLATE`."""
+        try:
+            data: Dict[str, Dict[str, Any]] = json.loads(rendered)
+            areas = [
+                Area(area_id, name, tuple(entity_ids), tuple(device_ids))
+                for area_id, (name, entity_ids, device_ids) in data["areas"].items()
+            ]
+            devices = [
+                Device(device_id, name, area_id, tuple(entity_ids))
+                for device_id, (name, area_id, entity_ids) in data["devices"].items()
+            ]
+        except (ValueError, KeyError, TypeError) as err:
+            raise MalformedDataError(
+                f"Area template rendered unexpected output: {rendered[:100]!r}"
+            ) from err
+        with self._lock:
+            self.areas = {area.area_id: area for area in areas}
+            self._names = {area.name.casefold(): area.area_id for area in areas}
+            self._entity_areas = {
+                entity_id: area.area_id
+                for area in areas
+                for entity_id in area.entity_ids
+            }
+            self.devices = DeviceIndex(devices)
+            self._updated_at = time.monotonic()
+        return self
+
+    def _resolve(self, area: str) -> Optional[Area]:
+        if area in self.areas:
+            return self.areas[area]
+        area_id = self._names.get(area.casefold())
+        return None if area_id is None else self.areas[area_id]
+
+    def get(self, area: str) -> Optional[Area]:
+        """Returns an :py:class:`Area` by its id or its name (case-insensitive)."""
+        return self._resolve(area)
+
+    def area_of(self, entity_id: str) -> Optional[Area]:
+        """Returns the area an entity is in, directly or through its device."""
+        area_id = self._entity_areas.get(entity_id)
+        return None if area_id is None else self.areas[area_id]
+
+    def entity_ids(self, area: str) -> Tuple[str, ...]:
+        """Returns the :code:`entity_id`'s in an area, given by its id or name."""
+        resolved = self._resolve(area)
+        return () if resolved is None else resolved.entity_ids
+
+    def entities(self, entities: Mapping[str, Group], area: str) -> List[Entity]:
+        """
+        Returns the entities in an area from a :py:meth:`Client.get_entities` result, without any requests.
+
+        .. code-block:: python
+
+            kitchen = client.get_area_index().entities(client.get_entities(), "Kitchen")
+        """
+        return select_entities(entities, self.entity_ids(area))
@@ -0,0 +1,80 @@
+"""
+Module for the size-bounded in-memory :code:`aiohttp_client_cache` backend, the default cache of :py:class:`RawAsyncClient`.
+See :py:class:`homeassistant_api.boundedstore.BoundedStore`.
+"""
+from __future__ import annotations
+
+import pickle
+from typing import Any, AsyncIterator, Optional
+
+import aiohttp_client_cache
+
+from .boundedstore import BoundedStore, CacheStats
+
+
+class AsyncBoundedStorage(aiohttp_client_cache.backends.base.BaseCache):
+    """An :code:`aiohttp_client_cache` storage that pickles responses into a :py:class:`BoundedStore`."""
+
+    def __init__(self, store: BoundedStore, **kwargs: Any) -> None:
+        super().__init__(serializer=pickle, **kwargs)
+        self.store = store
+
+    async def contains(self, key: str) -> bool:
+        return key in self.store
+
+    async def clear(self) -> None:
+        self.store.clear()
+
+    async def delete(self, key: str) -> None:
+        self.store.delete(key)
+
+    async def bulk_delete(self, keys: set) -> None:
+        for key in keys:
+            self.store.delete(key)
+
+    async def keys(self) -> AsyncIterator[str]:  # type: ignore[override]
+        for key in self.store:
+            yield key
+
+    async def read(self, key: str) -> Any:
+        return self.deserialize(self.store.get(key))  # type: ignore[arg-type]
+
+    async def size(self) -> int:
+        return len(self.store)
+
+    async def values(self) -> AsyncIterator[Any]:  # type: ignore[override]
+        for key in self.store:
+            value = self.store.peek(key)
+            if value is not None:
+                yield self.deserialize(value)  # type: ignore[arg-type]
+
+    async def write(self, key: str, item: Any) -> None:
+        value = self.serialize(item)
+        if value is not None:
+            self.store.set(key, value)
+
+
+class AsyncBoundedCache(aiohttp_client_cache.CacheBackend):  # type: ignore[misc,name-defined]
+    """
+    An :code:`aiohttp_client_cache` backend that keeps responses in memory up to :code:`max_bytes`,
+    the default of :py:class:`RawAsyncClient`. Takes the same arguments as :py:class:`BoundedCache`.
+    """
+
+    def __init__(
+        self,
+        cache_name: str = "bounded_async_cache",
+        max_bytes: int = 64 * 1024 * 1024,
+        *,
+        policy: str = "lru",
+        compression: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(cache_name=cache_name, **kwargs)
+        self.store = BoundedStore(max_bytes, policy=policy, compression=compression)
+        self.responses = AsyncBoundedStorage(self.store)
+        self.redirects = aiohttp_client_cache.backends.base.DictCache()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Returns the :py:class:`CacheStats` of the stored responses."""
+        return self.store.stats
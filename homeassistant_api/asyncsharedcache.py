@@ -0,0 +1,129 @@
+"""
+Module for the :code:`aiohttp_client_cache` equivalent of :py:class:`homeassistant_api.sharedcache.SharedCache`.
+See :py:class:`homeassistant_api.sharedstore.SharedStore`.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import warnings
+from typing import Any, AsyncIterator
+
+import aiohttp_client_cache
+
+from .sharedstore import SharedStore, _expired, _fresh
+
+
+class AsyncSharedStorage(aiohttp_client_cache.backends.base.BaseCache):
+    """
+    The :code:`aiohttp_client_cache` equivalent of :py:class:`SharedStorage`, waiting for locks without blocking the event loop.
+    Queries of the local database file are quick enough to run on the loop directly,
+    and taking a lock gives up after :code:`busy_timeout` seconds while another process writes to it.
+    """
+
+    def __init__(
+        self,
+        store: SharedStore,
+        table: str,
+        *,
+        single_flight: bool = False,
+        serve_stale: bool = False,
+        busy_timeout: float = 0.01,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.store = store
+        self.table = table
+        self.single_flight = single_flight
+        self.serve_stale = serve_stale
+        self.busy_timeout = busy_timeout
+
+    def _read(self, key: str) -> Any:
+        return self.deserialize(self.store.get(self.table, key))
+
+    async def read(self, key: str) -> Any:
+        value = self._read(key)
+        if self.single_flight and (value is None or _expired(value)):
+            deadline = time.time() + self.store.lock_timeout
+            while not self.store.acquire(key, self.busy_timeout):
+                if value is not None and self.serve_stale:
+                    return _fresh(value)
+                if time.time() >= deadline:
+                    break
+                await asyncio.sleep(self.store.poll_interval)
+                value = self._read(key)
+                if value is not None and not _expired(value):
+                    return value
+        return value
+
+    async def write(self, key: str, item: Any) -> None:
+        self.store.set(self.table, key, self.serialize(item))
+        if self.single_flight:
+            self.store.release(key)
+
+    async def contains(self, key: str) -> bool:
+        return self.store.get(self.table, key) is not None
+
+    async def clear(self) -> None:
+        self.store.clear(self.table)
+
+    async def close(self) -> None:
+        self.store.close()
+
+    async def delete(self, key: str) -> None:
+        self.store.delete(self.table, key)
+
+    async def bulk_delete(self, keys: set) -> None:
+        for key in keys:
+            self.store.delete(self.table, key)
+
+    async def keys(self) -> AsyncIterator[str]:  # type: ignore[override]
+        for key in self.store.keys(self.table):
+            yield key
+
+    async def size(self) -> int:
+        return self.store.count(self.table)
+
+    async def values(self) -> AsyncIterator[Any]:  # type: ignore[override]
+        for key in self.store.keys(self.table):
+            value = self._read(key)
+            if value is not None:
+                yield value
+
+
+class AsyncSharedCache(aiohttp_client_cache.CacheBackend):  # type: ignore[misc,name-defined]
+    """
+    The :code:`aiohttp_client_cache` equivalent of :py:class:`SharedCache`, used with :py:class:`AsyncSharedCachedSession`.
+    Sync and async clients can use the same file, their responses are kept in separate tables.
+    """
+
+    def __init__(
+        self,
+        path: str = "homeassistant_api_cache.sqlite",
+        *,
+        lock_timeout: float = 10.0,
+        serve_stale: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(cache_name=path, **kwargs)
+        self.store = SharedStore(path, lock_timeout=lock_timeout)
+        self.responses = AsyncSharedStorage(
+            self.store, "async_responses", single_flight=True, serve_stale=serve_stale
+        )
+        self.redirects = AsyncSharedStorage(self.store, "async_redirects")
+
+
+# aiohttp warns about every subclass of ClientSession, aiohttp_client_cache silences it the same way.
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    class AsyncSharedCachedSession(aiohttp_client_cache.CachedSession):  # type: ignore[misc,name-defined]
+        """The :code:`aiohttp_client_cache` equivalent of :py:class:`SharedCachedSession`."""
+
+        async def _request(self, method: str, str_or_url: Any, **kwargs: Any) -> Any:
+            try:
+                return await super()._request(method, str_or_url, **kwargs)
+            finally:
+                if isinstance(self.cache, AsyncSharedCache):
+                    # aiohttp follows redirects itself, so this task only holds the lock of this request.
+                    self.cache.store.release_owned()
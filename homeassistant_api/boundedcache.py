@@ -0,0 +1,70 @@
+"""
+Module for the size-bounded in-memory :code:`requests_cache` backend, the default cache of :py:class:`RawClient`.
+See :py:class:`homeassistant_api.boundedstore.BoundedStore`.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterator, Optional
+
+from requests_cache.backends.base import BaseCache, BaseStorage, DictStorage
+from requests_cache.serializers import pickle_serializer
+
+from .boundedstore import BoundedStore, CacheStats
+
+
+class BoundedStorage(BaseStorage):
+    """A :code:`requests_cache` storage that pickles responses into a :py:class:`BoundedStore`."""
+
+    def __init__(self, store: BoundedStore, **kwargs: Any) -> None:
+        super().__init__(serializer=pickle_serializer, **kwargs)
+        self.store = store
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.store.get(key)
+        if value is None:
+            raise KeyError(key)
+        return self.deserialize(key, value)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.store.set(key, self.serialize(value))
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self.store:
+            raise KeyError(key)
+        self.store.delete(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+class BoundedCache(BaseCache):
+    """
+    A :code:`requests_cache` backend that keeps responses in memory up to :code:`max_bytes`,
+    the default of :py:class:`RawClient`. Counters are available from :py:attr:`stats`.
+    Takes the arguments of :py:class:`BoundedStore`.
+    """
+
+    def __init__(
+        self,
+        cache_name: str = "bounded_cache",
+        max_bytes: int = 64 * 1024 * 1024,
+        *,
+        policy: str = "lru",
+        compression: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(cache_name=cache_name, **kwargs)
+        self.store = BoundedStore(max_bytes, policy=policy, compression=compression)
+        self.responses = BoundedStorage(self.store)
+        self.redirects = DictStorage()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Returns the :py:class:`CacheStats` of the stored responses."""
+        return self.store.stats
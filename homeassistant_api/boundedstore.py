@@ -0,0 +1,173 @@
+"""
+Module for the in-memory store behind the size-bounded response caches.
+Responses are kept pickled (and optionally compressed), so their size is known exactly,
+and the least recently or least frequently used ones are evicted once :code:`max_bytes` is exceeded.
+It does not import any http library, the cache backends live in :py:mod:`homeassistant_api.boundedcache`
+and :py:mod:`homeassistant_api.asyncboundedcache`.
+"""
+from __future__ import annotations
+
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, NamedTuple, Optional
+
+POLICIES = ("lru", "lfu")
+COMPRESSIONS = (None, "zlib", "zstd")
+
+
+def require_zstandard() -> Any:
+    """Imports :code:`zstandard`, explaining how to install it if it is missing."""
+    try:
+        import zstandard  # type: ignore[import]  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError(
+            "zstd compression needs zstandard, install it with `pip install homeassistant-api[zstd]`."
+        ) from err
+    return zstandard
+
+
+class CacheStats(NamedTuple):
+    """Counters of a :py:class:`BoundedStore`."""
+
+    hits: int
+    misses: int
+    entries: int
+    bytes_stored: int
+    bytes_evicted: int
+    evictions: int
+
+    @property
+    def hit_ratio(self) -> float:
+        """The share of reads that found an entry, :code:`0.0` before the first read."""
+        reads = self.hits + self.misses
+        return self.hits / reads if reads else 0.0
+
+
+class BoundedStore:
+    """
+    A thread-safe mapping of keys to bytes that holds at most :code:`max_bytes` of (compressed) values.
+
+    :param max_bytes: The most bytes kept. Values larger than this are not stored at all.
+    :param policy: :code:`"lru"` evicts the least recently used entry first, :code:`"lfu"` the least frequently read one.
+    :param compression: :code:`"zlib"`, :code:`"zstd"` (needs :code:`zstandard`) or :code:`None` to store values as they are.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        *,
+        policy: str = "lru",
+        compression: Optional[str] = None,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, not {policy!r}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"compression must be one of {COMPRESSIONS}, not {compression!r}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.compression = compression
+        if compression == "zstd":
+            zstandard = require_zstandard()
+            self._compress = zstandard.ZstdCompressor().compress
+            self._decompress = zstandard.ZstdDecompressor().decompress
+        elif compression == "zlib":
+            self._compress, self._decompress = zlib.compress, zlib.decompress
+        self._lock = threading.Lock()
+        # Ordered from least to most recently used, with the number of reads of each entry.
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._reads: Dict[str, int] = {}
+        self._size = 0
+        self._hits = self._misses = self._bytes_evicted = self._evictions = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {len(self)} entries {self._size}/{self.max_bytes} bytes "
+            f"{self.policy}>"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    @property
+    def stats(self) -> CacheStats:
+        """Returns the current :py:class:`CacheStats`."""
+        return CacheStats(
+            self._hits,
+            self._misses,
+            len(self._entries),
+            self._size,
+            self._bytes_evicted,
+            self._evictions,
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the value stored under :code:`key`, or :code:`None` on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            self._reads[key] += 1
+        return self._decompress(value) if self.compression else value
+
+    def peek(self, key: str) -> Optional[bytes]:
+        """Returns the value stored under :code:`key` without counting a read."""
+        value = self._entries.get(key)
+        if value is None:
+            return None
+        return self._decompress(value) if self.compression else value
+
+    def set(self, key: str, value: bytes) -> None:
+        """Stores :code:`value` under :code:`key`, evicting other entries until it fits."""
+        if self.compression:
+            value = self._compress(value)
+        with self._lock:
+            self._discard(key)
+            if len(value) > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._reads[key] = 0
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                self._evict(key)
+
+    def delete(self, key: str) -> None:
+        """Removes :code:`key` if it is stored."""
+        with self._lock:
+            self._discard(key)
+
+    def clear(self) -> None:
+        """Removes every entry, the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._reads.clear()
+            self._size = 0
+
+    def _discard(self, key: str) -> Optional[bytes]:
+        value = self._entries.pop(key, None)
+        if value is not None:
+            del self._reads[key]
+            self._size -= len(value)
+        return value
+
+    def _evict(self, new: str) -> None:
+        """Evicts one entry other than the :code:`new` one, which has not had a chance to be read yet."""
+        candidates = (key for key in self._entries if key != new)
+        if self.policy == "lfu":
+            # The scan goes from least recently used, so ties are broken by recency.
+            key = min(candidates, key=self._reads.__getitem__)
+        else:
+            key = next(candidates)
+        value = self._discard(key)
+        assert value is not None
+        self._bytes_evicted += len(value)
+        self._evictions += 1
@@ -0,0 +1,91 @@
+"""Module for tracking which entity states changed between polls of :code:`/api/states`."""
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .models import State
+
+Fingerprint = Tuple[Optional[str], Optional[str]]
+
+
+def fingerprint(json: Dict[str, Any]) -> Fingerprint:
+    """
+    The raw :code:`last_updated` timestamp and context id of a json state.
+    Home Assistant bumps both whenever the state or its attributes are written.
+    """
+    context = json.get("context")
+    return (
+        json.get("last_updated"),
+        context.get("id") if isinstance(context, dict) else None,
+    )
+
+
+class StateChanges(NamedTuple):
+    """The difference between two snapshots of all states."""
+
+    added: Tuple[State, ...]
+    changed: Tuple[State, ...]
+    removed: Tuple[State, ...]
+    unchanged: int
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """How many states were added, changed, removed and left unchanged."""
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "removed": len(self.removed),
+            "unchanged": self.unchanged,
+        }
+
+
+class ChangeTracker:
+    """
+    Keeps the last snapshot of all states keyed by :code:`entity_id`
+    and compares new snapshots against it by :py:func:`fingerprint`,
+    so only states that were added or changed are parsed into :py:class:`State` models.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.states: Dict[str, State] = {}
+        self._fingerprints: Dict[str, Fingerprint] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {len(self.states)} entities>"
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def reset(self) -> None:
+        """Forgets the last snapshot, so the next one reports every state as added."""
+        with self._lock:
+            self.states.clear()
+            self._fingerprints.clear()
+
+    def update(self, data: Iterable[Dict[str, Any]]) -> StateChanges:
+        """Compares a complete json snapshot of all states with the last one and replaces it."""
+        added: List[State] = []
+        changed: List[State] = []
+        unchanged = 0
+        with self._lock:
+            previous = self._fingerprints
+            fingerprints: Dict[str, Fingerprint] = {}
+            for json in data:
+                entity_id = json["entity_id"]
+                new = fingerprints[entity_id] = fingerprint(json)
+                old = previous.get(entity_id)
+                if old == new and new != (None, None):
+                    unchanged += 1
+                    continue
+                state = State.from_json(json)
+                self.states[entity_id] = state
+                (added if old is None else changed).append(state)
+            removed = tuple(
+                self.states.pop(entity_id)
+                for entity_id in sorted(previous.keys() - fingerprints.keys())
+            )
+            self._fingerprints = fingerprints
+        return StateChanges(tuple(added), tuple(changed), removed, unchanged)
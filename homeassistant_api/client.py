@@ -1,12 +1,16 @@
 """Module containing the primary Client class."""
+import asyncio
 import logging
-from typing import Any
+from typing import Any, Dict, Optional
 
 from .rawasyncclient import RawAsyncClient
 from .rawclient import RawClient
 
 logger = logging.getLogger(__name__)
 
+# Kwargs for setting up either session, kept so the session of the other mode can be set up later.
+SESSION_OPTIONS = ("cache_max_bytes", "cache_policy", "cache_compression", "shared_cache")
+
 
 class Client(RawClient, RawAsyncClient):
     """
@@ -16,7 +20,23 @@ class Client(RawClient, RawAsyncClient):
     :param token: The refresh or long lived access token to authenticate your requests. Required.
     :param global_request_kwargs: A dictionary or dict-like object of kwargs to pass to :func:`requests.request` or :meth:`aiohttp.ClientSession.request`. Optional.
     :param cache_session: A :py:class:`requests_cache.CachedSession` object to use for caching requests. Optional.
+    :param use_async: Set up the async session instead of the sync one. Calling a :py:class:`Service` then returns a coroutine. The other session is set up the first time it is used and closed on exit too. An async session is bound to the event loop it is first used on, so use the async methods of a sync client from one event loop. Optional.
     :param async_cache_session: A :py:class:`aiohttp_client_cache.CachedSession` object to use for caching requests. Optional.
+    :param cache_max_bytes: The most bytes of responses the default cache of either session keeps in memory. Defaults to 64 MiB. Optional.
+    :param cache_policy: :code:`"lru"` or :code:`"lfu"`, which responses the default cache evicts first once :code:`cache_max_bytes` is reached. Defaults to :code:`"lru"`. Optional.
+    :param cache_compression: :code:`"zlib"` or :code:`"zstd"` (:code:`pip install homeassistant-api[zstd]`) to store responses in the default cache compressed. Optional.
+    :param shared_cache: A SQLite file for the default cache of either session to share responses through with every process on the machine, instead of keeping them in memory. Only one process fetches an expired response while the others wait for it. Optional.
+    :param service_registry_ttl: Seconds until the services cached in :py:attr:`service_registry` are fetched again, :code:`None` to never expire them. Defaults to 300. Optional.
+    :param check_service_values: Also reject :code:`service_data` values outside the ranges and options of the selectors of cached services. Selectors are UI hints, so this can reject values Home Assistant accepts. Defaults to :code:`False`. Optional.
+    :param metadata_refresh_interval: Seconds before the events, components and config cached in :py:attr:`metadata` are refreshed in the background, :code:`None` to never refresh them. Defaults to 300. Optional.
+    :param states_fingerprint: Render a small fingerprint of all states with a template before :code:`GET /api/states` and reuse the last response while it is unchanged. Defaults to :code:`False`. Optional.
+    :param template_cache_ttl: Seconds the outputs of :py:meth:`render_templates` are reused for, keyed by template text. Defaults to 0, which disables the cache. Optional.
+    :param area_index_ttl: Seconds until the areas and devices cached in :py:attr:`area_index` are fetched again, :code:`None` to never expire them. Defaults to 300. Optional.
+    :param logbook_cache_size: The most logbook entries cached by the time range they cover in :py:attr:`logbook_cache`, so overlapping :py:meth:`get_logbook_entries` ranges only request what is not cached yet. Defaults to 0, which disables the cache. Optional.
+    :param revalidate_after: Seconds the responses of :py:meth:`get_states`, :py:meth:`get_entities` and :py:meth:`get_domains` are served from memory. Defaults to 0, which fetches them on every call. Optional.
+    :param stale_grace: Seconds after :code:`revalidate_after` that those responses are still served right away while one refresh runs in the background. Defaults to 60. Optional.
+    :param response_cache_ttl: Seconds the processed responses of :code:`GET` requests are kept in :py:attr:`response_cache`, keyed by path and query parameters and shared by :py:meth:`request` and :py:meth:`async_request`. Requests that can change something clear it. Defaults to 0, which disables the cache. Optional.
+    :param record_to: A file path to record every request/response pair to, for later replay with :py:class:`ReplaySession` or :py:class:`AsyncReplaySession`. Optional.
     """  # pylint: disable=line-too-long
 
     def __init__(
@@ -24,9 +44,66 @@ class Client(RawClient, RawAsyncClient):
         *args: Any,
         use_async: bool = False,
         verify_ssl: bool = True,
+        cache_session: Any = None,
+        async_cache_session: Any = None,
         **kwargs: Any
     ) -> None:
+        self.use_async = use_async
+        self.verify_ssl = verify_ssl
+        self._closing: Optional["asyncio.Task[None]"] = None
+        self._session_options: Dict[str, Any] = {
+            name: kwargs[name] for name in SESSION_OPTIONS if name in kwargs
+        }
         if use_async:
-            RawAsyncClient.__init__(self, *args, verify_ssl=verify_ssl, **kwargs)
+            self._cache_session = cache_session
+            RawAsyncClient.__init__(
+                self,
+                *args,
+                verify_ssl=verify_ssl,
+                async_cache_session=async_cache_session,
+                **kwargs
+            )
         else:
-            RawClient.__init__(self, *args, verify_ssl=verify_ssl, **kwargs)
+            self._async_cache_session = async_cache_session
+            RawClient.__init__(
+                self, *args, verify_ssl=verify_ssl, cache_session=cache_session, **kwargs
+            )
+
+    def __getattr__(self, name: str) -> Any:
+        # Only the session of the chosen mode is set up in __init__,
+        # the other one is set up once e.g. request is used on an async client.
+        options = self.__dict__.get("_session_options")
+        if options is None:
+            raise AttributeError(name)
+        if name == "cache_session":
+            self.cache_session = RawClient.build_cache_session(
+                self.__dict__.get("_cache_session"), **options
+            )
+            return self.cache_session
+        if name == "async_cache_session":
+            self.async_cache_session = RawAsyncClient.build_async_cache_session(
+                self.__dict__.get("_async_cache_session"),
+                verify_ssl=self.verify_ssl,
+                **options,
+            )
+            return self.async_cache_session
+        raise AttributeError(name)
+
+    def __exit__(self, _, __, ___) -> None:
+        RawClient.__exit__(self, _, __, ___)
+        if self.use_async or "async_cache_session" not in self.__dict__:
+            return
+        # The async session set up by __getattr__, closed on the running loop if there is one.
+        session = self.__dict__.pop("async_cache_session")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(session.close())
+        else:
+            self._closing = loop.create_task(session.close())
+
+    async def __aexit__(self, _, __, ___) -> None:
+        await RawAsyncClient.__aexit__(self, _, __, ___)
+        if self.use_async and "cache_session" in self.__dict__:
+            # The sync session set up by __getattr__.
+            self.__dict__.pop("cache_session").close()
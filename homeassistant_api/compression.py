@@ -0,0 +1,98 @@
+"""
+Module for streaming filters that drop states from a history while bounding the error of reconstructing it.
+Each filter takes and returns an iterator of :py:class:`State`'s sorted by time, so they can be chained.
+"""
+from typing import Iterable, Iterator, Optional
+
+from .models import State
+
+
+def _number(state: State) -> Optional[float]:
+    try:
+        return float(state.state)
+    except ValueError:
+        return None
+
+
+def drop_duplicates(states: Iterable[State], attributes: bool = True) -> Iterator[State]:
+    """
+    Drops states that repeat the previous state (and its attributes, unless :code:`attributes` is false).
+    Nothing is lost when the history is reconstructed by holding each state until the next one.
+    """
+    previous: Optional[State] = None
+    for state in states:
+        if (
+            previous is None
+            or state.state != previous.state
+            or (attributes and state.attributes != previous.attributes)
+        ):
+            yield state
+            previous = state
+
+
+def deadband(
+    states: Iterable[State],
+    absolute: float = 0.0,
+    percent: float = 0.0,
+) -> Iterator[State]:
+    """
+    Keeps a numeric state only when it differs from the last kept one by more than :code:`absolute`
+    or by more than :code:`percent` percent of the last kept value, whichever is larger.
+    Holding each kept state until the next one reconstructs every numeric state within that band.
+    Non-numeric states (e.g. :code:`unavailable`) are kept whenever they change.
+    """
+    kept: Optional[State] = None
+    kept_value: Optional[float] = None
+    for state in states:
+        value = _number(state)
+        if kept is None or value is None or kept_value is None:
+            keep = kept is None or state.state != kept.state
+        else:
+            keep = abs(value - kept_value) > max(absolute, abs(kept_value) * percent / 100)
+        if keep:
+            yield state
+            kept, kept_value = state, value
+
+
+def swinging_door(states: Iterable[State], tolerance: float) -> Iterator[State]:
+    """
+    Swinging door trending: drops numeric states as long as the line from the last kept state
+    to the newest one passes within :code:`tolerance` of every state dropped in between,
+    so linear interpolation between kept states reconstructs each dropped state within :code:`tolerance`.
+    Non-numeric states are kept, along with the numeric states right before and after them.
+    A state is emitted as soon as the next one shows it has to be kept, and the last state is always kept.
+    """
+    pivot_time = pivot_value = 0.0  # The last kept numeric state, where the doors hinge.
+    pivoted = False
+    previous: Optional[State] = None  # The newest numeric state, not kept yet.
+    # The range of slopes from the pivot that pass within tolerance of every state since it.
+    lowest, highest = float("-inf"), float("inf")
+    for state in states:
+        value = _number(state)
+        time = state.last_changed.timestamp()
+        elapsed = time - pivot_time
+        if (
+            value is not None
+            and pivoted
+            and elapsed > 0
+            and not lowest <= (value - pivot_value) / elapsed <= highest
+        ):
+            # The doors opened, the previous state ends the segment and becomes the pivot.
+            assert previous is not None  # The first state after a pivot always fits.
+            yield previous
+            pivot_time, pivot_value = previous.last_changed.timestamp(), float(previous.state)
+            previous, lowest, highest = None, float("-inf"), float("inf")
+            elapsed = time - pivot_time
+        if value is None or not pivoted or elapsed <= 0:
+            if previous is not None:
+                yield previous
+            yield state
+            pivoted = value is not None
+            pivot_time, pivot_value = time, value or 0.0
+            previous, lowest, highest = None, float("-inf"), float("inf")
+            continue
+        previous = state
+        lowest = max(lowest, (value - tolerance - pivot_value) / elapsed)
+        highest = min(highest, (value + tolerance - pivot_value) / elapsed)
+    if previous is not None:
+        yield previous
@@ -15,6 +15,14 @@ class RequestTimeoutError(RequestError):
     """Error raised when a request times out."""
 
 
+class BadRequestError(RequestError):
+    """Error raised when Home Assistant rejects a request as invalid (HTTP 400)."""
+
+
+class ReplayMissError(RequestError):
+    """Error raised when a replayed request has no matching recorded response."""
+
+
 class ResponseError(HomeassistantAPIError):
     """Error raised when an issue occurs in a response from Homeassistant."""
 
@@ -0,0 +1,159 @@
+"""
+Module for streaming history and logbook data to files in batches.
+CSV is built in, Parquet and Arrow IPC need the optional :code:`pyarrow` dependency
+(:code:`pip install homeassistant-api[arrow]`).
+"""
+import csv
+import itertools
+import json
+from datetime import datetime, timedelta
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+FORMATS = ("csv", "parquet", "arrow")
+HISTORY_COLUMNS = ("entity_id", "state", "last_changed", "last_updated", "attributes")
+LOGBOOK_COLUMNS = (
+    "when",
+    "entity_id",
+    "name",
+    "message",
+    "state",
+    "domain",
+    "context_id",
+    "icon",
+)
+TIMESTAMP_COLUMNS = frozenset({"last_changed", "last_updated", "when"})
+
+Row = Tuple[Optional[str], ...]
+
+
+def require_pyarrow() -> Any:
+    """Imports :code:`pyarrow`, explaining how to install it if it is missing."""
+    try:
+        import pyarrow  # type: ignore[import]  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError(
+            "Parquet and Arrow exports need pyarrow, install it with `pip install homeassistant-api[arrow]`."
+        ) from err
+    return pyarrow
+
+
+def time_windows(
+    start: datetime, end: datetime, window: timedelta
+) -> Iterator[Tuple[datetime, datetime]]:
+    """Splits :code:`start` to :code:`end` into consecutive windows of at most :code:`window`."""
+    while start < end:
+        yield start, min(start + window, end)
+        start += window
+
+
+def history_rows(data: Iterable[List[Dict[str, Any]]]) -> Iterator[Row]:
+    """
+    Turns raw :code:`/api/history` responses (a list of states per entity) into rows of :py:data:`HISTORY_COLUMNS`
+    without building :py:class:`History` models.
+    """
+    for states in data:
+        entity_id = None
+        for state in states:
+            # Minimal responses only include the entity_id in the first state.
+            entity_id = state.get("entity_id", entity_id)
+            last_changed = state.get("last_changed")
+            attributes = state.get("attributes")
+            yield (
+                entity_id,
+                state.get("state"),
+                last_changed,
+                state.get("last_updated", last_changed),
+                None if attributes is None else json.dumps(attributes),
+            )
+
+
+def logbook_rows(data: Iterable[Dict[str, Any]]) -> Iterator[Row]:
+    """Turns raw :code:`/api/logbook` entries into rows of :py:data:`LOGBOOK_COLUMNS`."""
+    for entry in data:
+        yield tuple(entry.get(column) for column in LOGBOOK_COLUMNS)
+
+
+class CsvWriter:
+    """Writes batches of rows to a CSV file with a header line."""
+
+    def __init__(self, path: str, columns: Sequence[str]) -> None:
+        self._file: IO[str] = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows: List[Row]) -> None:
+        """Writes a batch of rows."""
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        """Flushes and closes the file."""
+        self._file.close()
+
+
+class ArrowWriter:
+    """
+    Writes batches of rows as record batches to a Parquet file (one row group per batch)
+    or an Arrow IPC file. Timestamp columns are stored as UTC timestamps, everything else as strings.
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], format: str) -> None:  # pylint: disable=redefined-builtin
+        pa = require_pyarrow()
+        self._pa = pa
+        self._columns = tuple(columns)
+        self._types = [
+            pa.timestamp("us", tz="UTC") if column in TIMESTAMP_COLUMNS else pa.string()
+            for column in columns
+        ]
+        self._schema = pa.schema(list(zip(self._columns, self._types)))
+        if format == "parquet":
+            import pyarrow.parquet  # type: ignore[import]  # pylint: disable=import-outside-toplevel
+
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self._schema)
+
+    def write(self, rows: List[Row]) -> None:
+        """Converts a batch of rows to columns and writes it."""
+        pa = self._pa
+        arrays = [
+            pa.array(values, pa.string()).cast(type_)
+            for values, type_ in zip(zip(*rows), self._types)
+        ]
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        """Finishes and closes the file."""
+        self._writer.close()
+
+
+def write_rows(
+    rows: Iterable[Row],
+    path: str,
+    columns: Sequence[str],
+    *,
+    format: str = "csv",  # pylint: disable=redefined-builtin
+    row_group_size: int = 50_000,
+) -> int:
+    """Writes rows to :code:`path` in batches of :code:`row_group_size` and returns how many were written."""
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, not {format!r}")
+    writer = CsvWriter(path, columns) if format == "csv" else ArrowWriter(path, columns, format)
+    written = 0
+    rows = iter(rows)
+    try:
+        while batch := list(itertools.islice(rows, row_group_size)):
+            writer.write(batch)
+            written += len(batch)
+    finally:
+        writer.close()
+    return written
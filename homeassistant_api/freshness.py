@@ -0,0 +1,56 @@
+"""Module for skipping :code:`/api/states` downloads when nothing changed."""
+import threading
+from typing import Any, Dict, List, Optional
+
+# Renders e.g. "412|2023-03-11 22:41:05.123456+00:00".
+# Adding or changing an entity moves the newest last_updated, removing one changes the count.
+FINGERPRINT_TEMPLATE = (
+    "{{ states | count }}|{{ states | map(attribute='last_updated') | max }}"
+)
+
+
+class StatesFreshness:
+    """
+    Keeps the last :code:`/api/states` response together with a fingerprint of it
+    rendered by Home Assistant from :py:data:`FINGERPRINT_TEMPLATE`.
+    While the fingerprint stays the same the kept response is reused instead of downloading all states again.
+
+    :param enabled: Whether :py:meth:`Client.get_states`, :py:meth:`Client.get_entities` and :py:meth:`Client.poll_changes` check the fingerprint first.
+    """
+
+    template = FINGERPRINT_TEMPLATE
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.fingerprint: Optional[str] = None
+        self._data: Optional[List[Dict[str, Any]]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} hits={self.hits} misses={self.misses}>"
+
+    def invalidate(self) -> None:
+        """Forgets the kept response, so the next check downloads all states."""
+        with self._lock:
+            self.fingerprint = None
+            self._data = None
+
+    def get(self, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """Returns the kept response if it was stored with the same fingerprint."""
+        with self._lock:
+            if self._data is not None and fingerprint.strip() == self.fingerprint:
+                self.hits += 1
+                return self._data
+            self.misses += 1
+            return None
+
+    def store(self, fingerprint: str, data: List[Dict[str, Any]]) -> None:
+        """
+        Keeps a response with the fingerprint rendered *before* it was requested,
+        so a change in between is caught by the next check.
+        """
+        with self._lock:
+            self.fingerprint = fingerprint.strip()
+            self._data = data
@@ -0,0 +1,236 @@
+"""Module for querying entity states through secondary indexes."""
+import fnmatch
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import (
+    Any,
+    Collection,
+    DefaultDict,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .models import State
+
+Selector = Union[str, Pattern[str]]
+Postings = DefaultDict[Hashable, Set[str]]
+
+DEFAULT_ATTRIBUTE_KEYS = ("device_class", "unit_of_measurement")
+
+
+@lru_cache(maxsize=256)
+def compile_selector(selector: str) -> Pattern[str]:
+    """Compiles an :code:`entity_id` glob such as :code:`sensor.*_temperature` into a regex."""
+    return re.compile(fnmatch.translate(selector))
+
+
+def _hashable(value: Any) -> bool:
+    """Whether a value can be used as an index key."""
+    if value is None:
+        return False
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _values(value: Any) -> Tuple[Any, ...]:
+    """Treats lists, tuples and sets in a query as "any of these values"."""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value)
+    return (value,)
+
+
+class EntityIndex:
+    """
+    States of all entities indexed by :code:`entity_id`, domain, state value
+    and a chosen set of attribute keys, so queries are intersections of index lookups
+    rather than scans over every entity.
+
+    :param states: The states to index, e.g. from :py:meth:`Client.get_states`.
+    :param attribute_keys: The attribute keys to index. Defaults to :code:`device_class` and :code:`unit_of_measurement`.
+    """
+
+    def __init__(
+        self,
+        states: Iterable[State] = (),
+        attribute_keys: Iterable[str] = DEFAULT_ATTRIBUTE_KEYS,
+    ) -> None:
+        self._lock = threading.RLock()
+        self.states: Dict[str, State] = {}
+        self._domains: Postings = defaultdict(set)
+        self._values: Postings = defaultdict(set)
+        self._attributes: Dict[str, Postings] = {
+            key: defaultdict(set) for key in attribute_keys
+        }
+        self.refresh(states)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {len(self.states)} entities>"
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self.states
+
+    @property
+    def attribute_keys(self) -> Tuple[str, ...]:
+        """The attribute keys that are indexed."""
+        return tuple(self._attributes)
+
+    def index_attribute(self, key: str) -> None:
+        """Starts indexing an attribute key for the states already in the index and future ones."""
+        with self._lock:
+            if key in self._attributes:
+                return
+            postings: Postings = defaultdict(set)
+            self._attributes[key] = postings
+            for entity_id, state in self.states.items():
+                value = state.attributes.get(key)
+                if _hashable(value):
+                    postings[value].add(entity_id)
+
+    def _add(self, state: State) -> None:
+        entity_id = state.entity_id
+        self.states[entity_id] = state
+        self._domains[entity_id.split(".", 1)[0]].add(entity_id)
+        self._values[state.state].add(entity_id)
+        for key, postings in self._attributes.items():
+            value = state.attributes.get(key)
+            if _hashable(value):
+                postings[value].add(entity_id)
+
+    def _discard(self, entity_id: str, postings: Postings, value: Any) -> None:
+        if not _hashable(value):
+            return
+        entity_ids = postings.get(value)
+        if entity_ids is not None:
+            entity_ids.discard(entity_id)
+            if not entity_ids:
+                del postings[value]
+
+    def _remove(self, entity_id: str) -> None:
+        state = self.states.pop(entity_id)
+        self._discard(entity_id, self._domains, entity_id.split(".", 1)[0])
+        self._discard(entity_id, self._values, state.state)
+        for key, postings in self._attributes.items():
+            self._discard(entity_id, postings, state.attributes.get(key))
+
+    def update(self, states: Iterable[State]) -> List[State]:
+        """
+        Adds or replaces the given states, only touching the index entries of states that changed.
+        Returns the states that were added or changed.
+        """
+        changed = []
+        with self._lock:
+            for state in states:
+                old = self.states.get(state.entity_id)
+                if old is not None:
+                    if (
+                        old.last_updated == state.last_updated
+                        and old.state == state.state
+                        and old.attributes == state.attributes
+                    ):
+                        continue
+                    self._remove(state.entity_id)
+                self._add(state)
+                changed.append(state)
+        return changed
+
+    def remove(self, entity_ids: Iterable[str]) -> None:
+        """Removes entities from the index."""
+        with self._lock:
+            for entity_id in entity_ids:
+                if entity_id in self.states:
+                    self._remove(entity_id)
+
+    def refresh(self, states: Iterable[State]) -> List[State]:
+        """
+        Makes the index match a complete set of states, such as a new :code:`GET /api/states` response.
+        Entities missing from :code:`states` are removed and only changed states are re-indexed.
+        Returns the states that were added or changed.
+        """
+        states = list(states)
+        with self._lock:
+            self.remove(self.states.keys() - {state.entity_id for state in states})
+            return self.update(states)
+
+    def _lookup(self, postings: Postings, values: Tuple[Any, ...]) -> Set[str]:
+        matches: Set[str] = set()
+        for item in values:
+            if _hashable(item):  # Other values are never index keys.
+                matches |= postings.get(item, set())
+        return matches
+
+    def select(self, selector: Selector) -> Set[str]:
+        """
+        Returns the :code:`entity_id`'s matching a glob string (e.g. :code:`light.kitchen_*`)
+        or a compiled regular expression.
+        """
+        pattern = compile_selector(selector) if isinstance(selector, str) else selector
+        candidates: Collection[str] = self.states
+        if isinstance(selector, str) and "." in selector:
+            domain = selector.split(".", 1)[0]
+            if not any(char in domain for char in "*?["):
+                candidates = self._domains.get(domain, ())
+        return {entity_id for entity_id in candidates if pattern.match(entity_id)}
+
+    def query(
+        self,
+        entity_id: Optional[Selector] = None,
+        *,
+        domain: Union[str, Collection[str], None] = None,
+        state: Union[str, Collection[str], None] = None,
+        **attributes: Any,
+    ) -> Tuple[State, ...]:
+        """
+        Returns the states matching every given condition, sorted by :code:`entity_id`.
+        Lists, tuples and sets of values match any of their values.
+        Attribute keys that are not indexed, and values that cannot be indexed such as lists and dicts,
+        are checked against the remaining candidates.
+
+        .. code-block:: python
+
+            index.query(domain="sensor", state=("unavailable", "unknown"), device_class="temperature")
+        """
+        with self._lock:
+            sets: List[Set[str]] = []
+            if domain is not None:
+                sets.append(self._lookup(self._domains, _values(domain)))
+            if state is not None:
+                sets.append(self._lookup(self._values, _values(state)))
+            unindexed = {}
+            for key, value in attributes.items():
+                values = _values(value)
+                # Attribute values like lists, dicts and None are not indexed, so they are checked like unindexed keys.
+                if key in self._attributes and all(_hashable(item) for item in values):
+                    sets.append(self._lookup(self._attributes[key], values))
+                else:
+                    unindexed[key] = values
+            if entity_id is not None:
+                sets.append(self.select(entity_id))
+            if sets:
+                sets.sort(key=len)
+                matches = set(sets[0]).intersection(*sets[1:])
+            else:
+                matches = set(self.states)
+            results = (self.states[match] for match in sorted(matches))
+            return tuple(
+                result
+                for result in results
+                if all(
+                    result.attributes.get(key) in values
+                    for key, values in unindexed.items()
+                )
+            )
@@ -0,0 +1,206 @@
+"""
+Module for caching logbook entries by the time range they cover,
+so overlapping queries only request the parts of their range that have not been fetched yet.
+"""
+import bisect
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .models import LogbookEntry
+
+Interval = Tuple[float, float]
+
+
+def filter_key(filter_entities: Optional[Union[str, Iterable[str]]]) -> str:
+    """Returns the same key for entity filters that select the same entities in any order."""
+    if filter_entities is None:
+        return ""
+    if isinstance(filter_entities, str):
+        filter_entities = filter_entities.split(",")
+    return ",".join(sorted(set(filter_entities)))
+
+
+class IntervalSet:
+    """
+    Sorted, disjoint, half-open :code:`[start, end)` intervals of POSIX timestamps.
+    Adjacent and overlapping intervals are merged as they are added.
+    """
+
+    def __init__(self) -> None:
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {list(zip(self.starts, self.ends))}>"
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def missing(self, start: float, end: float) -> List[Interval]:
+        """Returns the parts of :code:`[start, end)` no interval covers, in order."""
+        gaps = []
+        i = max(bisect.bisect_right(self.starts, start) - 1, 0)
+        while start < end and i < len(self.starts) and self.starts[i] < end:
+            if self.starts[i] > start:
+                gaps.append((start, self.starts[i]))
+            start = max(start, self.ends[i])
+            i += 1
+        if start < end:
+            gaps.append((start, end))
+        return gaps
+
+    def add(self, start: float, end: float) -> None:
+        """Covers :code:`[start, end)`, merging it with every interval it touches."""
+        if start >= end:
+            return
+        first = bisect.bisect_left(self.ends, start)
+        last = bisect.bisect_right(self.starts, end)
+        if first < last:
+            start = min(start, self.starts[first])
+            end = max(end, self.ends[last - 1])
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
+
+    def trim(self, start: float) -> None:
+        """Forgets everything covered before :code:`start`."""
+        first = bisect.bisect_right(self.ends, start)
+        del self.starts[:first], self.ends[:first]
+        if self.starts and self.starts[0] < start:
+            self.starts[0] = start
+
+
+class _Coverage:
+    """The covered intervals of one entity filter and the entries inside them, sorted by time."""
+
+    def __init__(self) -> None:
+        self.intervals = IntervalSet()
+        self.times: List[float] = []
+        self.entries: List[LogbookEntry] = []
+
+    def insert(self, entry: LogbookEntry) -> None:
+        when = entry.when.timestamp()
+        i = bisect.bisect_right(self.times, when)
+        self.times.insert(i, when)
+        self.entries.insert(i, entry)
+
+    def trim(self, count: int) -> None:
+        """Drops the oldest :code:`count` entries and the coverage up to the oldest one kept."""
+        # Entries logged at the same time as the last dropped one go too, so the kept coverage is complete.
+        while count < len(self.times) and self.times[count] == self.times[count - 1]:
+            count += 1
+        del self.times[:count], self.entries[:count]
+        if self.times:
+            self.intervals.trim(self.times[0])
+        else:
+            self.intervals = IntervalSet()
+
+
+class LogbookCache:
+    """
+    Caches logbook entries per entity filter together with the time intervals they cover.
+    :py:meth:`missing` tells which parts of a range still have to be requested,
+    :py:meth:`add` stores a fetched range and :py:meth:`entries` reads a covered range back.
+    When more than :code:`max_entries` entries are cached, the least recently used filters are dropped first.
+
+    :param max_entries: The most entries kept across all filters. :code:`0` disables the cache.
+    :param margin: Seconds before now that are requested every time instead of being cached,
+        because Home Assistant's recorder commits entries in batches (every 5 seconds by default).
+    """
+
+    def __init__(self, max_entries: int = 0, margin: float = 10) -> None:
+        self.max_entries = max_entries
+        self.margin = margin
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._filters: "OrderedDict[str, _Coverage]" = OrderedDict()
+        self._size = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {len(self)} entries in {len(self._filters)} filters "
+            f"max_entries={self.max_entries}>"
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self.max_entries > 0
+
+    def clear(self) -> None:
+        """Forgets every cached entry and interval."""
+        with self._lock:
+            self._filters.clear()
+            self._size = 0
+
+    def missing(self, key: str, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Returns the sub-ranges of :code:`start` to :code:`end` that are not cached for the filter :code:`key`."""
+        tz = start.tzinfo
+        with self._lock:
+            coverage = self._filters.get(key)
+            if coverage is None:
+                gaps = [(start.timestamp(), end.timestamp())] if start < end else []
+            else:
+                self._filters.move_to_end(key)
+                gaps = coverage.intervals.missing(start.timestamp(), end.timestamp())
+        if gaps:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return [
+            (datetime.fromtimestamp(gap_start, tz), datetime.fromtimestamp(gap_end, tz))
+            for gap_start, gap_end in gaps
+        ]
+
+    def add(
+        self,
+        key: str,
+        start: datetime,
+        end: datetime,
+        entries: Iterable[LogbookEntry],
+    ) -> None:
+        """
+        Caches the entries fetched for :code:`start` to :code:`end`.
+        Entries in parts of the range that are already covered are skipped, so concurrent fetches do not duplicate them.
+        """
+        if not self:
+            return
+        start_time, end_time = start.timestamp(), end.timestamp()
+        with self._lock:
+            coverage = self._filters.setdefault(key, _Coverage())
+            self._filters.move_to_end(key)
+            gaps = coverage.intervals.missing(start_time, end_time)
+            for entry in entries:
+                when = entry.when.timestamp()
+                if any(gap_start <= when < gap_end for gap_start, gap_end in gaps):
+                    coverage.insert(entry)
+                    self._size += 1
+            coverage.intervals.add(start_time, end_time)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_entries and len(self._filters) > 1:
+            _, coverage = self._filters.popitem(last=False)
+            self._size -= len(coverage.entries)
+        if self._size > self.max_entries:
+            coverage = next(iter(self._filters.values()))
+            coverage.trim(self._size - self.max_entries)
+            self._size = len(coverage.entries)
+
+    def entries(
+        self, key: str, start: datetime, end: datetime
+    ) -> Optional[Tuple[LogbookEntry, ...]]:
+        """
+        Returns the cached entries of the filter :code:`key` from :code:`start` up to :code:`end`,
+        or :code:`None` if part of the range is not cached (anymore).
+        """
+        with self._lock:
+            coverage = self._filters.get(key)
+            if coverage is None or coverage.intervals.missing(start.timestamp(), end.timestamp()):
+                return None
+            first = bisect.bisect_left(coverage.times, start.timestamp())
+            last = bisect.bisect_left(coverage.times, end.timestamp())
+            return tuple(coverage.entries[first:last])
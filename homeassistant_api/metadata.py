@@ -0,0 +1,150 @@
+"""Module for the in-memory snapshot of Home Assistant's events, components and config."""
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, cast
+
+from .models import Event
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from homeassistant_api import Client
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ("events", "components", "config")
+
+
+class MetadataSnapshot:
+    """
+    Holds the events, components and config of Home Assistant in memory.
+    They are fetched concurrently on first use and refreshed in the background
+    once they are older than :code:`refresh_interval`.
+
+    :param client: The client used to fetch the snapshot.
+    :param refresh_interval: Seconds before the snapshot is refreshed. :code:`None` never refreshes it.
+    """
+
+    refresh_interval: Optional[float]
+    events: Dict[str, Event]
+    components: Tuple[str, ...]
+    config: Dict[str, Any]
+
+    def __init__(self, client: "Client", refresh_interval: Optional[float] = 300) -> None:
+        self._client = client
+        self.refresh_interval = refresh_interval
+        self.events = {}
+        self.components = ()
+        self.config = {}
+        self._updated_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refreshing: Optional[threading.Thread] = None
+        self._async_refreshing: Optional["asyncio.Task[None]"] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {len(self.events)} events "
+            f"{len(self.components)} components>"
+        )
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the snapshot has been fetched at least once."""
+        return self._updated_at is not None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the snapshot was fetched, :code:`None` before it was fetched."""
+        if self._updated_at is None:
+            return None
+        return time.monotonic() - self._updated_at
+
+    @property
+    def due(self) -> bool:
+        """Whether the snapshot is older than its refresh interval."""
+        if self._updated_at is None:
+            return True
+        return (
+            self.refresh_interval is not None
+            and time.monotonic() - self._updated_at > self.refresh_interval
+        )
+
+    def set_events(self, events: Iterable[Event]) -> None:
+        """Replaces the indexed events, e.g. with the result of :py:meth:`Client.get_events`."""
+        self.events = {event.event: event for event in events}
+
+    def _update(self, events: Any, components: Any, config: Any) -> None:
+        self.set_events(
+            Event.from_json(json, client=self._client)
+            for json in cast(List[Dict[str, Any]], events)
+        )
+        self.components = tuple(cast(List[str], components))
+        self.config = cast(Dict[str, Any], config)
+        self._updated_at = time.monotonic()
+
+    def refresh(self) -> None:
+        """Fetches events, components and config concurrently and replaces the snapshot."""
+        from concurrent.futures import (  # pylint: disable=import-outside-toplevel
+            ThreadPoolExecutor,
+        )
+
+        with ThreadPoolExecutor(max_workers=len(ENDPOINTS)) as executor:
+            results = list(executor.map(self._client.request, ENDPOINTS))
+        with self._lock:
+            self._update(*results)
+
+    async def async_refresh(self) -> None:
+        """Fetches events, components and config concurrently and replaces the snapshot."""
+        import asyncio  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        results = await asyncio.gather(
+            *(self._client.async_request(path) for path in ENDPOINTS)
+        )
+        with self._lock:
+            self._update(*results)
+
+    def _background_refresh(self) -> None:
+        try:
+            self.refresh()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Refreshing %r in the background failed.", self)
+
+    async def _async_background_refresh(self) -> None:
+        try:
+            await self.async_refresh()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Refreshing %r in the background failed.", self)
+
+    def ensure(self) -> None:
+        """
+        Fetches the snapshot if it was never fetched,
+        or starts a background refresh on a thread if it is due.
+        """
+        if not self.loaded:
+            self.refresh()
+        elif self.due and (self._refreshing is None or not self._refreshing.is_alive()):
+            self._refreshing = threading.Thread(
+                target=self._background_refresh, daemon=True
+            )
+            self._refreshing.start()
+
+    async def async_ensure(self) -> None:
+        """
+        Fetches the snapshot if it was never fetched,
+        or starts a background refresh task if it is due.
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        if not self.loaded:
+            await self.async_refresh()
+        elif self.due and (
+            self._async_refreshing is None or self._async_refreshing.done()
+        ):
+            self._async_refreshing = asyncio.create_task(
+                self._async_background_refresh()
+            )
+
+    def get_event(self, name: str) -> Optional[Event]:
+        """Looks up an :py:class:`Event` by its name."""
+        return self.events.get(name.strip().lower())
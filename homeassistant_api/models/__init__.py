@@ -1,9 +1,11 @@
 """The Model objects for the entire library."""
 from .base import BaseModel
+from .compact import CompactHistory
 from .domains import Domain, Service, ServiceField
 from .entity import Entity, Group
 from .events import Event
 from .history import History
+from .lazy import LazyDict
 from .logbook import LogbookEntry
 from .states import State
 
@@ -11,6 +13,7 @@ __all__ = (
     "Domain",
     "Service",
     "BaseModel",
+    "CompactHistory",
     "Domain",
     "Service",
     "ServiceField",
@@ -18,6 +21,7 @@ __all__ = (
     "Group",
     "Event",
     "History",
+    "LazyDict",
     "LogbookEntry",
     "State",
 )
@@ -16,4 +16,6 @@ class BaseModel(PydanticBaseModel):
     model_config = ConfigDict(
         arbitrary_types_allowed=True,
         validate_assignment=True,
+        # Validators are built on first use rather than at import time.
+        defer_build=True,
     )
@@ -0,0 +1,137 @@
+"""Module for histories that store the attributes of their states as deltas."""
+import sys
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
+
+from .states import Context, State
+
+if TYPE_CHECKING:
+    from .history import History
+
+# Attributes of a row: the index of a shared dict, and the keys changed and removed relative to it.
+Delta = Tuple[int, Optional[Dict[str, Any]], Tuple[str, ...]]
+
+
+def _fingerprint(attributes: Dict[str, Any]) -> str:
+    # repr tells apart values that json would write the same, e.g. a datetime and its ISO string.
+    return repr(sorted(attributes.items()))
+
+
+class CompactHistory(Sequence[State]):
+    """
+    A read-only history that keeps each distinct attributes dict once,
+    and stores the attributes of every state as a reference to one of them plus the keys that differ.
+    Indexing and iterating build ordinary :py:class:`State` objects on access.
+    Create one with :py:meth:`History.compact`.
+    """
+
+    def __init__(self, states: Iterable[State]) -> None:
+        self.entity_id: Optional[str] = None
+        self._states: List[str] = []
+        self._last_changed: List[datetime] = []
+        self._last_updated: List[Optional[datetime]] = []
+        self._contexts: List[Optional[Context]] = []
+        self._bases: List[Dict[str, Any]] = []
+        self._attributes: List[Delta] = []
+        known: Dict[str, int] = {}
+        for state in states:
+            self.entity_id = state.entity_id
+            self._states.append(sys.intern(state.state))
+            self._last_changed.append(state.last_changed)
+            self._last_updated.append(
+                None if state.last_updated == state.last_changed else state.last_updated
+            )
+            self._contexts.append(state.context)
+            self._attributes.append(self._encode(state.attributes, known))
+
+    def _encode(self, attributes: Dict[str, Any], known: Dict[str, int]) -> Delta:
+        if self._attributes:
+            index = self._attributes[-1][0]
+            base = self._bases[index]
+            changed = {
+                key: value
+                for key, value in attributes.items()
+                if key not in base or base[key] != value
+            }
+            removed = tuple(key for key in base if key not in attributes)
+            if not changed and not removed:
+                return index, None, ()
+            # Small differences from the shared dict are cheaper than a new one.
+            if len(changed) + len(removed) <= len(attributes) // 2:
+                return index, changed, removed
+        fingerprint = _fingerprint(attributes)
+        shared = known.get(fingerprint)
+        # Objects with the same repr can still differ.
+        if shared is None or self._bases[shared] != attributes:
+            shared = known[fingerprint] = len(self._bases)
+            self._bases.append(dict(attributes))
+        return shared, None, ()
+
+    def _attributes_at(self, i: int) -> Dict[str, Any]:
+        index, changed, removed = self._attributes[i]
+        attributes = dict(self._bases[index])
+        if changed:
+            attributes.update(changed)
+        for key in removed:
+            del attributes[key]
+        return attributes
+
+    def _build(self, i: int) -> State:
+        last_changed = self._last_changed[i]
+        return State.model_construct(
+            entity_id=self.entity_id,
+            state=self._states[i],
+            attributes=self._attributes_at(i),
+            last_changed=last_changed,
+            last_updated=self._last_updated[i] or last_changed,
+            context=self._contexts[i],
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {self.entity_id} {len(self)} states "
+            f"{len(self._bases)} shared attributes>"
+        )
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @overload
+    def __getitem__(self, i: int) -> State:
+        ...
+
+    @overload
+    def __getitem__(self, i: slice) -> Tuple[State, ...]:
+        ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[State, Tuple[State, ...]]:
+        if isinstance(i, slice):
+            return tuple(map(self._build, range(len(self))[i]))
+        return self._build(range(len(self))[i])
+
+    def __iter__(self) -> Iterator[State]:
+        return map(self._build, range(len(self)))
+
+    @property
+    def states(self) -> "CompactHistory":
+        """The states of the history, so code reading :py:attr:`History.states` works unchanged."""
+        return self
+
+    def to_history(self) -> "History":
+        """Builds a regular :py:class:`History` with every state."""
+        from .history import History  # pylint: disable=import-outside-toplevel
+
+        return History(states=tuple(self))
+
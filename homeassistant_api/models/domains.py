@@ -1,6 +1,4 @@
 """File for Service and Domain data models"""
-import gc
-import inspect
 from typing import TYPE_CHECKING, Any, Coroutine, Dict, Optional, Tuple, Union, cast
 
 from pydantic import Field
@@ -78,6 +76,10 @@ class ServiceField(BaseModel):
     selector: Optional[Dict[str, Any]] = None
     name: Optional[str] = None
     required: Optional[bool] = None
+    fields: Optional[Dict[str, "ServiceField"]] = Field(
+        None,
+        description="The fields grouped under this one, if it is a collapsible section.",
+    )
 
 
 class Service(BaseModel):
@@ -88,6 +90,10 @@ class Service(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     fields: Optional[Dict[str, ServiceField]] = None
+    target: Optional[Dict[str, Any]] = Field(
+        None,
+        description="The selector for the entities, devices and areas the service accepts, if any.",
+    )
 
     def trigger(self, **service_data) -> Tuple[State, ...]:
         """Triggers the service associated with this object."""
@@ -108,14 +114,10 @@ class Service(BaseModel):
     def __call__(
         self, **service_data
     ) -> Union[Tuple[State, ...], Coroutine[Any, Any, Tuple[State, ...]]]:
-        """Triggers the service associated with this object."""
-        assert (frame := inspect.currentframe()) is not None
-        assert (parent_frame := frame.f_back) is not None
-        try:
-            if inspect.iscoroutinefunction(
-                caller := gc.get_referrers(parent_frame.f_code)[0]
-            ) or inspect.iscoroutine(caller):
-                return self.async_trigger(**service_data)
-        except IndexError:  # pragma: no cover
-            pass
+        """
+        Triggers the service associated with this object.
+        Returns a coroutine to await if the domain's client was created with :code:`use_async=True`.
+        """
+        if self.domain._client.use_async:
+            return self.async_trigger(**service_data)
         return self.trigger(**service_data)
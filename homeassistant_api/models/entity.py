@@ -3,10 +3,11 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Dict, Optional
 
-from pydantic import Field
+from pydantic import Field, SerializerFunctionWrapHandler, field_serializer
 
 from .base import BaseModel
 from .history import History
+from .lazy import LazyDict
 from .states import State
 
 if TYPE_CHECKING:
@@ -31,6 +32,28 @@ class Group(BaseModel):
         "indexed by their :code:`entity_id`.",
     )
 
+    @classmethod
+    def from_json(
+        cls, group_id: str, states: Dict[str, Dict[str, Any]], client: "Client"
+    ) -> "Group":
+        """
+        Constructs a Group from the json states of its entities indexed by slug.
+        Each :py:class:`Entity` is only built when it is first accessed.
+        """
+        group = cls(group_id=group_id, _client=client)
+        # Set directly so validation does not build every entity up front.
+        object.__setattr__(group, "entities", LazyDict(states, group._build_entity))
+        return group
+
+    def _build_entity(self, slug: str, json: Dict[str, Any]) -> "Entity":
+        return Entity(slug=slug, state=State.from_json(json), group=self)
+
+    @field_serializer("entities", mode="wrap")
+    def _serialize_entities(
+        self, entities: Dict[str, "Entity"], handler: SerializerFunctionWrapHandler
+    ) -> Any:
+        return handler(dict(entities.items()))
+
     def _add_entity(self, slug: str, state: State) -> None:
         """Registers entities to this Group object"""
         self.entities[slug] = Entity(
@@ -80,6 +103,8 @@ class Entity(BaseModel):
         # Defaults to 1 day before. https://developers.home-assistant.io/docs/api/rest/
         end_timestamp: Optional[datetime] = None,
         significant_changes_only: bool = False,
+        minimal_response: bool = False,
+        no_attributes: bool = False,
     ) -> Optional[History]:
         """Gets the previous :py:class:`State`'s of the :py:class:`Entity`"""
         for history in self.group._client.get_entity_histories(
@@ -87,6 +112,8 @@ class Entity(BaseModel):
             start_timestamp=start_timestamp,
             end_timestamp=end_timestamp,
             significant_changes_only=significant_changes_only,
+            minimal_response=minimal_response,
+            no_attributes=no_attributes,
         ):
             return history
         return None
@@ -110,6 +137,8 @@ class Entity(BaseModel):
         # Defaults to 1 day before. https://developers.home-assistant.io/docs/api/rest/
         end_timestamp: Optional[datetime] = None,
         significant_changes_only: bool = False,
+        minimal_response: bool = False,
+        no_attributes: bool = False,
     ) -> Optional[History]:
         """
         Gets the :py:class:`History` of previous :py:class:`State`'s of the :py:class:`Entity`.
@@ -119,6 +148,8 @@ class Entity(BaseModel):
             start_timestamp=start_timestamp,
             end_timestamp=end_timestamp,
             significant_changes_only=significant_changes_only,
+            minimal_response=minimal_response,
+            no_attributes=no_attributes,
         ):
             return history
         return None
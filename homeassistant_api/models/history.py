@@ -1,11 +1,16 @@
 """Module for the History model."""
-from typing import Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
 
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from .base import BaseModel
 from .states import State
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .compact import CompactHistory
+
 
 class History(BaseModel):
     """Model representing past :py:class:`State`'s of an entity."""
@@ -14,6 +19,26 @@ class History(BaseModel):
         ..., description="A tuple of previous states of an entity."
     )
 
+    @model_validator(mode="before")
+    @classmethod
+    def fill_minimal_states(cls, data: Any) -> Any:
+        """
+        Completes rows of a :code:`minimal_response`, which only have :code:`state` and :code:`last_changed`
+        after the first one, with the :code:`entity_id` of the first row and :code:`last_updated` from :code:`last_changed`.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("states"), list):
+            return data
+        entity_id = None
+        states = []
+        for state in data["states"]:
+            if isinstance(state, dict):
+                entity_id = state.get("entity_id", entity_id)
+                if "entity_id" not in state or "last_updated" not in state:
+                    state = {"entity_id": entity_id, **state}
+                    state.setdefault("last_updated", state.get("last_changed"))
+            states.append(state)
+        return {**data, "states": states}
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         assert self.entity_id is not None
@@ -24,3 +49,73 @@ class History(BaseModel):
         entity_ids = [state.entity_id for state in self.states]
         result, *_ = set(entity_ids)
         return result
+
+    def compress(
+        self,
+        *,
+        drop_duplicates: bool = True,
+        deadband: float = 0.0,
+        deadband_percent: float = 0.0,
+        swinging_door: Optional[float] = None,
+    ) -> "History":
+        """
+        Returns a :py:class:`History` with fewer states, see :py:mod:`homeassistant_api.compression`.
+        Repeated states are dropped, then numeric states within the :code:`deadband`
+        (absolute, or :code:`deadband_percent` of the last kept value) of the last kept one,
+        then states that linear interpolation reconstructs within the :code:`swinging_door` tolerance.
+        The error bounds of the deadband and swinging door add up when both are used.
+        """
+        from .. import compression  # pylint: disable=import-outside-toplevel
+
+        states: Iterable[State] = self.states
+        if drop_duplicates:
+            states = compression.drop_duplicates(states)
+        if deadband or deadband_percent:
+            states = compression.deadband(states, deadband, deadband_percent)
+        if swinging_door is not None:
+            states = compression.swinging_door(states, swinging_door)
+        return History(states=tuple(states))
+
+    def compact(self) -> "CompactHistory":
+        """
+        Returns a read-only :py:class:`CompactHistory` of the same states that stores each distinct
+        attributes dict once and the attributes of every state as the keys that differ from it.
+        Long histories of entities whose attributes rarely change take a fraction of the memory.
+        """
+        from .compact import CompactHistory  # pylint: disable=import-outside-toplevel
+
+        return CompactHistory(self.states)
+
+    def to_arrays(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Returns an array of :code:`last_changed` POSIX timestamps and an array of float states,
+        with :code:`nan` for states that are not numbers. Requires :code:`numpy`.
+        """
+        from ..series import to_arrays  # pylint: disable=import-outside-toplevel
+
+        return to_arrays(self.states)
+
+    def aggregate(
+        self,
+        interval: float,
+        *,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Dict[str, "np.ndarray"]:
+        """
+        Buckets the states into windows of :code:`interval` seconds with their
+        :code:`min`, :code:`max`, :code:`mean`, :code:`last`, :code:`count` and :code:`time_weighted` average.
+        See :py:func:`homeassistant_api.series.aggregate`. Requires :code:`numpy`.
+        """
+        from ..series import aggregate  # pylint: disable=import-outside-toplevel
+
+        return aggregate(*self.to_arrays(), interval, start=start, end=end)
+
+    def downsample(self, points: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Reduces the numeric states to at most :code:`points` samples with
+        Largest-Triangle-Three-Buckets for charting. Requires :code:`numpy`.
+        """
+        from ..series import lttb  # pylint: disable=import-outside-toplevel
+
+        return lttb(*self.to_arrays(), points)
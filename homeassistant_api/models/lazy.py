@@ -0,0 +1,86 @@
+"""Module for dictionaries whose values are built the first time they are accessed."""
+from typing import Any, Callable, Dict, Iterator, Mapping, MutableMapping, TypeVar
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LazyDict(MutableMapping[K, V]):
+    """
+    A mutable mapping that holds raw data for its keys
+    and only builds the value of a key with :code:`factory(key, raw)` when it is first accessed.
+    Values that were never accessed cost nothing but their raw data.
+    It is not a :py:class:`dict`, use :py:meth:`copy` for one, e.g. to serialize it.
+    """
+
+    def __init__(self, pending: Dict[K, Any], factory: Callable[[K, Any], V]) -> None:
+        self._values: Dict[K, V] = {}
+        self._pending = pending
+        self._factory = factory
+
+    def _build(self, key: K) -> V:
+        value = self._values[key] = self._factory(key, self._pending.pop(key))
+        return value
+
+    def _build_all(self) -> None:
+        for key in list(self._pending):
+            self._build(key)
+
+    @property
+    def built(self) -> int:
+        """How many values have been built so far."""
+        return len(self._values)
+
+    def __getitem__(self, key: K) -> V:
+        if key in self._values:
+            return self._values[key]
+        if key in self._pending:
+            return self._build(key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values or key in self._pending
+
+    def __iter__(self) -> Iterator[K]:
+        yield from list(self._values)
+        yield from list(self._pending)
+
+    def __len__(self) -> int:
+        return len(self._values) + len(self._pending)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._pending.pop(key, None)
+        self._values[key] = value
+
+    def __delitem__(self, key: K) -> None:
+        if key in self._pending:
+            del self._pending[key]
+        else:
+            del self._values[key]
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+    def __or__(self, other: Mapping[K, V]) -> Dict[K, V]:
+        return {**self, **other}
+
+    def __ror__(self, other: Mapping[K, V]) -> Dict[K, V]:
+        return {**other, **self}
+
+    def __ior__(self, other: Mapping[K, V]) -> "LazyDict[K, V]":
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._pending.clear()
+
+    def copy(self) -> Dict[K, V]:
+        """Returns a plain :py:class:`dict` with every value built."""
+        self._build_all()
+        return dict(self._values)
+
+    def materialize(self) -> "LazyDict[K, V]":
+        """Builds every remaining value and returns the dictionary."""
+        self._build_all()
+        return self
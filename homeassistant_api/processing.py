@@ -1,33 +1,38 @@
 """Module for processing API responses from homeassistant."""
+from __future__ import annotations
 
 import inspect
-import json
 import logging
-from typing import Any, Callable, ClassVar, Dict, Tuple, Union, cast
-
-import simplejson
-from aiohttp import ClientResponse
-from aiohttp_client_cache.response import CachedResponse as AsyncCachedResponse
-from requests import Response
-from requests_cache.models.response import CachedResponse
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Dict, Tuple, Union, cast
 
 from .errors import (
+    BadRequestError,
     EndpointNotFoundError,
     InternalServerError,
     MalformedDataError,
     MethodNotAllowedError,
     ProcessorNotFoundError,
-    RequestError,
     UnauthorizedError,
     UnexpectedStatusCodeError,
 )
 
+if TYPE_CHECKING:
+    # Response libraries are only imported by the client that uses them.
+    from aiohttp import ClientResponse
+    from aiohttp_client_cache.response import CachedResponse as AsyncCachedResponse
+    from requests import Response
+    from requests_cache.models.response import CachedResponse
+
+    from .recording import AsyncRecordedResponse
+
 logger = logging.getLogger(__name__)
 
 
-AsyncResponseType = Union[AsyncCachedResponse, ClientResponse]
-ResponseType = Union[Response, CachedResponse]
-AllResponseType = Union[AsyncCachedResponse, ClientResponse, Response, CachedResponse]
+AsyncResponseType = Union[
+    "AsyncCachedResponse", "ClientResponse", "AsyncRecordedResponse"
+]
+ResponseType = Union["Response", "CachedResponse"]
+AllResponseType = Union[AsyncResponseType, ResponseType]
 ProcessorType = Callable[[AllResponseType], Any]
 
 
@@ -72,32 +77,41 @@ class Processing:
             f"No response processor found for mimetype {mimetype!r}."
         )
 
+    def _async_content(self) -> bytes:
+        """Returns whatever body of an async response has been received so far."""
+        body = getattr(self._response, "_body", None)
+        if isinstance(body, bytes):
+            return body
+        _buffer = self._response.content._buffer  # type: ignore[union-attr]
+        return b"" if not _buffer else _buffer[0]
+
     def process(self) -> Any:
         """Validates the http status code before starting to process the repsonse content"""
         content: Union[str, bytes]
-        if async_ := isinstance(self._response, (ClientResponse, AsyncCachedResponse)):
-            status_code = self._response.status
-            _buffer = self._response.content._buffer
-            content = b"" if not _buffer else _buffer[0]
-        elif isinstance(self._response, (Response, CachedResponse)):
-            status_code = self._response.status_code
-            content = self._response.content
+        # Sync responses are told apart by duck typing so neither http library
+        # has to be imported just to process the other one's responses.
+        if async_ := not hasattr(self._response, "status_code"):
+            status_code = self._response.status  # type: ignore[union-attr]
+            content = self._async_content()
+        else:
+            status_code = self._response.status_code  # type: ignore[union-attr]
+            content = self._response.content  # type: ignore[union-attr,assignment]
         if self._decode_bytes and isinstance(content, bytes):
             content = content.decode()
 
         if status_code in (200, 201):
             return self.process_content(async_=async_)
         if status_code == 400:
-            raise RequestError(content)
+            raise BadRequestError(content)
         if status_code == 401:
             raise UnauthorizedError()
         if status_code == 404:
             raise EndpointNotFoundError(self._response.url)  # type: ignore
         if status_code == 405:
-            if isinstance(self._response, (Response, CachedResponse)):
-                method = self._response.request.method
+            if async_:
+                method = self._response.method  # type: ignore[union-attr]
             else:
-                method = self._response.method
+                method = self._response.request.method  # type: ignore[union-attr]
             raise MethodNotAllowedError(cast(str, method))
         if status_code >= 500:
             raise InternalServerError(status_code, content)
@@ -110,7 +124,7 @@ def process_json(response: ResponseType) -> dict[str, Any]:
     """Returns the json dict content of the response."""
     try:
         return cast(dict[str, Any], response.json())
-    except (json.JSONDecodeError, simplejson.JSONDecodeError) as err:
+    except ValueError as err:  # json and simplejson decode errors
         raise MalformedDataError(
             f"Home Assistant responded with non-json response: {repr(response.text)}"
         ) from err
@@ -128,7 +142,7 @@ async def async_process_json(response: AsyncResponseType) -> dict[str, Any]:
     """Returns the json dict content of the response."""
     try:
         return cast(dict[str, Any], await response.json())
-    except (json.JSONDecodeError, simplejson.JSONDecodeError) as err:
+    except ValueError as err:  # json and simplejson decode errors
         raise MalformedDataError(
             f"Home Assistant responded with non-json response: {repr(await response.text())}"
         ) from err
@@ -0,0 +1,77 @@
+"""Module for selecting and projecting states on the Home Assistant side with templates."""
+import json
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Pattern, Tuple, Union
+
+from .errors import MalformedDataError
+from .index import compile_selector
+
+# Fields read from the state object itself, any other field is read from its attributes.
+STATE_FIELDS = {
+    "state": "s.state",
+    "name": "s.name",
+    "domain": "s.domain",
+    "object_id": "s.object_id",
+    "last_changed": "s.last_changed.isoformat()",
+    "last_updated": "s.last_updated.isoformat()",
+}
+
+
+def _literal(value: str) -> str:
+    """Quotes a string as a Jinja2 string literal."""
+    return json.dumps(value)
+
+
+@lru_cache(maxsize=128)
+def projection_template(pattern: str, domain: str, fields: Tuple[str, ...]) -> str:
+    """
+    Builds a template that renders a json list with one row per entity whose :code:`entity_id` matches the regex :code:`pattern`,
+    holding the :code:`entity_id` followed by each field. A :code:`domain` limits the entities searched to it.
+    """
+    columns = ", ".join(
+        ["s.entity_id"]
+        + [
+            STATE_FIELDS.get(field, f"s.attributes.get({_literal(field)})")
+            for field in fields
+        ]
+    )
+    source = f"states.{domain}" if domain else "states"
+    return (
+        "["
+        f"{{%- for s in {source} | selectattr('entity_id', 'match', {_literal(pattern)}) -%}}"
+        "{%- if not loop.first %},{% endif -%}"
+        f"{{{{ [{columns}] | to_json }}}}"
+        "{%- endfor -%}"
+        "]"
+    )
+
+
+def prepare_projection(
+    selector: Union[str, Pattern[str]], fields: Iterable[str]
+) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Pre-logic for :py:meth:`Client.query_states` and :py:meth:`Client.async_query_states`.
+    Returns the template to render and the keys of each record.
+    """
+    domain = ""
+    if isinstance(selector, str):
+        if "." in selector:
+            domain = selector.split(".", 1)[0]
+            if not domain.isidentifier():  # The domain part is a glob itself.
+                domain = ""
+        selector = compile_selector(selector)
+    fields = tuple(fields)
+    return projection_template(selector.pattern, domain, fields), ("entity_id", *fields)
+
+
+def parse_projection(
+    rendered: str, keys: Tuple[str, ...]
+) -> Tuple[Dict[str, Any], ...]:
+    """Post-logic that turns the rows rendered by a projection template into records."""
+    try:
+        rows = json.loads(rendered)
+    except ValueError as err:
+        raise MalformedDataError(
+            f"Projection template rendered invalid json: {rendered[:100]!r}"
+        ) from err
+    return tuple(dict(zip(keys, row)) for row in rows)
@@ -1,9 +1,10 @@
 """Module for interacting with Home Assistant asyncronously."""
 from __future__ import annotations
 
-import asyncio
+import copy
 import json
 import logging
+import time
 from datetime import datetime
 from posixpath import join
 from typing import (
@@ -11,24 +12,37 @@ from typing import (
     Any,
     AsyncGenerator,
     Dict,
+    Iterable,
     List,
     Literal,
+    MutableMapping,
     Optional,
+    Pattern,
     Tuple,
     Union,
     cast,
 )
 
-import aiohttp
-import aiohttp_client_cache
-
-from .errors import BadTemplateError, RequestError, RequestTimeoutError
+from .errors import (
+    BadRequestError,
+    BadTemplateError,
+    RequestTimeoutError,
+)
 from .models import Domain, Entity, Event, Group, History, LogbookEntry, State
 from .processing import AsyncResponseType, Processing
 from .rawbaseclient import RawBaseClient
 
 if TYPE_CHECKING:
+    import aiohttp
+    import aiohttp_client_cache
+
     from homeassistant_api import Client
+
+    from .areas import AreaIndex
+    from .changes import StateChanges
+    from .index import EntityIndex
+    from .recording import AsyncReplaySession
+    from .templates import RenderedTemplates
 else:
     Client = None  # pylint: disable=invalid-name
 
@@ -45,34 +59,87 @@ class RawAsyncClient(RawBaseClient):
     """  # pylint: disable=line-too-long
 
     async_cache_session: Union[
-        aiohttp_client_cache.CachedSession, aiohttp.ClientSession
+        aiohttp_client_cache.CachedSession, aiohttp.ClientSession, AsyncReplaySession
     ]
+    use_async: bool = True
 
     def __init__(
         self,
         *args,
         async_cache_session: Union[
             aiohttp_client_cache.CachedSession,
+            AsyncReplaySession,
             Literal[False],
             Literal[None],
         ] = None,  # Explicitly disable cache with async_cache_session=False
         verify_ssl: bool = True,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_policy: str = "lru",
+        cache_compression: Optional[str] = None,
+        shared_cache: Optional[str] = None,
         **kwargs,
     ):
         RawBaseClient.__init__(self, *args, **kwargs)
+        self.async_cache_session = self.build_async_cache_session(
+            async_cache_session,
+            verify_ssl=verify_ssl,
+            cache_max_bytes=cache_max_bytes,
+            cache_policy=cache_policy,
+            cache_compression=cache_compression,
+            shared_cache=shared_cache,
+        )
+
+    @staticmethod
+    def build_async_cache_session(
+        async_cache_session: Union[
+            aiohttp_client_cache.CachedSession,
+            AsyncReplaySession,
+            Literal[False],
+            Literal[None],
+        ] = None,
+        *,
+        verify_ssl: bool = True,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_policy: str = "lru",
+        cache_compression: Optional[str] = None,
+        shared_cache: Optional[str] = None,
+    ) -> Union[
+        aiohttp_client_cache.CachedSession, aiohttp.ClientSession, AsyncReplaySession
+    ]:
+        """The async equivalent of :py:meth:`RawClient.build_cache_session`."""
+        if async_cache_session is not False and async_cache_session is not None:
+            return async_cache_session
+        import aiohttp  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
         connector = aiohttp.TCPConnector(verify_ssl=False) if not verify_ssl else None
         if async_cache_session is False:
-            self.async_cache_session = aiohttp.ClientSession(connector=connector)
-        elif async_cache_session is None:
-            self.async_cache_session = aiohttp_client_cache.CachedSession(  # type: ignore[attr-defined]
-                cache=aiohttp_client_cache.CacheBackend(  # type: ignore[attr-defined]
-                    cache_name="default_async_cache",
-                    expire_after=300,
-                ),
+            return aiohttp.ClientSession(connector=connector)
+        # The cache library is only loaded when the default cache is used.
+        import aiohttp_client_cache  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        from .asyncboundedcache import AsyncBoundedCache  # pylint: disable=import-outside-toplevel
+
+        if shared_cache is not None:
+            from .asyncsharedcache import (  # pylint: disable=import-outside-toplevel
+                AsyncSharedCache,
+                AsyncSharedCachedSession,
+            )
+
+            return AsyncSharedCachedSession(
+                cache=AsyncSharedCache(shared_cache, expire_after=300),
                 connector=connector,
             )
-        else:
-            self.async_cache_session = async_cache_session
+        backend = AsyncBoundedCache(
+            "default_async_cache",
+            cache_max_bytes,
+            policy=cache_policy,
+            compression=cache_compression,
+            expire_after=300,
+        )
+        return aiohttp_client_cache.CachedSession(  # type: ignore[attr-defined]
+            cache=backend,
+            connector=connector,
+        )
 
     async def __aenter__(self):
         logger.debug(
@@ -85,6 +152,8 @@ class RawAsyncClient(RawBaseClient):
     async def __aexit__(self, _, __, ___):
         logger.debug("Exiting async requests session %r", self.async_cache_session)
         await self.async_cache_session.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
     # Very important request function
     async def async_request(
@@ -92,24 +161,57 @@ class RawAsyncClient(RawBaseClient):
         path: str,
         method: str = "GET",
         headers: Optional[Dict[str, str]] = None,
+        refresh: bool = False,
         **kwargs,
     ) -> Any:
-        """Base method for making requests to the api"""
+        """
+        Base method for making requests to the api.
+        With :code:`refresh`, cached responses are skipped and replaced by the new one.
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        cache_key, cached = self.response_cache.lookup(method, path, kwargs.get("params"))
+        if cached is not None and not refresh:
+            return cached
         try:
             if self.global_request_kwargs is not None:
                 kwargs.update(self.global_request_kwargs)
-            return await self.async_response_logic(
-                await self.async_cache_session.request(
-                    method,
+            if refresh and hasattr(self.async_cache_session, "cache"):
+                # Conditional requests cannot refresh responses without an ETag, so the cached one is dropped.
+                await cast(
+                    "aiohttp_client_cache.CachedSession", self.async_cache_session
+                ).cache.delete_url(
                     self.endpoint(path),
+                    method,
+                    params=kwargs.get("params"),
                     headers=self.prepare_headers(headers),
-                    **kwargs,
                 )
+            started = time.perf_counter()
+            response = await self.async_cache_session.request(
+                method,
+                self.endpoint(path),
+                headers=self.prepare_headers(headers),
+                **kwargs,
             )
+            if self.recorder is not None:
+                self.recorder.record(
+                    method,
+                    self.endpoint(path),
+                    status=response.status,
+                    headers=dict(response.headers),
+                    body=await response.read(),
+                    elapsed=time.perf_counter() - started,
+                    params=kwargs.get("params"),
+                    request_body=kwargs.get("json", kwargs.get("data")),
+                )
+            result = await self.async_response_logic(response)
         except asyncio.exceptions.TimeoutError as err:
             raise RequestTimeoutError(
                 f'Home Assistant did not respond in time (timeout: {kwargs.get("timeout", 300)} sec)'
             ) from err
+        if cache_key is not None:
+            self.response_cache.store(cache_key, result)
+        return result
 
     @staticmethod
     async def async_response_logic(response: AsyncResponseType) -> Any:
@@ -127,20 +229,48 @@ class RawAsyncClient(RawBaseClient):
     async def async_get_config(self) -> Dict[str, Any]:
         """
         Returns the yaml configuration of homeassistant.
+        Served from :py:attr:`metadata`, which is refreshed in the background, as a copy that is safe to change.
         :code:`GET /api/config`
         """
-        return cast(Dict[str, Any], await self.async_request("config"))
+        await self.metadata.async_ensure()
+        return copy.deepcopy(self.metadata.config)
 
     async def async_get_logbook_entries(
         self,
-        *args,
-        **kwargs,
+        filter_entities: Optional[Union[str, Iterable[str]]] = None,
+        start_timestamp: Optional[Union[str, datetime]] = None,  # Defaults to 1 day before
+        end_timestamp: Optional[Union[str, datetime]] = None,
     ) -> AsyncGenerator[LogbookEntry, None]:
         """
         Returns a list of logbook entries from homeassistant.
+        With :code:`logbook_cache_size` set and a :code:`start_timestamp` given,
+        only the parts of the range that are not in :py:attr:`logbook_cache` yet are requested.
         :code:`GET /api/logbook/<timestamp>`
         """
-        params, url = self.prepare_get_logbook_entry_params(*args, **kwargs)
+        if self.logbook_cache and isinstance(start_timestamp, datetime):
+            key, start, settled, end = self.prepare_logbook_range(
+                filter_entities, start_timestamp, end_timestamp, self.logbook_cache.margin
+            )
+            for gap_start, gap_end in self.logbook_cache.missing(key, start, settled):
+                params, url = self.prepare_get_logbook_entry_params(
+                    filter_entities, gap_start, gap_end
+                )
+                data = await self.async_request(url, params=params)
+                self.logbook_cache.add(
+                    key, gap_start, gap_end, [LogbookEntry.parse_obj(entry) for entry in data]
+                )
+            # The range can already be evicted again if it holds more than logbook_cache_size entries.
+            if (cached := self.logbook_cache.entries(key, start, settled)) is not None:
+                for entry in cached:
+                    yield entry
+                if settled == end:
+                    return
+                # The recorder may not have committed the last seconds yet, so they are requested without caching.
+                start = settled
+            start_timestamp, end_timestamp = start, end
+        params, url = self.prepare_get_logbook_entry_params(
+            filter_entities, start_timestamp, end_timestamp
+        )
         data = await self.async_request(url, params=params)
         for entry in data:
             yield LogbookEntry.parse_obj(entry)
@@ -152,9 +282,14 @@ class RawAsyncClient(RawBaseClient):
         # Defaults to 1 day before. https://developers.home-assistant.io/docs/api/rest/
         end_timestamp: Optional[datetime] = None,
         significant_changes_only: bool = False,
+        minimal_response: bool = False,
+        no_attributes: bool = False,
     ) -> AsyncGenerator[History, None]:
         """
         Returns a generator of entity state histories from homeassistant.
+        :code:`minimal_response` leaves out everything but :code:`state` and :code:`last_changed`
+        from states other than the first and :code:`no_attributes` leaves out attributes,
+        which can shrink the response by an order of magnitude.
         :code:`GET /api/history/period/<timestamp>`
         """
         params, url = self.prepare_get_entity_histories_params(
@@ -162,6 +297,8 @@ class RawAsyncClient(RawBaseClient):
             start_timestamp=start_timestamp,
             end_timestamp=end_timestamp,
             significant_changes_only=significant_changes_only,
+            minimal_response=minimal_response,
+            no_attributes=no_attributes,
         )
         data = await self.async_request(
             url,
@@ -181,12 +318,90 @@ class RawAsyncClient(RawBaseClient):
                 json=dict(template=template),
                 method="POST",
             ))
-        except RequestError as err:
+        except BadRequestError as err:
             raise BadTemplateError(
                 "Your template is invalid. "
                 "Try debugging it in the developer tools page of homeassistant."
             ) from err
 
+    async def async_get_area_index(self) -> AreaIndex:
+        """
+        Returns :py:attr:`area_index` with the areas and devices of Home Assistant and their entities,
+        fetching it with a single template render if it is stale.
+        :code:`POST /api/template`
+        """
+        if self.area_index.stale:
+            self.area_index.update(await self.async_get_rendered_template(self.area_index.template))
+        return self.area_index
+
+    async def async_query_states(
+        self,
+        selector: Union[str, Pattern[str]],
+        fields: Iterable[str] = ("state",),
+    ) -> Tuple[Dict[str, Any], ...]:
+        """
+        Returns a record with the :code:`entity_id` and the given fields of each entity matching :code:`selector`,
+        an :code:`entity_id` glob (e.g. :code:`sensor.*_power`) or a compiled regex.
+        Fields are :code:`state`, :code:`name`, :code:`domain`, :code:`object_id`, :code:`last_changed`, :code:`last_updated` or attribute keys.
+        Entities are selected and projected by a template on the Home Assistant side, so only the requested fields are sent.
+        :code:`POST /api/template`
+        """
+        from .projection import parse_projection, prepare_projection  # pylint: disable=import-outside-toplevel
+
+        template, keys = prepare_projection(selector, fields)
+        return parse_projection(await self.async_get_rendered_template(template), keys)
+
+    async def async_render_templates(
+        self, templates: Dict[str, str]
+    ) -> RenderedTemplates:
+        """
+        Renders many Jinja2 templates with one request, returning their outputs keyed like :code:`templates`.
+        A template that fails to render does not fail the others, its error is kept in :py:attr:`RenderedTemplates.errors`.
+        Outputs are reused for :code:`template_cache_ttl` seconds if it is set.
+        :code:`POST /api/template`
+        """
+        from .templates import RenderedTemplates  # pylint: disable=import-outside-toplevel
+
+        results = RenderedTemplates(templates)
+        rendered: Dict[str, str] = {}
+        errors: Dict[str, BadTemplateError] = {}
+        await self._async_render_batch(
+            results.fill(self.template_cache), rendered, errors
+        )
+        self.template_cache.update(rendered)
+        return results.finish(rendered, errors)
+
+    async def _async_render_batch(
+        self,
+        batch: List[str],
+        rendered: Dict[str, str],
+        errors: Dict[str, BadTemplateError],
+    ) -> None:
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        from .templates import bisect, combine_templates, split_results  # pylint: disable=import-outside-toplevel
+
+        if not batch:
+            return
+        try:
+            if len(batch) == 1:
+                rendered[batch[0]] = await self.async_get_rendered_template(batch[0])
+            else:
+                combined = await self.async_get_rendered_template(
+                    combine_templates(batch)
+                )
+                rendered.update(split_results(combined, batch))
+        except BadTemplateError as err:
+            if len(batch) == 1:
+                errors[batch[0]] = err
+                return
+            await asyncio.gather(
+                *(
+                    self._async_render_batch(half, rendered, errors)
+                    for half in bisect(batch)
+                )
+            )
+
     # API check methods
     async def async_check_api_config(self) -> bool:
         """
@@ -213,18 +428,33 @@ class RawAsyncClient(RawBaseClient):
         return res.get("message") == "API running."
 
     # Entity methods
-    async def async_get_entities(self) -> Dict[str, Group]:
+    async def async_get_entities(self) -> MutableMapping[str, Group]:
         """
         Fetches all entities from the api.
+        Groups and entities are built from the response when they are first accessed.
+        With :code:`revalidate_after` set, served from :py:attr:`revalidator` and refreshed in the background once stale.
+        :code:`GET /api/states`
+        """
+        data = await self.revalidator.async_get("states", self.async_request_states)
+        return self.prepare_entities(cast(List[Dict[str, Any]], data))
+
+    async def async_get_entity_index(self) -> EntityIndex:
+        """
+        Fetches all states and updates :py:attr:`entity_index` with the ones that changed.
+        :code:`GET /api/states`
+        """
+        self.entity_index.refresh(await self.async_get_states())
+        return self.entity_index
+
+    async def async_poll_changes(self) -> StateChanges:
+        """
+        Fetches all states and returns only those added, changed or removed since the last poll.
+        Unchanged states are recognized by their raw :code:`last_updated` and context id and are not parsed.
+        The first poll reports every state as added, and every poll skips the client's caches.
         :code:`GET /api/states`
         """
-        entities: Dict[str, Group] = {}
-        for state in await self.async_get_states():
-            group_id, entity_slug = state.entity_id.split(".")
-            if group_id not in entities:
-                entities[group_id] = Group(group_id=group_id, _client=self)  # type: ignore[arg-type]
-            entities[group_id]._add_entity(entity_slug, state)
-        return entities
+        data = await self.async_request_states(refresh=True)
+        return self.change_tracker.update(cast(List[Dict[str, Any]], data))
 
     async def async_get_entity(
         self,
@@ -257,22 +487,22 @@ class RawAsyncClient(RawBaseClient):
     async def async_get_domains(self) -> Dict[str, Domain]:
         """
         Fetches all :py:class:`Service` 's from the API.
+        With :code:`revalidate_after` set, served from :py:attr:`revalidator` and refreshed in the background once stale.
         :code:`GET /api/services`
         """
-        data = await self.async_request("services")
-        domains = map(
-            lambda json: Domain.from_json(json, client=cast(Client, self)),
-            cast(Tuple[Dict[str, Any], ...], data),
+        data = await self.revalidator.async_get(
+            "services", lambda refresh: self.async_request("services", refresh=refresh)
         )
-        return {domain.domain_id: domain for domain in domains}
+        return self.service_registry.update(cast(List[Dict[str, Any]], data))
 
     async def async_get_domain(self, domain_id: str) -> Optional[Domain]:
         """
         Fetches all :py:class:`Service`'s under a particular service :py:class:`Domain`.
-        Uses cached data from :py:meth:`get_domains` if available.
+        Served from :py:attr:`service_registry` unless it is stale.
         """
-        domains = await self.async_get_domains()
-        return domains.get(domain_id)
+        if self.service_registry.stale:
+            await self.async_get_domains()
+        return self.service_registry.get_domain(domain_id)
 
     async def async_trigger_service(
         self,
@@ -282,8 +512,10 @@ class RawAsyncClient(RawBaseClient):
     ) -> Tuple[State, ...]:
         """
         Tells Home Assistant to trigger a service, returns all states changed while in the process of being called.
+        Raises :py:class:`MalformedInputError` without a request if the service is cached and the data does not fit its fields.
         :code:`POST /api/services/<domain>/<service>`
         """
+        self.service_registry.validate(domain, service, service_data)
         data = await self.async_request(
             f"services/{domain}/{service}",
             method="POST",
@@ -292,6 +524,28 @@ class RawAsyncClient(RawBaseClient):
         return tuple(map(State.from_json, cast(List[Dict[Any, Any]], data)))
 
     # EntityState methods
+    async def async_request_states(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Requests the json of all states, skipping the HTTP cache with :code:`refresh`.
+        If :code:`states_fingerprint` is enabled, renders a fingerprint of all states first
+        and only downloads them again when it differs from the last download.
+        :code:`GET /api/states`
+        """
+        freshness = self.states_freshness
+        if not freshness.enabled:
+            return cast(
+                List[Dict[str, Any]], await self.async_request("states", refresh=refresh)
+            )
+        fingerprint = await self.async_get_rendered_template(freshness.template)
+        data = freshness.get(fingerprint)
+        if data is None:
+            # A cached response could be older than the fingerprint it is stored with.
+            data = cast(
+                List[Dict[str, Any]], await self.async_request("states", refresh=True)
+            )
+            freshness.store(fingerprint, data)
+        return data
+
     async def async_get_state(  # pylint: disable=duplicate-code
         self,
         *,
@@ -330,9 +584,10 @@ class RawAsyncClient(RawBaseClient):
     async def async_get_states(self) -> Tuple[State, ...]:
         """
         Gets the states of all entities within homeassistant.
+        With :code:`revalidate_after` set, served from :py:attr:`revalidator` and refreshed in the background once stale.
         :code:`GET /api/states`
         """
-        data = await self.async_request("states")
+        data = await self.revalidator.async_get("states", self.async_request_states)
         return tuple(map(State.from_json, cast(List[Dict[Any, Any]], data)))
 
     # Event methods
@@ -342,22 +597,22 @@ class RawAsyncClient(RawBaseClient):
         :code:`GET /api/events`
         """
         data = await self.async_request("events")
-        return tuple(
+        events = tuple(
             map(
                 lambda json: Event.from_json(json, client=cast(Client, self)),
                 cast(List[Dict[str, Any]], data),
             )
         )
+        self.metadata.set_events(events)
+        return events
 
     async def async_get_event(self, name: str) -> Optional[Event]:
         """
         Gets the :py:class:`Event` with the specified name if it has at least one listener.
-        Uses cached data from :py:meth:`get_events` if available.
+        Served from :py:attr:`metadata`, which is refreshed in the background.
         """
-        for event in await self.async_get_events():
-            if event.event == name.strip().lower():
-                return event
-        return None
+        await self.metadata.async_ensure()
+        return self.metadata.get_event(name)
 
     async def async_fire_event(self, event_type: str, **event_data: Any) -> str:
         """
@@ -374,7 +629,8 @@ class RawAsyncClient(RawBaseClient):
     async def async_get_components(self) -> Tuple[str, ...]:
         """
         Returns a tuple of all registered components.
+        Served from :py:attr:`metadata`, which is refreshed in the background.
         :code:`GET /api/components`
         """
-        data = await self.async_request("components")
-        return tuple(cast(List[str], data))
+        await self.metadata.async_ensure()
+        return self.metadata.components
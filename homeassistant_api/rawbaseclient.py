@@ -1,11 +1,75 @@
 """Module for parent RawWrapper class"""
 
 import re
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta, timezone
 from posixpath import join
-from typing import Dict, Iterable, Optional, Tuple, Union, Any
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    Any,
+    cast,
+    overload,
+)
 
-from .models import Entity
+from .models import Entity, Group, LazyDict
+
+if TYPE_CHECKING:
+    from homeassistant_api import Client
+
+    from .areas import AreaIndex
+    from .changes import ChangeTracker
+    from .freshness import StatesFreshness
+    from .index import EntityIndex
+    from .logbook import LogbookCache
+    from .metadata import MetadataSnapshot
+    from .recording import Recorder
+    from .registry import ServiceRegistry
+    from .responsecache import ResponseCache
+    from .revalidation import Revalidator
+    from .templates import TemplateCache
+
+T = TypeVar("T")
+
+
+class _helper(Generic[T]):  # pylint: disable=invalid-name
+    """
+    Like :py:func:`functools.cached_property`, sets up a helper of the client the first time it is used,
+    so its module is only imported then. Threads using it at the same time get the same helper.
+    """
+
+    lock = threading.RLock()
+
+    def __init__(self, build: Callable[[Any], T]) -> None:
+        self.build = build
+        self.name = build.__name__
+        self.__doc__ = build.__doc__
+
+    @overload
+    def __get__(self, client: None, owner: Any = None) -> "_helper[T]":
+        ...
+
+    @overload
+    def __get__(self, client: object, owner: Any = None) -> T:
+        ...
+
+    def __get__(self, client: Optional[object], owner: Any = None) -> Union[T, "_helper[T]"]:
+        if client is None:
+            return self
+        with self.lock:
+            # Once set, the instance attribute is found before this descriptor.
+            if self.name not in vars(client):
+                vars(client)[self.name] = self.build(client)
+        return cast(T, vars(client)[self.name])
 
 
 class RawBaseClient:
@@ -14,6 +78,7 @@ class RawBaseClient:
     api_url: str
     token: str
     global_request_kwargs: Dict[str, Any]
+    recorder: Optional["Recorder"]
 
     def __init__(
         self,
@@ -21,12 +86,41 @@ class RawBaseClient:
         token: str,
         *,
         global_request_kwargs: Optional[Dict[str, str]] = None,
+        record_to: Optional[str] = None,
+        service_registry_ttl: Optional[float] = 300,
+        check_service_values: bool = False,
+        metadata_refresh_interval: Optional[float] = 300,
+        states_fingerprint: bool = False,
+        template_cache_ttl: float = 0,
+        area_index_ttl: Optional[float] = 300,
+        logbook_cache_size: int = 0,
+        revalidate_after: float = 0,
+        stale_grace: float = 60,
+        response_cache_ttl: float = 0,
     ) -> None:
         if global_request_kwargs is None:
             global_request_kwargs = {}
         self.api_url = api_url
         self.token = token
         self.global_request_kwargs = global_request_kwargs
+        self.recorder = None
+        if record_to is not None:
+            from .recording import Recorder  # pylint: disable=import-outside-toplevel
+
+            self.recorder = Recorder(record_to)
+        # The helpers below are set up from these the first time they are used.
+        self._helper_options: Dict[str, Any] = {
+            "service_registry_ttl": service_registry_ttl,
+            "check_service_values": check_service_values,
+            "metadata_refresh_interval": metadata_refresh_interval,
+            "states_fingerprint": states_fingerprint,
+            "template_cache_ttl": template_cache_ttl,
+            "area_index_ttl": area_index_ttl,
+            "logbook_cache_size": logbook_cache_size,
+            "revalidate_after": revalidate_after,
+            "stale_grace": stale_grace,
+            "response_cache_ttl": response_cache_ttl,
+        }
 
         if not api_url.endswith("/"):
             self.api_url += "/"
@@ -34,6 +128,98 @@ class RawBaseClient:
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.api_url!r})"
 
+    # pylint: disable=import-outside-toplevel
+    @_helper
+    def service_registry(self) -> "ServiceRegistry":
+        """The services of Home Assistant, cached for checking service calls."""
+        from .registry import ServiceRegistry
+
+        return ServiceRegistry(
+            cast("Client", self),
+            ttl=self._helper_options["service_registry_ttl"],
+            check_values=self._helper_options["check_service_values"],
+        )
+
+    @_helper
+    def metadata(self) -> "MetadataSnapshot":
+        """The events, components and config of Home Assistant, cached and refreshed in the background."""
+        from .metadata import MetadataSnapshot
+
+        return MetadataSnapshot(
+            cast("Client", self),
+            refresh_interval=self._helper_options["metadata_refresh_interval"],
+        )
+
+    @_helper
+    def entity_index(self) -> "EntityIndex":
+        """The index of the states last fetched, for :py:meth:`query_states`."""
+        from .index import EntityIndex
+
+        return EntityIndex()
+
+    @_helper
+    def change_tracker(self) -> "ChangeTracker":
+        """The states last seen by :py:meth:`poll_changes`."""
+        from .changes import ChangeTracker
+
+        return ChangeTracker()
+
+    @_helper
+    def states_freshness(self) -> "StatesFreshness":
+        """The fingerprint of the states last fetched, used with :code:`states_fingerprint`."""
+        from .freshness import StatesFreshness
+
+        return StatesFreshness(self._helper_options["states_fingerprint"])
+
+    @_helper
+    def template_cache(self) -> "TemplateCache":
+        """The outputs of :py:meth:`render_templates`, keyed by template text."""
+        from .templates import TemplateCache
+
+        return TemplateCache(self._helper_options["template_cache_ttl"])
+
+    @_helper
+    def area_index(self) -> "AreaIndex":
+        """The areas and devices of Home Assistant, cached for :py:meth:`get_area_index`."""
+        from .areas import AreaIndex
+
+        return AreaIndex(ttl=self._helper_options["area_index_ttl"])
+
+    @_helper
+    def logbook_cache(self) -> "LogbookCache":
+        """The logbook entries cached by the time range they cover."""
+        from .logbook import LogbookCache
+
+        return LogbookCache(self._helper_options["logbook_cache_size"])
+
+    @_helper
+    def revalidator(self) -> "Revalidator":
+        """The responses of :py:meth:`get_states`, :py:meth:`get_entities` and :py:meth:`get_domains` kept in memory."""
+        from .revalidation import Revalidator
+
+        return Revalidator(
+            self._helper_options["revalidate_after"], self._helper_options["stale_grace"]
+        )
+
+    @_helper
+    def response_cache(self) -> "ResponseCache":
+        """The processed responses of :code:`GET` requests, keyed by path and query parameters."""
+        from .responsecache import ResponseCache
+
+        return ResponseCache(self._helper_options["response_cache_ttl"])
+
+    # pylint: enable=import-outside-toplevel
+
+    def data_age(self, endpoint: str) -> Optional[float]:
+        """
+        Returns how many seconds old the data last served for :code:`endpoint`
+        (:code:`"states"`, :code:`"services"` or :code:`"config"`) is,
+        or :code:`None` if it is not kept in memory and every read fetches it.
+        """
+        if endpoint == "config":
+            return self.metadata.age
+        return self.revalidator.age(endpoint)
+
     def endpoint(self, *path: str) -> str:
         """Joins the api base url with a local path to an absolute url"""
         return join(self.api_url, *path)
@@ -96,6 +282,22 @@ class RawBaseClient:
         assert entity_id is not None
         return self.format_entity_id(entity_id)
 
+    def prepare_entities(self, data: List[Dict[str, Any]]) -> MutableMapping[str, Group]:
+        """
+        Pre-logic for `Client.get_entities` and `Client.async_get_entities`.
+        Groups json states by their group, building each :py:class:`Group` only when it is first accessed.
+        """
+        grouped: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for json in data:
+            group_id, slug = json["entity_id"].split(".")
+            grouped.setdefault(group_id, {})[slug] = json
+        return LazyDict(
+            grouped,
+            lambda group_id, states: Group.from_json(
+                group_id, states, client=cast("Client", self)
+            ),
+        )
+
     @staticmethod
     def prepare_get_entity_histories_params(
         entities: Optional[Tuple[Entity, ...]] = None,
@@ -103,6 +305,8 @@ class RawBaseClient:
         # Defaults to 1 day before. https://developers.home-assistant.io/docs/api/rest/
         end_timestamp: Optional[datetime] = None,
         significant_changes_only: bool = False,
+        minimal_response: bool = False,
+        no_attributes: bool = False,
     ) -> Tuple[Dict[str, Optional[str]], str]:
 
         """Pre-logic for `Client.get_entity_histories` and `Client.async_get_entity_histories`."""
@@ -115,6 +319,10 @@ class RawBaseClient:
             ] = end_timestamp.isoformat()  # Params are automatically URL encoded
         if significant_changes_only:
             params["significant_changes_only"] = None
+        if minimal_response:
+            params["minimal_response"] = None
+        if no_attributes:
+            params["no_attributes"] = None
         if start_timestamp is not None:
             url = join("history/period/", start_timestamp.isoformat())
         else:
@@ -150,3 +358,31 @@ class RawBaseClient:
         else:
             url = "logbook"
         return params, url
+
+    @staticmethod
+    def prepare_logbook_range(
+        filter_entities: Optional[Union[str, Iterable[str]]],
+        start_timestamp: datetime,
+        end_timestamp: Optional[Union[str, datetime]],
+        margin: float = 0,
+    ) -> Tuple[str, datetime, datetime, datetime]:
+        """
+        Pre-logic for reading logbook entries through :py:attr:`logbook_cache`.
+        Returns the cache key of the entity filter and the range to read in UTC,
+        which ends a day after the start like Home Assistant's default and never in the future,
+        with the time up to which the range can be cached, :code:`margin` seconds before now.
+        Naive datetimes are taken as local time.
+        """
+        if isinstance(end_timestamp, str):
+            end_timestamp = datetime.fromisoformat(end_timestamp)
+        start = start_timestamp.astimezone(timezone.utc)
+        if end_timestamp is None:
+            end = start + timedelta(days=1)
+        else:
+            end = end_timestamp.astimezone(timezone.utc)
+        now = datetime.now(timezone.utc)
+        end = max(min(end, now), start)
+        settled = max(min(end, now - timedelta(seconds=margin)), start)
+        from .logbook import filter_key  # pylint: disable=import-outside-toplevel
+
+        return filter_key(filter_entities), start, settled, end
@@ -1,33 +1,48 @@
 """Module for all interaction with homeassistant."""
 from __future__ import annotations
 
+import copy
 import json
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from posixpath import join
 from typing import (
     TYPE_CHECKING,
     Any,
     Dict,
     Generator,
+    Iterable,
     List,
     Literal,
+    MutableMapping,
     Optional,
+    Pattern,
     Tuple,
     Union,
     cast,
 )
+from urllib.parse import quote
 
-import requests
-import requests_cache
-
-from .errors import BadTemplateError, RequestError, RequestTimeoutError
+from .errors import (
+    BadRequestError,
+    BadTemplateError,
+    RequestTimeoutError,
+)
 from .models import Domain, Entity, Event, Group, History, LogbookEntry, State
 from .processing import Processing, ResponseType
 from .rawbaseclient import RawBaseClient
 
 if TYPE_CHECKING:
+    import requests
+    import requests_cache
+
     from homeassistant_api import Client
+
+    from .areas import AreaIndex
+    from .changes import StateChanges
+    from .index import EntityIndex
+    from .templates import RenderedTemplates
 else:
     Client = None  # pylint: disable=invalid-name
 
@@ -45,6 +60,8 @@ class RawClient(RawBaseClient):
     """  # pylint: disable=line-too-long
 
     cache_session: Union[requests_cache.CachedSession, requests.Session]
+    use_async: bool = False
+    verify_ssl: bool = True
 
     def __init__(
         self,
@@ -55,20 +72,64 @@ class RawClient(RawBaseClient):
             Literal[None],
         ] = None,  # Explicitly disable cache with cache_session=False
         verify_ssl: bool = True,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_policy: str = "lru",
+        cache_compression: Optional[str] = None,
+        shared_cache: Optional[str] = None,
         **kwargs,
     ):
         RawBaseClient.__init__(self, *args, **kwargs)
-        self.global_request_kwargs["verify"] = verify_ssl
+        self.verify_ssl = verify_ssl
+        self.cache_session = self.build_cache_session(
+            cache_session,
+            cache_max_bytes=cache_max_bytes,
+            cache_policy=cache_policy,
+            cache_compression=cache_compression,
+            shared_cache=shared_cache,
+        )
+
+    @staticmethod
+    def build_cache_session(
+        cache_session: Union[
+            requests_cache.CachedSession,
+            Literal[False],
+            Literal[None],
+        ] = None,
+        *,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        cache_policy: str = "lru",
+        cache_compression: Optional[str] = None,
+        shared_cache: Optional[str] = None,
+    ) -> Union[requests_cache.CachedSession, requests.Session]:
+        """Returns :code:`cache_session`, a plain session if it is :code:`False` or the default cached session if it is :code:`None`."""
+        import requests  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
         if cache_session is False:
-            self.cache_session = requests.Session()
-        elif cache_session is None:
-            self.cache_session = requests_cache.CachedSession(  # type: ignore[attr-defined]
-                cache_name="default_cache",
-                backend="memory",
-                expire_after=300,
+            return requests.Session()
+        if cache_session is not None:
+            return cache_session
+        # The cache library is only loaded when the default cache is used.
+        import requests_cache  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        from .boundedcache import BoundedCache  # pylint: disable=import-outside-toplevel
+
+        if shared_cache is not None:
+            from .sharedcache import (  # pylint: disable=import-outside-toplevel
+                SharedCache,
+                SharedCachedSession,
             )
-        else:
-            self.cache_session = cache_session
+
+            return SharedCachedSession(backend=SharedCache(shared_cache), expire_after=300)
+        backend = BoundedCache(
+            "default_cache",
+            cache_max_bytes,
+            policy=cache_policy,
+            compression=cache_compression,
+        )
+        return requests_cache.CachedSession(  # type: ignore[attr-defined]
+            backend=backend,
+            expire_after=300,
+        )
 
     def __enter__(self) -> "RawClient":
         logger.debug("Entering cached requests session %r.", self.cache_session)
@@ -79,6 +140,8 @@ class RawClient(RawBaseClient):
     def __exit__(self, _, __, ___) -> None:
         logger.debug("Exiting requests session %r", self.cache_session)
         self.cache_session.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
     def request(
         self,
@@ -86,13 +149,26 @@ class RawClient(RawBaseClient):
         method="GET",
         headers: Dict[str, str] | None = None,
         decode_bytes: bool = True,
+        refresh: bool = False,
         **kwargs,
     ) -> Any:
-        """Base method for making requests to the api"""
+        """
+        Base method for making requests to the api.
+        With :code:`refresh`, cached responses are skipped and replaced by the new one.
+        """
+        import requests  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        cache_key, cached = self.response_cache.lookup(method, path, kwargs.get("params"))
+        if cached is not None and decode_bytes and not refresh:
+            return cached
         try:
             if self.global_request_kwargs is not None:
                 kwargs.update(self.global_request_kwargs)
+            kwargs.setdefault("verify", self.verify_ssl)
+            if refresh and hasattr(self.cache_session, "cache"):
+                kwargs["force_refresh"] = True
             logger.debug("%s request to %s", method, self.endpoint(path))
+            started = time.perf_counter()
             if self.cache_session:
                 resp = self.cache_session.request(
                     method,
@@ -104,7 +180,21 @@ class RawClient(RawBaseClient):
             raise RequestTimeoutError(
                 f'Home Assistant did not respond in time (timeout: {kwargs.get("timeout", 300)} sec)'
             ) from err
-        return self.response_logic(response=resp, decode_bytes=decode_bytes)
+        if self.recorder is not None:
+            self.recorder.record(
+                method,
+                self.endpoint(path),
+                status=resp.status_code,
+                headers=dict(resp.headers),
+                body=resp.content,
+                elapsed=time.perf_counter() - started,
+                params=kwargs.get("params"),
+                request_body=kwargs.get("json", kwargs.get("data")),
+            )
+        result = self.response_logic(response=resp, decode_bytes=decode_bytes)
+        if cache_key is not None and decode_bytes:
+            self.response_cache.store(cache_key, result)
+        return result
 
     @classmethod
     def response_logic(cls, response: ResponseType, decode_bytes: bool = True) -> Any:
@@ -122,20 +212,47 @@ class RawClient(RawBaseClient):
     def get_config(self) -> Dict[str, Any]:
         """
         Returns the yaml configuration of homeassistant.
+        Served from :py:attr:`metadata`, which is refreshed in the background, as a copy that is safe to change.
         :code:`GET /api/config`
         """
-        return cast(Dict[str, Any], self.request("config"))
+        self.metadata.ensure()
+        return copy.deepcopy(self.metadata.config)
 
     def get_logbook_entries(
         self,
-        *args,
-        **kwargs,
+        filter_entities: Optional[Union[str, Iterable[str]]] = None,
+        start_timestamp: Optional[Union[str, datetime]] = None,  # Defaults to 1 day before
+        end_timestamp: Optional[Union[str, datetime]] = None,
     ) -> Generator[LogbookEntry, None, None]:
         """
         Returns a list of logbook entries from homeassistant.
+        With :code:`logbook_cache_size` set and a :code:`start_timestamp` given,
+        only the parts of the range that are not in :py:attr:`logbook_cache` yet are requested.
         :code:`GET /api/logbook/<timestamp>`
         """
-        params, url = self.prepare_get_logbook_entry_params(*args, **kwargs)
+        if self.logbook_cache and isinstance(start_timestamp, datetime):
+            key, start, settled, end = self.prepare_logbook_range(
+                filter_entities, start_timestamp, end_timestamp, self.logbook_cache.margin
+            )
+            for gap_start, gap_end in self.logbook_cache.missing(key, start, settled):
+                params, url = self.prepare_get_logbook_entry_params(
+                    filter_entities, gap_start, gap_end
+                )
+                data = self.request(url, params=params)
+                self.logbook_cache.add(
+                    key, gap_start, gap_end, [LogbookEntry.parse_obj(entry) for entry in data]
+                )
+            # The range can already be evicted again if it holds more than logbook_cache_size entries.
+            if (cached := self.logbook_cache.entries(key, start, settled)) is not None:
+                yield from cached
+                if settled == end:
+                    return
+                # The recorder may not have committed the last seconds yet, so they are requested without caching.
+                start = settled
+            start_timestamp, end_timestamp = start, end
+        params, url = self.prepare_get_logbook_entry_params(
+            filter_entities, start_timestamp, end_timestamp
+        )
         data = self.request(url, params=params)
         for entry in data:
             yield LogbookEntry.parse_obj(entry)
@@ -147,9 +264,14 @@ class RawClient(RawBaseClient):
         # Defaults to 1 day before. https://developers.home-assistant.io/docs/api/rest/
         end_timestamp: Optional[datetime] = None,
         significant_changes_only: bool = False,
+        minimal_response: bool = False,
+        no_attributes: bool = False,
     ) -> Generator[History, None, None]:
         """
         Yields entity state histories. See docs on the :py:class:`History` model.
+        :code:`minimal_response` leaves out everything but :code:`state` and :code:`last_changed`
+        from states other than the first and :code:`no_attributes` leaves out attributes,
+        which can shrink the response by an order of magnitude.
         :code:`GET /api/history/period/<timestamp>`
         """
         params, url = self.prepare_get_entity_histories_params(
@@ -157,6 +279,8 @@ class RawClient(RawBaseClient):
             start_timestamp=start_timestamp,
             end_timestamp=end_timestamp,
             significant_changes_only=significant_changes_only,
+            minimal_response=minimal_response,
+            no_attributes=no_attributes,
         )
         data = self.request(
             url,
@@ -165,6 +289,87 @@ class RawClient(RawBaseClient):
         for states in data:
             yield History.parse_obj({"states": states})
 
+    def export_history(
+        self,
+        entity_ids: Iterable[str],
+        start_timestamp: datetime,
+        end_timestamp: datetime,
+        path: str,
+        *,
+        format: str = "csv",  # pylint: disable=redefined-builtin
+        window: timedelta = timedelta(days=1),
+        row_group_size: int = 50_000,
+    ) -> int:
+        """
+        Streams the state history of entities to a :code:`"csv"`, :code:`"parquet"` or :code:`"arrow"` file
+        and returns the number of rows written.
+        History is requested one :code:`window` at a time and written in batches of :code:`row_group_size` rows
+        straight from the json, so memory use does not grow with the time range.
+        Parquet and Arrow need :code:`pyarrow`.
+        :code:`GET /api/history/period/<timestamp>`
+        """
+        from .export import HISTORY_COLUMNS, history_rows, time_windows, write_rows  # pylint: disable=import-outside-toplevel
+
+        entity_filter = quote(",".join(entity_ids))
+
+        def responses() -> Generator[List[Dict[str, Any]], None, None]:
+            for i, (start, end) in enumerate(
+                time_windows(start_timestamp, end_timestamp, window)
+            ):
+                params: Dict[str, Optional[str]] = {
+                    "filter_entity_id": entity_filter,
+                    "end_time": quote(end.isoformat()),
+                }
+                if i:  # The state at the start of a window was the last one of the previous window.
+                    params["skip_initial_state"] = None
+                yield from self.request(
+                    join("history/period", quote(start.isoformat())),
+                    params=self.construct_params(params),
+                )
+
+        return write_rows(
+            history_rows(responses()),
+            path,
+            HISTORY_COLUMNS,
+            format=format,
+            row_group_size=row_group_size,
+        )
+
+    def export_logbook(
+        self,
+        start_timestamp: datetime,
+        end_timestamp: datetime,
+        path: str,
+        *,
+        filter_entities: Optional[Iterable[str]] = None,
+        format: str = "csv",  # pylint: disable=redefined-builtin
+        window: timedelta = timedelta(days=1),
+        row_group_size: int = 50_000,
+    ) -> int:
+        """
+        Streams logbook entries to a :code:`"csv"`, :code:`"parquet"` or :code:`"arrow"` file
+        and returns the number of rows written, like :py:meth:`export_history`.
+        :code:`GET /api/logbook/<timestamp>`
+        """
+        from .export import LOGBOOK_COLUMNS, logbook_rows, time_windows, write_rows  # pylint: disable=import-outside-toplevel
+
+        def responses() -> Generator[Dict[str, Any], None, None]:
+            for start, end in time_windows(start_timestamp, end_timestamp, window):
+                params, url = self.prepare_get_logbook_entry_params(
+                    filter_entities=filter_entities,
+                    start_timestamp=start,
+                    end_timestamp=end,
+                )
+                yield from self.request(url, params=params)
+
+        return write_rows(
+            logbook_rows(responses()),
+            path,
+            LOGBOOK_COLUMNS,
+            format=format,
+            row_group_size=row_group_size,
+        )
+
     def get_rendered_template(self, template: str) -> str:
         """
         Renders a Jinja2 template with Home Assistant context data.
@@ -180,12 +385,78 @@ class RawClient(RawBaseClient):
                     method="POST",
                 ),
             )
-        except RequestError as err:
+        except BadRequestError as err:
             raise BadTemplateError(
                 "Your template is invalid. "
                 "Try debugging it in the developer tools page of homeassistant."
             ) from err
 
+    def get_area_index(self) -> AreaIndex:
+        """
+        Returns :py:attr:`area_index` with the areas and devices of Home Assistant and their entities,
+        fetching it with a single template render if it is stale.
+        :code:`POST /api/template`
+        """
+        if self.area_index.stale:
+            self.area_index.update(self.get_rendered_template(self.area_index.template))
+        return self.area_index
+
+    def query_states(
+        self,
+        selector: Union[str, Pattern[str]],
+        fields: Iterable[str] = ("state",),
+    ) -> Tuple[Dict[str, Any], ...]:
+        """
+        Returns a record with the :code:`entity_id` and the given fields of each entity matching :code:`selector`,
+        an :code:`entity_id` glob (e.g. :code:`sensor.*_power`) or a compiled regex.
+        Fields are :code:`state`, :code:`name`, :code:`domain`, :code:`object_id`, :code:`last_changed`, :code:`last_updated` or attribute keys.
+        Entities are selected and projected by a template on the Home Assistant side, so only the requested fields are sent.
+        :code:`POST /api/template`
+        """
+        from .projection import parse_projection, prepare_projection  # pylint: disable=import-outside-toplevel
+
+        template, keys = prepare_projection(selector, fields)
+        return parse_projection(self.get_rendered_template(template), keys)
+
+    def render_templates(self, templates: Dict[str, str]) -> RenderedTemplates:
+        """
+        Renders many Jinja2 templates with one request, returning their outputs keyed like :code:`templates`.
+        A template that fails to render does not fail the others, its error is kept in :py:attr:`RenderedTemplates.errors`.
+        Outputs are reused for :code:`template_cache_ttl` seconds if it is set.
+        :code:`POST /api/template`
+        """
+        from .templates import RenderedTemplates  # pylint: disable=import-outside-toplevel
+
+        results = RenderedTemplates(templates)
+        rendered: Dict[str, str] = {}
+        errors: Dict[str, BadTemplateError] = {}
+        self._render_batch(results.fill(self.template_cache), rendered, errors)
+        self.template_cache.update(rendered)
+        return results.finish(rendered, errors)
+
+    def _render_batch(
+        self,
+        batch: List[str],
+        rendered: Dict[str, str],
+        errors: Dict[str, BadTemplateError],
+    ) -> None:
+        from .templates import bisect, combine_templates, split_results  # pylint: disable=import-outside-toplevel
+
+        if not batch:
+            return
+        try:
+            if len(batch) == 1:
+                rendered[batch[0]] = self.get_rendered_template(batch[0])
+            else:
+                combined = self.get_rendered_template(combine_templates(batch))
+                rendered.update(split_results(combined, batch))
+        except BadTemplateError as err:
+            if len(batch) == 1:
+                errors[batch[0]] = err
+                return
+            for half in bisect(batch):
+                self._render_batch(half, rendered, errors)
+
     # API check methods
     def check_api_config(self) -> bool:
         """
@@ -207,21 +478,33 @@ class RawClient(RawBaseClient):
         return cast(Dict[str, Any], res).get("message") == "API running."
 
     # Entity methods
-    def get_entities(self) -> Dict[str, Group]:
+    def get_entities(self) -> MutableMapping[str, Group]:
         """
         Fetches all entities from the api and returns them as a dictionary of :py:class:`Group`'s.
+        Groups and entities are built from the response when they are first accessed.
+        With :code:`revalidate_after` set, served from :py:attr:`revalidator` and refreshed in the background once stale.
         :code:`GET /api/states`
         """
-        entities: Dict[str, Group] = {}
-        for state in self.get_states():
-            group_id, entity_slug = state.entity_id.split(".")
-            if group_id not in entities:
-                entities[group_id] = Group(
-                    group_id=group_id,
-                    _client=self,  # type: ignore[arg-type]
-                )
-            entities[group_id]._add_entity(entity_slug, state)
-        return entities
+        data = self.revalidator.get("states", self.request_states)
+        return self.prepare_entities(cast(List[Dict[str, Any]], data))
+
+    def get_entity_index(self) -> EntityIndex:
+        """
+        Fetches all states and updates :py:attr:`entity_index` with the ones that changed.
+        :code:`GET /api/states`
+        """
+        self.entity_index.refresh(self.get_states())
+        return self.entity_index
+
+    def poll_changes(self) -> StateChanges:
+        """
+        Fetches all states and returns only those added, changed or removed since the last poll.
+        Unchanged states are recognized by their raw :code:`last_updated` and context id and are not parsed.
+        The first poll reports every state as added, and every poll skips the client's caches.
+        :code:`GET /api/states`
+        """
+        data = self.request_states(refresh=True)
+        return self.change_tracker.update(cast(List[Dict[str, Any]], data))
 
     def get_entity(
         self,
@@ -257,21 +540,22 @@ class RawClient(RawBaseClient):
     def get_domains(self) -> Dict[str, Domain]:
         """
         Fetches all :py:class:`Service` 's from the API.
+        With :code:`revalidate_after` set, served from :py:attr:`revalidator` and refreshed in the background once stale.
         :code:`GET /api/services`
         """
-        data = self.request("services")
-        domains = map(
-            lambda json: Domain.from_json(json, client=cast(Client, self)),
-            cast(Tuple[Dict[str, Any], ...], data),
+        data = self.revalidator.get(
+            "services", lambda refresh: self.request("services", refresh=refresh)
         )
-        return {domain.domain_id: domain for domain in domains}
+        return self.service_registry.update(cast(List[Dict[str, Any]], data))
 
     def get_domain(self, domain_id: str) -> Optional[Domain]:
         """
         Fetches all :py:class:`Service`'s under a particular service :py:class:`Domain`.
-        Uses cached data from :py:meth:`get_domains` if available.
+        Served from :py:attr:`service_registry` unless it is stale.
         """
-        return self.get_domains().get(domain_id)
+        if self.service_registry.stale:
+            self.get_domains()
+        return self.service_registry.get_domain(domain_id)
 
     def trigger_service(
         self,
@@ -281,8 +565,10 @@ class RawClient(RawBaseClient):
     ) -> Tuple[State, ...]:
         """
         Tells Home Assistant to trigger a service, returns all states changed while in the process of being called.
+        Raises :py:class:`MalformedInputError` without a request if the service is cached and the data does not fit its fields.
         :code:`POST /api/services/<domain>/<service>`
         """
+        self.service_registry.validate(domain, service, service_data)
         data = self.request(
             join("services", domain, service),
             method="POST",
@@ -291,6 +577,24 @@ class RawClient(RawBaseClient):
         return tuple(map(State.from_json, cast(List[Dict[str, Any]], data)))
 
     # EntityState methods
+    def request_states(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Requests the json of all states, skipping the HTTP cache with :code:`refresh`.
+        If :code:`states_fingerprint` is enabled, renders a fingerprint of all states first
+        and only downloads them again when it differs from the last download.
+        :code:`GET /api/states`
+        """
+        freshness = self.states_freshness
+        if not freshness.enabled:
+            return cast(List[Dict[str, Any]], self.request("states", refresh=refresh))
+        fingerprint = self.get_rendered_template(freshness.template)
+        data = freshness.get(fingerprint)
+        if data is None:
+            # A cached response could be older than the fingerprint it is stored with.
+            data = cast(List[Dict[str, Any]], self.request("states", refresh=True))
+            freshness.store(fingerprint, data)
+        return data
+
     def get_state(  # pylint: disable=duplicate-code
         self,
         *,
@@ -329,9 +633,10 @@ class RawClient(RawBaseClient):
     def get_states(self) -> Tuple[State, ...]:
         """
         Gets the states of all entities within homeassistant.
+        With :code:`revalidate_after` set, served from :py:attr:`revalidator` and refreshed in the background once stale.
         :code:`GET /api/states`
         """
-        data = self.request("states")
+        data = self.revalidator.get("states", self.request_states)
         states = map(State.from_json, cast(List[Dict[str, Any]], data))
         return tuple(states)
 
@@ -342,22 +647,22 @@ class RawClient(RawBaseClient):
         :code:`GET /api/events`
         """
         data = self.request("events")
-        return tuple(
+        events = tuple(
             map(
                 lambda json: Event.from_json(json, client=cast(Client, self)),
                 cast(List[Dict[str, Any]], data),
             )
         )
+        self.metadata.set_events(events)
+        return events
 
     def get_event(self, name: str) -> Optional[Event]:
         """
         Gets the :py:class:`Event` with the specified name if it has at least one listener.
-        Uses cached data from :py:meth:`get_events` if available.
+        Served from :py:attr:`metadata`, which is refreshed in the background.
         """
-        for event in self.get_events():
-            if event.event == name.strip().lower():
-                return event
-        return None
+        self.metadata.ensure()
+        return self.metadata.get_event(name)
 
     def fire_event(self, event_type: str, **event_data) -> Optional[str]:
         """
@@ -374,6 +679,8 @@ class RawClient(RawBaseClient):
     def get_components(self) -> Tuple[str, ...]:
         """
         Returns a tuple of all registered components.
+        Served from :py:attr:`metadata`, which is refreshed in the background.
         :code:`GET /api/components`
         """
-        return tuple(self.request("components"))
+        self.metadata.ensure()
+        return self.metadata.components
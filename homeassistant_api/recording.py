@@ -0,0 +1,394 @@
+"""Module for recording API traffic to disk and replaying it back offline."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import io
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import (
+    IO,
+    Any,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPResponse
+
+from .errors import ReplayMissError
+
+logger = logging.getLogger(__name__)
+
+RequestKey = Tuple[str, str, str, str]
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    """Opens a recording file, transparently (de)compressing :code:`.gz` files."""
+    if path.endswith(".gz"):
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return open(path, mode, encoding="utf-8")
+
+
+def canonical_body(body: Any) -> str:
+    """Normalizes a request body so equal json payloads produce equal strings."""
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return body
+    return json.dumps(body, sort_keys=True, separators=(",", ":"))
+
+
+def request_key(
+    method: str,
+    url: str,
+    params: Union[Dict[str, Any], str, None] = None,
+    body: Any = None,
+) -> RequestKey:
+    """
+    Builds the lookup key of a request from its method, url, query parameters and body.
+    The host is ignored so recordings can be replayed against any :code:`api_url`.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if isinstance(params, str):
+        query += parse_qsl(params, keep_blank_values=True)
+    elif params:
+        query += [(k, str(v)) for k, v in params.items() if v is not None]
+    return (
+        method.upper(),
+        unquote(parts.path),
+        urlencode(sorted(query)),
+        canonical_body(body),
+    )
+
+
+class Exchange(NamedTuple):
+    """A single recorded request and the response Home Assistant gave for it."""
+
+    method: str
+    url: str
+    query: str
+    request_body: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    elapsed: float
+    offset: float
+
+    @property
+    def key(self) -> RequestKey:
+        """The key this exchange is looked up by during replay."""
+        return (
+            self.method,
+            unquote(urlsplit(self.url).path),
+            self.query,
+            self.request_body,
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        """Serializes the exchange into one line of a recording file."""
+        data: Dict[str, Any] = {
+            "method": self.method,
+            "url": self.url,
+            "query": self.query,
+            "request_body": self.request_body,
+            "status": self.status,
+            "headers": self.headers,
+            "elapsed": round(self.elapsed, 6),
+            "offset": round(self.offset, 6),
+        }
+        try:
+            data["body"] = self.body.decode("utf-8")
+        except UnicodeDecodeError:
+            data["body"] = base64.b64encode(self.body).decode("ascii")
+            data["body_encoding"] = "base64"
+        return data
+
+    @classmethod
+    def from_json(cls, json: Dict[str, Any]) -> "Exchange":
+        """Constructs an exchange from one line of a recording file."""
+        if json.get("body_encoding") == "base64":
+            body = base64.b64decode(json["body"])
+        else:
+            body = json["body"].encode("utf-8")
+        return cls(
+            method=json["method"],
+            url=json["url"],
+            query=json["query"],
+            request_body=json["request_body"],
+            status=json["status"],
+            headers=json["headers"],
+            body=body,
+            elapsed=json["elapsed"],
+            offset=json["offset"],
+        )
+
+
+class Recorder:
+    """
+    Writes request/response pairs to a JSON Lines recording file, replacing any file already at :code:`path`.
+    Paths ending in :code:`.gz` are gzip compressed.
+    """
+
+    path: str
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = _open(path, "w")
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.path!r})"
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        *,
+        status: int,
+        headers: Dict[str, str],
+        body: bytes,
+        elapsed: float,
+        params: Union[Dict[str, Any], str, None] = None,
+        request_body: Any = None,
+    ) -> Exchange:
+        """Writes a single exchange to the recording file."""
+        key_method, _, query, canonical_request_body = request_key(
+            method, url, params, request_body
+        )
+        exchange = Exchange(
+            method=key_method,
+            url=url.split("?", 1)[0],
+            query=query,
+            request_body=canonical_request_body,
+            status=status,
+            headers={k.lower(): v for k, v in headers.items()},
+            body=body,
+            elapsed=elapsed,
+            offset=time.perf_counter() - self._started - elapsed,
+        )
+        line = json.dumps(exchange.to_json(), separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+        return exchange
+
+    def close(self) -> None:
+        """Flushes and closes the recording file."""
+        with self._lock:
+            self._file.close()
+
+
+class Recording:
+    """
+    A recording loaded from disk, indexed by request for replay.
+
+    :param path: The recording file written by :py:class:`Recorder`.
+    :param realtime: Answer each response as late as it was answered during the recording, counted from the first replayed request,
+        and never sooner than its recorded latency, instead of answering instantly.
+    :param loop: Start again from the first matching response once a request's responses run out.
+    """
+
+    exchanges: Tuple[Exchange, ...]
+
+    def __init__(self, path: str, realtime: bool = False, loop: bool = False) -> None:
+        with _open(path, "r") as file:
+            self.exchanges = tuple(
+                Exchange.from_json(json.loads(line)) for line in file if line.strip()
+            )
+        self.realtime = realtime
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._index: Dict[RequestKey, List[Exchange]] = defaultdict(list)
+        for exchange in self.exchanges:
+            self._index[exchange.key].append(exchange)
+        self._queues: Dict[RequestKey, Deque[Exchange]] = {}
+        self._started: Optional[float] = None
+        self.rewind()
+
+    def __iter__(self) -> Iterator[Exchange]:
+        return iter(self.exchanges)
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+    def rewind(self) -> None:
+        """Makes every recorded response available again."""
+        with self._lock:
+            self._queues = {key: deque(value) for key, value in self._index.items()}
+            self._started = None
+
+    def match(
+        self,
+        method: str,
+        url: str,
+        params: Union[Dict[str, Any], str, None] = None,
+        body: Any = None,
+    ) -> Exchange:
+        """Returns the next recorded exchange for a request, in recorded order."""
+        key = request_key(method, url, params, body)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue and self.loop and key in self._index:
+                queue = self._queues[key] = deque(self._index[key])
+            if not queue:
+                raise ReplayMissError(
+                    f"No recorded response left for {key[0]} {key[1]}"
+                    + (f"?{key[2]}" if key[2] else "")
+                )
+            exchange = queue.popleft()
+            if self._started is None:
+                # The first replayed request is taken to be sent when it was recorded.
+                self._started = time.perf_counter() - exchange.offset
+            return exchange
+
+    def delay(self, exchange: Exchange) -> float:
+        """Returns how many seconds to wait before answering with :code:`exchange`, :code:`0` unless realtime."""
+        if not self.realtime or self._started is None:
+            return 0
+        answered = self._started + exchange.offset + exchange.elapsed
+        return max(exchange.elapsed, answered - time.perf_counter())
+
+
+class ReplayAdapter(BaseAdapter):
+    """A :py:mod:`requests` transport adapter that answers from a :py:class:`Recording`."""
+
+    def __init__(self, recording: Recording) -> None:
+        super().__init__()
+        self.recording = recording
+
+    def send(  # type: ignore[override]
+        self,
+        request: requests.PreparedRequest,
+        **kwargs: Any,
+    ) -> requests.Response:
+        assert request.method is not None and request.url is not None
+        exchange = self.recording.match(request.method, request.url, body=request.body)
+        delay = self.recording.delay(exchange)
+        if delay:
+            time.sleep(delay)
+        response = requests.Response()
+        response.status_code = exchange.status
+        response.headers = CaseInsensitiveDict(exchange.headers)
+        response._content = exchange.body  # pylint: disable=protected-access
+        # A raw response lets requests_cache store replayed responses like real ones.
+        response.raw = HTTPResponse(
+            body=io.BytesIO(exchange.body),
+            headers=exchange.headers,
+            status=exchange.status,
+            preload_content=False,
+            request_method=request.method,
+            request_url=request.url,
+        )
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers
+        ) or "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class ReplaySession(requests.Session):
+    """
+    A :py:class:`requests.Session` that serves responses from a recording instead of the network.
+    Pass it to :py:class:`Client` as :code:`cache_session`.
+    """
+
+    def __init__(self, path: str, realtime: bool = False, loop: bool = False) -> None:
+        super().__init__()
+        self.recording = Recording(path, realtime=realtime, loop=loop)
+        adapter = ReplayAdapter(self.recording)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+
+class AsyncRecordedResponse:
+    """A replayed response exposing the parts of :py:class:`aiohttp.ClientResponse` the client uses."""
+
+    def __init__(self, exchange: Exchange, url: str) -> None:
+        self.status = exchange.status
+        self.headers = exchange.headers
+        self.method = exchange.method
+        self.url = url
+        self._body = exchange.body
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} [{self.status}] {self.method} {self.url}>"
+
+    async def read(self) -> bytes:
+        """Returns the raw body of the response."""
+        return self._body
+
+    async def text(self) -> str:
+        """Returns the decoded body of the response."""
+        return self._body.decode("utf-8")
+
+    async def json(self) -> Any:
+        """Returns the json decoded body of the response."""
+        return json.loads(self._body)
+
+
+class AsyncReplaySession:
+    """
+    The async equivalent of :py:class:`ReplaySession`.
+    Pass it to :py:class:`Client` as :code:`async_cache_session`.
+    """
+
+    def __init__(self, path: str, realtime: bool = False, loop: bool = False) -> None:
+        self.recording = Recording(path, realtime=realtime, loop=loop)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({len(self.recording)} exchanges)"
+
+    async def __aenter__(self) -> "AsyncReplaySession":
+        return self
+
+    async def __aexit__(self, _, __, ___) -> None:
+        await self.close()
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        params: Union[Dict[str, Any], str, None] = None,
+        json: Any = None,
+        data: Any = None,
+        **kwargs: Any,
+    ) -> AsyncRecordedResponse:
+        """Answers a request with the next matching recorded response."""
+        exchange = self.recording.match(
+            method, url, params, json if json is not None else data
+        )
+        delay = self.recording.delay(exchange)
+        if delay:
+            await asyncio.sleep(delay)
+        return AsyncRecordedResponse(exchange, url)
+
+    async def close(self) -> None:
+        pass
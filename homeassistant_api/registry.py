@@ -0,0 +1,227 @@
+"""Module for the client-side cache of Home Assistant's services."""
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .errors import MalformedInputError
+from .models import Domain, Service, ServiceField
+
+if TYPE_CHECKING:
+    from homeassistant_api import Client
+
+FieldCheck = Callable[[Any], Optional[str]]
+Validator = Callable[[Dict[str, Any]], List[str]]
+
+# Keys accepted by every service that targets entities, devices or areas.
+TARGET_KEYS = frozenset({"entity_id", "device_id", "area_id", "floor_id", "label_id"})
+# Domains whose services accept arbitrary variables besides their declared fields.
+OPEN_DOMAINS = frozenset({"script", "python_script"})
+
+
+def _flatten_fields(fields: Optional[Dict[str, ServiceField]]) -> Dict[str, ServiceField]:
+    """Returns the fields of a service with the fields of collapsible sections inlined."""
+    flat: Dict[str, ServiceField] = {}
+    for name, field in (fields or {}).items():
+        if field.fields is not None:
+            flat.update(_flatten_fields(field.fields))
+        else:
+            flat[name] = field
+    return flat
+
+
+def _number_check(options: Dict[str, Any]) -> FieldCheck:
+    minimum, maximum = options.get("min"), options.get("max")
+
+    def check(value: Any) -> Optional[str]:
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            number = float(value)
+        except (TypeError, ValueError):
+            return f"expected a number, got {value!r}"
+        if minimum is not None and number < minimum:
+            return f"{value!r} is less than the minimum {minimum!r}"
+        if maximum is not None and number > maximum:
+            return f"{value!r} is greater than the maximum {maximum!r}"
+        return None
+
+    return check
+
+
+def _select_check(options: Dict[str, Any]) -> Optional[FieldCheck]:
+    if options.get("custom_value") or not options.get("options"):
+        return None
+    allowed = frozenset(
+        option["value"] if isinstance(option, dict) else option
+        for option in options["options"]
+    )
+    multiple = options.get("multiple", False)
+
+    def check(value: Any) -> Optional[str]:
+        values = value if multiple and isinstance(value, list) else [value]
+        for item in values:
+            if item not in allowed:
+                return f"{item!r} is not one of {sorted(map(str, allowed))}"
+        return None
+
+    return check
+
+
+def _field_check(field: ServiceField) -> Optional[FieldCheck]:
+    """Compiles the check for a single field from its selector, if it has one we understand."""
+    for kind, options in (field.selector or {}).items():
+        options = options or {}
+        if kind == "number":
+            return _number_check(options)
+        if kind == "select":
+            return _select_check(options)
+    return None
+
+
+def compile_validator(service: Service, check_values: bool = False) -> Validator:
+    """
+    Compiles the fields of a :py:class:`Service` into a function that returns
+    the problems with a :code:`service_data` dictionary, if there are any.
+    Only missing required fields and unknown fields are problems, unless :code:`check_values` is set.
+    Then values are also checked against the :code:`number` and :code:`select` selectors of their fields,
+    which are hints for Home Assistant's UI, so the server may accept values they do not allow.
+    """
+    fields = _flatten_fields(service.fields)
+    required: FrozenSet[str] = frozenset(
+        name for name, field in fields.items() if field.required
+    )
+    allowed: Optional[FrozenSet[str]] = frozenset(fields) | TARGET_KEYS
+    if not fields or service.domain.domain_id in OPEN_DOMAINS:
+        allowed = None
+    checks: Tuple[Tuple[str, FieldCheck], ...] = tuple(
+        (name, check)
+        for name, field in fields.items()
+        if check_values and (check := _field_check(field)) is not None
+    )
+
+    def validate(service_data: Dict[str, Any]) -> List[str]:
+        problems = []
+        keys = service_data.keys()
+        if missing := required - keys:
+            problems.append(f"missing required fields {sorted(missing)}")
+        if allowed is not None and (unknown := keys - allowed):
+            problems.append(f"unknown fields {sorted(unknown)}")
+        for name, check in checks:
+            if name in service_data and (problem := check(service_data[name])):
+                problems.append(f"{name}: {problem}")
+        return problems
+
+    return validate
+
+
+class ServiceRegistry:
+    """
+    A cache of the :py:class:`Domain`'s and :py:class:`Service`'s of Home Assistant,
+    indexed by domain and service, that validates :code:`service_data` locally.
+
+    :param client: The client the cached domains belong to.
+    :param ttl: Seconds until the cached services are fetched again. :code:`None` never expires them.
+    :param check_values: Also check values against the selectors of their fields, see :py:func:`compile_validator`.
+    """
+
+    ttl: Optional[float]
+
+    def __init__(
+        self, client: "Client", ttl: Optional[float] = 300, check_values: bool = False
+    ) -> None:
+        self._client = client
+        self.ttl = ttl
+        self.check_values = check_values
+        self._lock = threading.Lock()
+        self._domains: Dict[str, Domain] = {}
+        self._raw: Dict[str, Dict[str, Any]] = {}
+        self._validators: Dict[Tuple[str, str], Validator] = {}
+        self._updated_at: Optional[float] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {len(self._domains)} domains>"
+
+    def __contains__(self, domain_id: object) -> bool:
+        return domain_id in self._domains
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the services have been fetched at least once."""
+        return self._updated_at is not None
+
+    @property
+    def stale(self) -> bool:
+        """Whether the services need to be fetched from Home Assistant again."""
+        if self._updated_at is None:
+            return True
+        return self.ttl is not None and time.monotonic() - self._updated_at > self.ttl
+
+    @property
+    def domains(self) -> Dict[str, Domain]:
+        """A copy of the cached domains indexed by their :code:`domain_id`."""
+        return dict(self._domains)
+
+    def invalidate(self) -> None:
+        """Marks the cache as stale so the next lookup fetches services again."""
+        self._updated_at = None
+
+    def update(self, data: Iterable[Dict[str, Any]]) -> Dict[str, Domain]:
+        """
+        Updates the cache from a :code:`GET /api/services` response.
+        Only domains whose services changed are rebuilt.
+        """
+        with self._lock:
+            raw = {json["domain"]: json for json in data}
+            for domain_id in self._domains.keys() - raw.keys():
+                self._remove_domain(domain_id)
+            for domain_id, json in raw.items():
+                if self._raw.get(domain_id) != json:
+                    self._remove_domain(domain_id)
+                    self._domains[domain_id] = Domain.from_json(json, client=self._client)
+                    self._raw[domain_id] = json
+            self._updated_at = time.monotonic()
+            return dict(self._domains)
+
+    def _remove_domain(self, domain_id: str) -> None:
+        self._domains.pop(domain_id, None)
+        self._raw.pop(domain_id, None)
+        for key in [key for key in self._validators if key[0] == domain_id]:
+            del self._validators[key]
+
+    def get_domain(self, domain_id: str) -> Optional[Domain]:
+        """Returns the cached :py:class:`Domain` with the given :code:`domain_id`."""
+        return self._domains.get(domain_id)
+
+    def get_service(self, domain_id: str, service_id: str) -> Optional[Service]:
+        """Returns the cached :py:class:`Service` of a domain."""
+        if (domain := self._domains.get(domain_id)) is None:
+            return None
+        return domain.get_service(service_id)
+
+    def validate(self, domain_id: str, service_id: str, service_data: Dict[str, Any]) -> None:
+        """
+        Checks :code:`service_data` against the fields of a cached service.
+        Services that are not cached are not checked.
+
+        :raises MalformedInputError: If the data would be rejected by Home Assistant.
+        """
+        if (validator := self._validators.get((domain_id, service_id))) is None:
+            if (service := self.get_service(domain_id, service_id)) is None:
+                return
+            validator = self._validators[(domain_id, service_id)] = compile_validator(
+                service, self.check_values
+            )
+        if problems := validator(service_data):
+            raise MalformedInputError(
+                f"Invalid service data for {domain_id}.{service_id}: {'; '.join(problems)}"
+            )
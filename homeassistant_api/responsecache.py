@@ -0,0 +1,93 @@
+"""
+Module for the client-level cache of processed responses,
+consulted by both :py:meth:`Client.request` and :py:meth:`Client.async_request`
+so a response fetched on either path also serves the other.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl
+
+# Paths of POST requests that do not change anything in Home Assistant, so they keep cached responses.
+READ_ONLY_POSTS = frozenset({"template"})
+
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class ResponseCache:
+    """
+    Caches the processed (json decoded) responses of :code:`GET` requests by path and query parameters
+    for :code:`ttl` seconds, keeping at most :code:`max_entries` of them.
+    Any request that can change something in Home Assistant (e.g. calling a service) clears the cache.
+    Cached responses are shared between callers, so they must not be modified.
+
+    :param ttl: Seconds a response is reused for. :code:`0` disables the cache.
+    :param max_entries: The most responses kept, the least recently used are dropped first.
+    """
+
+    def __init__(self, ttl: float = 0, max_entries: int = 1024) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._responses: "OrderedDict[Key, Tuple[float, Any]]" = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {len(self)} responses ttl={self.ttl}>"
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def __bool__(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def key(
+        path: str, params: Union[Dict[str, Any], str, None] = None
+    ) -> Key:
+        """Builds the same key for equal parameters, whether they are a dict or a query string, in any order."""
+        if isinstance(params, str):
+            pairs = parse_qsl(params, keep_blank_values=True)
+        else:
+            pairs = [(name, "" if value is None else str(value)) for name, value in (params or {}).items()]
+        return path.strip("/"), tuple(sorted(pairs))
+
+    def lookup(
+        self, method: str, path: str, params: Union[Dict[str, Any], str, None] = None
+    ) -> Tuple[Optional[Key], Any]:
+        """
+        Returns the key to store the response of a request under (:code:`None` if it is not cacheable)
+        and the cached response, or :code:`None` on a miss.
+        Clears the cache first if the request can change something.
+        """
+        if not self:
+            return None, None
+        method = method.upper()
+        if method != "GET":
+            if method != "POST" or path.strip("/") not in READ_ONLY_POSTS:
+                self.invalidate()
+            return None, None
+        key = self.key(path, params)
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is None or cached[0] < time.monotonic():
+                self.misses += 1
+                return key, None
+            self.hits += 1
+            self._responses.move_to_end(key)
+            return key, cached[1]
+
+    def store(self, key: Key, response: Any) -> None:
+        """Caches a processed response under a key returned by :py:meth:`lookup`."""
+        with self._lock:
+            self._responses[key] = (time.monotonic() + self.ttl, response)
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_entries:
+                self._responses.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Forgets every cached response."""
+        with self._lock:
+            self._responses.clear()
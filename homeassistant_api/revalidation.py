@@ -0,0 +1,153 @@
+"""Module for serving the last response of an endpoint while a fresh one is fetched in the background."""
+import logging
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Revalidator:
+    """
+    Stale-while-revalidate for whole responses, keyed by endpoint.
+    A response is served as is for :code:`ttl` seconds after it was fetched.
+    For :code:`grace` more seconds it is still served right away, but the first read also starts one refresh
+    in the background, on a thread for sync reads and as a task for async reads.
+    Older responses are fetched again before they are returned.
+    The revalidator keeps the responses itself, so it fetches them with :code:`refresh=True` to skip the HTTP cache.
+
+    :param ttl: Seconds a response is fresh. :code:`0` disables the revalidator, every read fetches.
+    :param grace: Seconds after :code:`ttl` that a stale response is served while it is refreshed.
+    """
+
+    def __init__(self, ttl: float = 0, grace: float = 60) -> None:
+        self.ttl = ttl
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._responses: Dict[str, Tuple[float, Any]] = {}
+        self._refreshing: Dict[str, Any] = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} {len(self._responses)} responses "
+            f"ttl={self.ttl} grace={self.grace}>"
+        )
+
+    def __bool__(self) -> bool:
+        return self.ttl > 0
+
+    def age(self, key: str) -> Optional[float]:
+        """Returns how many seconds ago the response kept for :code:`key` was fetched, :code:`None` if there is none."""
+        with self._lock:
+            cached = self._responses.get(key)
+        return None if cached is None else time.monotonic() - cached[0]
+
+    def store(self, key: str, data: Any) -> None:
+        """Keeps a freshly fetched response."""
+        with self._lock:
+            self._responses[key] = (time.monotonic(), data)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Forgets the response of :code:`key`, or of every endpoint."""
+        with self._lock:
+            if key is None:
+                self._responses.clear()
+            else:
+                self._responses.pop(key, None)
+
+    def _lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Returns the servable response (or :code:`None`) and whether a refresh should be started for it."""
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is None:
+                return None, False
+            fetched, data = cached
+            age = time.monotonic() - fetched
+            if age > self.ttl + self.grace:
+                return None, False
+            if age <= self.ttl or key in self._refreshing:
+                return data, False
+            self._refreshing[key] = None
+            return data, True
+
+    def get(self, key: str, fetch: Callable[..., T]) -> T:
+        """
+        Returns the response of :code:`key`, calling :code:`fetch` now or in the background as needed.
+        :code:`fetch` takes a :code:`refresh` keyword, which is :code:`True` unless the revalidator is disabled.
+        """
+        if not self:
+            return fetch(refresh=False)
+        data, refresh = self._lookup(key)
+        if data is None:
+            data = fetch(refresh=True)
+            self.store(key, data)
+        elif refresh:
+            thread = threading.Thread(
+                target=self._refresh, args=(key, fetch), daemon=True
+            )
+            with self._lock:
+                self._refreshing[key] = thread
+            thread.start()
+        return data
+
+    async def async_get(self, key: str, fetch: Callable[..., Awaitable[T]]) -> T:
+        """The async equivalent of :py:meth:`get`, refreshing in a task."""
+        import asyncio  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        if not self:
+            return await fetch(refresh=False)
+        data, refresh = self._lookup(key)
+        if data is None:
+            data = await fetch(refresh=True)
+            self.store(key, data)
+        elif refresh:
+            task = asyncio.create_task(self._async_refresh(key, fetch))
+            with self._lock:
+                self._refreshing[key] = task
+        return data
+
+    def _refresh(self, key: str, fetch: Callable[..., Any]) -> None:
+        try:
+            self.store(key, fetch(refresh=True))
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Refreshing %r in the background failed.", key)
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    async def _async_refresh(self, key: str, fetch: Callable[..., Awaitable[Any]]) -> None:
+        try:
+            self.store(key, await fetch(refresh=True))
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Refreshing %r in the background failed.", key)
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def wait(self) -> None:
+        """Blocks until every background refresh on a thread has finished."""
+        for refresh in list(self._refreshing.values()):
+            if isinstance(refresh, threading.Thread):
+                refresh.join()
+
+    def refreshes(self) -> Tuple["asyncio.Task[None]", ...]:
+        """Returns the running background refresh tasks, e.g. to await them."""
+        return tuple(
+            refresh
+            for refresh in list(self._refreshing.values())
+            if not isinstance(refresh, threading.Thread) and refresh is not None
+        )
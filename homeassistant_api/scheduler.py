@@ -0,0 +1,216 @@
+"""Module for polling entities at different rates with as few requests as possible."""
+import logging
+import random
+import time
+from posixpath import join
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .changes import Fingerprint, fingerprint
+from .index import compile_selector
+from .models import State
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from homeassistant_api import Client
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[Tuple[State, ...]], Union[None, Awaitable[None]]]
+
+
+def _is_glob(selector: str) -> bool:
+    return any(char in selector for char in "*?[")
+
+
+class PollTarget:
+    """An entity or :code:`entity_id` glob polled at least every :code:`interval` seconds."""
+
+    def __init__(self, selector: str, interval: float, callback: Callback) -> None:
+        self.selector = selector
+        self.interval = interval
+        self.callback = callback
+        self.next_due = 0.0
+        self.seen: Dict[str, Fingerprint] = {}
+        self._pattern = compile_selector(selector) if _is_glob(selector) else None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.selector!r} every {self.interval}s>"
+
+    @property
+    def single(self) -> bool:
+        """Whether the target is one :code:`entity_id` that can be fetched on its own."""
+        return self._pattern is None
+
+    def matches(self, entity_id: str) -> bool:
+        """Whether an :code:`entity_id` belongs to this target."""
+        if self._pattern is None:
+            return entity_id == self.selector
+        return self._pattern.match(entity_id) is not None
+
+    def changed(self, data: Iterable[Dict[str, Any]]) -> Tuple[State, ...]:
+        """Returns the states of this target that changed since they were last delivered."""
+        states = []
+        for json in data:
+            entity_id = json["entity_id"]
+            if not self.matches(entity_id):
+                continue
+            new = fingerprint(json)
+            if self.seen.get(entity_id) != new or new == (None, None):
+                self.seen[entity_id] = new
+                states.append(State.from_json(json))
+        return tuple(states)
+
+
+class PollScheduler:
+    """
+    Polls registered entities and :code:`entity_id` globs through an async client, each at its own target freshness,
+    and calls their callbacks with the states that changed.
+
+    Poll times are jittered so targets with equal intervals drift apart instead of firing in bursts.
+    Targets that come due within :code:`coalesce` seconds of each other are polled together,
+    with one :code:`GET /api/states` once that takes fewer requests than fetching them one by one
+    (any glob, or at least :code:`merge_threshold` single entities).
+    A merged poll also serves every target that is past half of its interval.
+
+    Polls skip the client's caches, so every poll reaches Home Assistant.
+
+    :param client: An async :py:class:`Client`.
+    :param jitter: Fraction of an interval a poll time is randomly moved by. Defaults to 0.1.
+    :param coalesce: Seconds within which due targets are polled together. Defaults to 0.5.
+    :param merge_threshold: Single entities due together at which one :code:`GET /api/states` is used instead. Defaults to 4.
+        This counts requests and does not estimate how much larger :code:`/api/states` is than the single states,
+        so raise it for instances with many entities.
+    """
+
+    def __init__(
+        self,
+        client: "Client",
+        *,
+        jitter: float = 0.1,
+        coalesce: float = 0.5,
+        merge_threshold: int = 4,
+    ) -> None:
+        self._client = client
+        self.jitter = jitter
+        self.coalesce = coalesce
+        self.merge_threshold = merge_threshold
+        self.targets: List[PollTarget] = []
+        self.requests = 0
+        self.merged_polls = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {len(self.targets)} targets>"
+
+    def register(
+        self, selector: str, interval: float, callback: Callback
+    ) -> PollTarget:
+        """
+        Polls an :code:`entity_id` or glob (e.g. :code:`sensor.*_power`) at least every :code:`interval` seconds.
+        :code:`callback` receives a tuple of the states that changed and may be a coroutine function.
+        """
+        target = PollTarget(selector, interval, callback)
+        self.targets.append(target)
+        return target
+
+    def unregister(self, target: PollTarget) -> None:
+        """Stops polling a target returned by :py:meth:`register`."""
+        self.targets.remove(target)
+
+    def _schedule(self, target: PollTarget, now: float) -> None:
+        spread = target.interval * self.jitter
+        target.next_due = now + target.interval + random.uniform(-spread, spread)
+
+    async def _deliver(self, target: PollTarget, data: Iterable[Dict[str, Any]]) -> None:
+        import asyncio  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        states = target.changed(data)
+        if not states:
+            return
+        try:
+            result = target.callback(states)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Callback of %r failed.", target)
+
+    async def _fetch_single(self, target: PollTarget) -> List[Dict[str, Any]]:
+        try:
+            return [
+                await self._client.async_request(
+                    join("states", target.selector), refresh=True
+                )
+            ]
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Polling %r failed.", target)
+            return []
+
+    async def poll(self) -> List[PollTarget]:
+        """Polls every target that is due now and returns them."""
+        import asyncio  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        now = time.monotonic()
+        due = [t for t in self.targets if t.next_due <= now + self.coalesce]
+        if not due:
+            return []
+        singles = [target for target in due if target.single]
+        if len(singles) < len(due) or len(singles) >= self.merge_threshold:
+            # Anything past half of its interval is fresh enough to be served by this poll too.
+            due = [
+                target
+                for target in self.targets
+                if target.next_due <= now + max(self.coalesce, target.interval / 2)
+            ]
+            self.requests += 1
+            self.merged_polls += 1
+            try:
+                data = await self._client.async_request_states(refresh=True)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Polling all states for %r failed.", self)
+                data = []
+            for target in due:
+                await self._deliver(target, data)
+        else:
+            self.requests += len(due)
+            results = await asyncio.gather(*map(self._fetch_single, due))
+            for target, result in zip(due, results):
+                await self._deliver(target, result)
+        for target in due:
+            self._schedule(target, now)
+        return due
+
+    async def run(self) -> None:
+        """Polls targets as they come due until cancelled."""
+        import asyncio  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        while True:
+            await self.poll()
+            next_due = min((t.next_due for t in self.targets), default=None)
+            delay = 1.0 if next_due is None else next_due - time.monotonic()
+            await asyncio.sleep(max(delay, 0.0))
+
+    def start(self) -> "asyncio.Task[None]":
+        """Starts :py:meth:`run` as a task on the running event loop."""
+        import asyncio  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def stop(self) -> None:
+        """Cancels the task started by :py:meth:`start`."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
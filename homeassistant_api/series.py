@@ -0,0 +1,227 @@
+"""
+Module for turning histories into numeric arrays and reducing them.
+Requires the optional :code:`numpy` dependency (:code:`pip install homeassistant-api[numpy]`).
+"""
+from typing import TYPE_CHECKING, Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .models import History, State
+
+
+def require_numpy() -> Any:
+    """Imports :code:`numpy`, explaining how to install it if it is missing."""
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError(
+            "This feature needs numpy, install it with `pip install homeassistant-api[numpy]`."
+        ) from err
+    return numpy
+
+
+def _to_float(state: "State") -> float:
+    try:
+        return float(state.state)
+    except ValueError:  # e.g. "unavailable", "unknown" or "on"
+        return float("nan")
+
+
+def to_arrays(states: Iterable["State"]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Converts states into an array of :code:`last_changed` POSIX timestamps and an array of float values
+    in one pass. States that are not numbers become :code:`nan`.
+    """
+    np = require_numpy()
+    states = tuple(states)
+    timestamps = np.fromiter(
+        (state.last_changed.timestamp() for state in states), float, count=len(states)
+    )
+    values = np.fromiter(map(_to_float, states), float, count=len(states))
+    return timestamps, values
+
+
+def _step_integral(
+    np: Any, timestamps: "np.ndarray", values: "np.ndarray", edges: "np.ndarray", end: float
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Integrates the step function each value holds until the next timestamp (and the last one until :code:`end`),
+    returning the integral and the time covered by numeric values from the first timestamp up to each edge.
+    """
+    valid = ~np.isnan(values)
+    held = np.where(valid, values, 0.0)
+    durations = np.diff(timestamps, append=end).clip(min=0)
+    area = np.concatenate(([0.0], np.cumsum(held * durations)))
+    covered = np.concatenate(([0.0], np.cumsum(valid * durations)))
+    edges = np.clip(edges, timestamps[0], end)
+    i = np.searchsorted(timestamps, edges, side="right") - 1
+    partial = edges - timestamps[i]
+    return area[i] + held[i] * partial, covered[i] + valid[i] * partial
+
+
+def aggregate(
+    timestamps: "np.ndarray",
+    values: "np.ndarray",
+    interval: float,
+    *,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> Dict[str, "np.ndarray"]:
+    """
+    Buckets sorted samples into windows of :code:`interval` seconds starting at :code:`start`
+    (defaults to the first timestamp rounded down to the interval) and returns arrays with the start of each window
+    (:code:`time`) and its :code:`min`, :code:`max`, :code:`mean`, :code:`last` and :code:`count` of numeric values.
+    :code:`time_weighted` is the average of the values as a step function, each held until the next sample,
+    which suits sensors that only report changes. The last value is held until :code:`end`.
+    Windows without numeric values are :code:`nan`.
+    Samples at or after an explicit :code:`end` are left out, while the default :code:`end`,
+    the last timestamp, is inclusive, so a last sample on a window edge gets a window of its own.
+    """
+    np = require_numpy()
+    if start is None:
+        start = float(np.floor(timestamps[0] / interval) * interval) if len(timestamps) else 0.0
+    if end is None:
+        end = float(timestamps[-1]) if len(timestamps) else start
+        buckets = int(np.floor((max(end, start) - start) / interval)) + 1
+    else:
+        buckets = max(int(np.ceil((max(end, start) - start) / interval)), 1)
+    edges = start + interval * np.arange(buckets + 1)
+    result = {
+        "time": edges[:-1],
+        "count": np.zeros(buckets, dtype=np.int64),
+        **{
+            key: np.full(buckets, np.nan)
+            for key in ("min", "max", "mean", "last", "time_weighted")
+        },
+    }
+    if not len(timestamps):
+        return result
+
+    valid = ~np.isnan(values)
+    index = np.floor((timestamps[valid] - start) / interval).astype(np.int64)
+    inside = (index >= 0) & (index < buckets)
+    index, numeric = index[inside], values[valid][inside]
+    if len(index):
+        # The samples are sorted, so each bucket is one contiguous run of them.
+        starts = np.flatnonzero(np.concatenate(([True], index[1:] != index[:-1])))
+        ends = np.concatenate((starts[1:], [len(index)])) - 1
+        present = index[starts]
+        counts = np.diff(np.concatenate((starts, [len(index)])))
+        result["count"][present] = counts
+        result["min"][present] = np.minimum.reduceat(numeric, starts)
+        result["max"][present] = np.maximum.reduceat(numeric, starts)
+        result["mean"][present] = np.add.reduceat(numeric, starts) / counts
+        result["last"][present] = numeric[ends]
+
+    area, covered = _step_integral(np, timestamps, values, edges, end)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result["time_weighted"] = np.diff(area) / np.diff(covered)
+    return result
+
+
+def lttb(
+    timestamps: "np.ndarray", values: "np.ndarray", points: int
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Downsamples to at most :code:`points` samples with Largest-Triangle-Three-Buckets,
+    which keeps the peaks and shape of a chart. Samples that are not numbers are dropped first.
+    """
+    np = require_numpy()
+    valid = ~np.isnan(values)
+    x, y = timestamps[valid], values[valid]
+    if points >= len(x) or points < 3:
+        return x, y
+    # Bucket boundaries for everything but the first and last sample.
+    bounds = np.linspace(1, len(x) - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, len(x) - 1
+    previous = 0
+    for i in range(points - 2):
+        low, high = bounds[i], bounds[i + 1]
+        following = slice(bounds[i + 1], bounds[i + 2] if i + 2 < len(bounds) else len(x))
+        average_x, average_y = x[following].mean(), y[following].mean()
+        # Twice the area of the triangle between the previous pick, each candidate and the next bucket's average.
+        areas = np.abs(
+            (x[previous] - average_x) * (y[low:high] - y[previous])
+            - (x[previous] - x[low:high]) * (average_y - y[previous])
+        )
+        previous = selected[i + 1] = low + int(np.argmax(areas))
+    return x[selected], y[selected]
+
+
+class AlignedHistories(NamedTuple):
+    """Histories of several entities sampled on one time grid."""
+
+    entity_ids: Tuple[str, ...]
+    #: POSIX timestamps of the grid.
+    timestamps: "np.ndarray"
+    #: A masked float matrix with a row per entity and a column per timestamp.
+    #: Entries are masked where an entity had no numeric state.
+    values: "np.ma.MaskedArray"
+
+
+def _align_row(
+    np: Any,
+    timestamps: "np.ndarray",
+    values: "np.ndarray",
+    grid: "np.ndarray",
+    freq: float,
+    fill: str,
+) -> "np.ndarray":
+    """Samples one series on the grid, returning :code:`nan` where it has no numeric value."""
+    if not len(timestamps):
+        return np.full(len(grid), np.nan)
+    i = np.searchsorted(timestamps, grid, side="right") - 1
+    before = i < 0
+    i = i.clip(min=0)
+    held = np.where(before, np.nan, values[i])  # The state in effect at each grid time.
+    if fill == "ffill":
+        return held
+    if fill == "none":
+        return np.where(timestamps[i] > grid - freq, held, np.nan)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return held
+    interpolated = np.interp(grid, timestamps[valid], values[valid], left=np.nan, right=np.nan)
+    # Points where the entity is currently unavailable stay missing instead of being bridged.
+    return np.where(np.isnan(held), np.nan, interpolated)
+
+
+def align_histories(
+    histories: Iterable["History"],
+    freq: float,
+    *,
+    fill: str = "ffill",
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> AlignedHistories:
+    """
+    Samples histories on a shared grid every :code:`freq` seconds from :code:`start` to :code:`end`
+    (POSIX timestamps, defaulting to the first and last state of all histories).
+
+    :param fill: How a grid time between states gets its value.
+        :code:`"ffill"` uses the state in effect at that time,
+        :code:`"none"` only uses a state that changed within the preceding :code:`freq` seconds,
+        :code:`"interpolate"` interpolates linearly between numeric states.
+    """
+    np = require_numpy()
+    if fill not in ("ffill", "none", "interpolate"):
+        raise ValueError(f"fill must be 'ffill', 'none' or 'interpolate', not {fill!r}")
+    histories = tuple(histories)
+    series = [to_arrays(history.states) for history in histories]
+    known = [timestamps for timestamps, _ in series if len(timestamps)]
+    if start is None:
+        start = min((float(timestamps[0]) for timestamps in known), default=0.0)
+    if end is None:
+        end = max((float(timestamps[-1]) for timestamps in known), default=start)
+    grid = start + freq * np.arange(int(np.floor((end - start) / freq)) + 1)
+    matrix = np.vstack(
+        [_align_row(np, *arrays, grid, freq, fill) for arrays in series]
+        or [np.empty((0, len(grid)))]
+    )
+    return AlignedHistories(
+        tuple(history.entity_id for history in histories),
+        grid,
+        np.ma.masked_invalid(matrix),
+    )
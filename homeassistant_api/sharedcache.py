@@ -0,0 +1,127 @@
+"""
+Module for a :code:`requests_cache` backend shared by every process on a machine through a SQLite database in WAL mode.
+See :py:class:`homeassistant_api.sharedstore.SharedStore`.
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Iterator
+
+import requests
+from requests_cache import CachedSession
+from requests_cache.backends.base import BaseCache, BaseStorage
+from requests_cache.serializers import pickle_serializer
+
+from .sharedstore import SharedStore, _expired, _fresh
+
+
+class SharedStorage(BaseStorage):
+    """
+    A :code:`requests_cache` storage backed by a table of a :py:class:`SharedStore`.
+    With :code:`single_flight`, reading a missing or expired response takes its lock,
+    and storing the new response releases it. Responses that are not stored release it
+    when :py:class:`SharedCachedSession` is done sending.
+    """
+
+    def __init__(
+        self,
+        store: SharedStore,
+        table: str,
+        *,
+        single_flight: bool = False,
+        serve_stale: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.store = store
+        self.table = table
+        self.single_flight = single_flight
+        self.serve_stale = serve_stale
+
+    def _read(self, key: str) -> Any:
+        value = self.store.get(self.table, key)
+        return None if value is None else self.deserialize(key, value)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._read(key)
+        if self.single_flight and (value is None or _expired(value)):
+            deadline = time.time() + self.store.lock_timeout
+            while not self.store.acquire(key):
+                if value is not None and self.serve_stale:
+                    return _fresh(value)
+                if time.time() >= deadline:
+                    break
+                time.sleep(self.store.poll_interval)
+                value = self._read(key)
+                if value is not None and not _expired(value):
+                    return value
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.store.set(self.table, key, self.serialize(value))
+        if self.single_flight:
+            self.store.release(key)
+
+    def __delitem__(self, key: str) -> None:
+        if not self.store.delete(self.table, key):
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.keys(self.table))
+
+    def __len__(self) -> int:
+        return self.store.count(self.table)
+
+    def clear(self) -> None:
+        self.store.clear(self.table)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+class SharedCache(BaseCache):
+    """
+    A :code:`requests_cache` backend that shares responses between processes through a SQLite file.
+    Pass it as :code:`Client(..., cache_session=SharedCachedSession(backend=SharedCache(path)))`,
+    or use :code:`Client(..., shared_cache=path)`. Takes the arguments of :py:class:`SharedStore`.
+
+    :param serve_stale: Answer with the expired response instead of waiting while another process fetches a new one.
+    """
+
+    def __init__(
+        self,
+        path: str = "homeassistant_api_cache.sqlite",
+        *,
+        lock_timeout: float = 10.0,
+        serve_stale: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(cache_name=path, **kwargs)
+        self.store = SharedStore(path, lock_timeout=lock_timeout)
+        self.responses = SharedStorage(
+            self.store,
+            "responses",
+            single_flight=True,
+            serve_stale=serve_stale,
+            serializer=pickle_serializer,
+        )
+        self.redirects = SharedStorage(self.store, "redirects")
+
+
+class SharedCachedSession(CachedSession):
+    """
+    A :code:`requests_cache.CachedSession` for a :py:class:`SharedCache`.
+    It releases the lock of a request once it is sent, so errors, responses that are not cached
+    and failed requests do not keep the other processes waiting for :code:`lock_timeout`.
+    """
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            if isinstance(self.cache, SharedCache):
+                self.cache.store.release(self.cache.create_key(request, **kwargs))
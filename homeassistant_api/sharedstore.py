@@ -0,0 +1,161 @@
+"""
+Module for the SQLite database behind the response caches shared by every process on a machine.
+When a response is missing or expired, only the process (or thread, or task) that takes its lock fetches it again,
+while the others wait for the new response or, with :code:`serve_stale`, answer with the expired one.
+It does not import any http library, the cache backends live in :py:mod:`homeassistant_api.sharedcache`
+and :py:mod:`homeassistant_api.asyncsharedcache`.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional
+
+TABLES = ("responses", "redirects", "async_responses", "async_redirects")
+
+
+def _owner() -> str:
+    """Identifies the caller across processes, threads and asyncio tasks."""
+    try:
+        task = id(asyncio.current_task())
+    except RuntimeError:
+        task = 0
+    return f"{os.getpid()}:{threading.get_ident()}:{task}"
+
+
+def _expired(response: Any) -> bool:
+    return bool(getattr(response, "is_expired", False))
+
+
+def _fresh(response: Any) -> Any:
+    """Makes an expired response look fresh, so the cache session serves it instead of fetching again."""
+    response.expires = None
+    return response
+
+
+class SharedStore:
+    """
+    Key-value tables and locks in a SQLite database that several processes can use at once.
+
+    :param path: The database file, created if it does not exist.
+    :param lock_timeout: Seconds a lock is held at most, so a crashed or failed fetch cannot block the others for longer.
+    :param poll_interval: Seconds between checks while waiting for a lock.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        lock_timeout: float = 10.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        self.path = path
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            for table in TABLES:
+                connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+                )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.path!r}>"
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns the connection of the calling thread, SQLite connections cannot be shared between threads."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None
+            )
+            connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def close(self) -> None:
+        """Closes the connection of the calling thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def get(self, table: str, key: str) -> Optional[Any]:
+        """Returns the value stored under :code:`key`, or :code:`None`."""
+        row = (
+            self._connection()
+            .execute(f"SELECT value FROM {table} WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return None if row is None else row[0]
+
+    def set(self, table: str, key: str, value: Any) -> None:
+        """Stores :code:`value` under :code:`key`."""
+        self._connection().execute(
+            f"INSERT OR REPLACE INTO {table} (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    def delete(self, table: str, key: str) -> bool:
+        """Removes :code:`key` and returns whether it was stored."""
+        cursor = self._connection().execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def clear(self, table: str) -> None:
+        """Removes every key of a table."""
+        self._connection().execute(f"DELETE FROM {table}")
+
+    def keys(self, table: str) -> List[str]:
+        """Returns every key of a table."""
+        return [row[0] for row in self._connection().execute(f"SELECT key FROM {table}")]
+
+    def count(self, table: str) -> int:
+        """Returns the number of keys in a table."""
+        return self._connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def acquire(self, key: str, busy_timeout: Optional[float] = None) -> bool:
+        """
+        Takes the lock of :code:`key` unless someone else holds it, and returns whether the caller holds it now.
+        Expired locks are taken over.
+        With :code:`busy_timeout`, waits at most that many seconds for another writer of the database
+        and then returns :code:`False` instead of waiting up to 30 seconds.
+        """
+        owner = _owner()
+        now = time.time()
+        connection = self._connection()
+        if busy_timeout is not None:
+            connection.execute(f"PRAGMA busy_timeout = {int(busy_timeout * 1000)}")
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            if busy_timeout is not None:
+                connection.execute("PRAGMA busy_timeout = 30000")
+        try:
+            connection.execute("DELETE FROM locks WHERE key = ? AND expires < ?", (key, now))
+            connection.execute(
+                "INSERT OR IGNORE INTO locks (key, owner, expires) VALUES (?, ?, ?)",
+                (key, owner, now + self.lock_timeout),
+            )
+            (holder,) = connection.execute(
+                "SELECT owner FROM locks WHERE key = ?", (key,)
+            ).fetchone()
+        finally:
+            connection.execute("COMMIT")
+        return bool(holder == owner)
+
+    def release(self, key: str) -> None:
+        """Releases the lock of :code:`key` if the caller holds it."""
+        self._connection().execute(
+            "DELETE FROM locks WHERE key = ? AND owner = ?", (key, _owner())
+        )
+
+    def release_owned(self) -> None:
+        """Releases every lock the caller holds."""
+        self._connection().execute("DELETE FROM locks WHERE owner = ?", (_owner(),))
@@ -0,0 +1,119 @@
+"""Module for rendering many templates with a single request."""
+import json
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .errors import BadTemplateError
+
+
+def combine_templates(templates: List[str]) -> str:
+    """
+    Combines templates into one that renders a json object of each template's output, keyed by its position.
+    Every template is captured with a block :code:`{% set %}`, so it renders exactly as it would on its own.
+    """
+    blocks = "".join(
+        f"{{% set __template_{i} %}}{template}{{% endset %}}"
+        for i, template in enumerate(templates)
+    )
+    keys = ", ".join(f'"{i}": __template_{i}' for i in range(len(templates)))
+    return f"{blocks}{{{{ {{{keys}}} | tojson }}}}"
+
+
+def split_results(rendered: str, templates: List[str]) -> Dict[str, str]:
+    """Splits the output of :py:func:`combine_templates` back into the output of each template."""
+    try:
+        outputs = json.loads(rendered)
+        return {template: outputs[str(i)] for i, template in enumerate(templates)}
+    except (ValueError, KeyError, TypeError) as err:
+        raise BadTemplateError(
+            f"Combined templates rendered unexpected output: {rendered[:100]!r}"
+        ) from err
+
+
+def bisect(templates: List[str]) -> Tuple[List[str], List[str]]:
+    """Splits a batch that failed to render into halves that are rendered separately."""
+    middle = len(templates) // 2
+    return templates[:middle], templates[middle:]
+
+
+class RenderedTemplates(Dict[str, str]):
+    """
+    The outputs of :py:meth:`Client.render_templates` keyed like the templates passed to it.
+    Templates that failed to render are left out and their errors are in :py:attr:`errors`.
+    """
+
+    errors: Dict[str, BadTemplateError]
+
+    def __init__(self, templates: Dict[str, str]) -> None:
+        super().__init__()
+        self.templates = templates
+        self.errors = {}
+
+    def fill(self, cache: "TemplateCache") -> List[str]:
+        """Fills in cached outputs and returns the distinct template texts that still need rendering."""
+        pending: Dict[str, None] = {}
+        for key, template in self.templates.items():
+            output = cache.get(template)
+            if output is None:
+                pending[template] = None
+            else:
+                self[key] = output
+        return list(pending)
+
+    def finish(
+        self, rendered: Dict[str, str], errors: Dict[str, BadTemplateError]
+    ) -> "RenderedTemplates":
+        """Maps outputs and errors keyed by template text back to the keys the templates were passed with."""
+        for key, template in self.templates.items():
+            if template in rendered:
+                self[key] = rendered[template]
+            elif template in errors:
+                self.errors[key] = errors[template]
+        return self
+
+
+class TemplateCache:
+    """
+    Caches rendered templates by their text for :code:`ttl` seconds.
+
+    :param ttl: Seconds a rendered template is reused for. :code:`0` disables the cache.
+    """
+
+    def __init__(self, ttl: float = 0) -> None:
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results: Dict[str, Tuple[float, str]] = {}
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {len(self._results)} templates ttl={self.ttl}>"
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def clear(self) -> None:
+        """Forgets every rendered template."""
+        with self._lock:
+            self._results.clear()
+
+    def get(self, template: str) -> Optional[str]:
+        """Returns the cached output of a template if it has not expired."""
+        if not self.ttl:
+            return None
+        with self._lock:
+            cached = self._results.get(template)
+            if cached is None:
+                return None
+            if cached[0] < time.monotonic():
+                del self._results[template]
+                return None
+            return cached[1]
+
+    def update(self, rendered: Dict[str, str]) -> None:
+        """Caches the outputs of templates keyed by their text."""
+        if not self.ttl:
+            return
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for template, output in rendered.items():
+                self._results[template] = (expires, output)
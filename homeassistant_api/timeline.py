@@ -0,0 +1,63 @@
+"""Module for merging states and logbook entries of many entities into one time-ordered stream."""
+import heapq
+from typing import Iterable, Iterator, List, Union
+
+from .models import History, LogbookEntry, State
+
+TimelineItem = Union[State, LogbookEntry]
+Source = Union[History, Iterable[Union[History, State, LogbookEntry]]]
+
+
+def timestamp(item: TimelineItem) -> float:
+    """When a state changed or a logbook entry was logged, as a POSIX timestamp."""
+    if isinstance(item, LogbookEntry):
+        return item.when.timestamp()
+    return item.last_changed.timestamp()
+
+
+def _windows(histories: Iterator[History], first: History) -> Iterator[TimelineItem]:
+    """
+    Merges a stream of histories, such as several :py:meth:`Client.get_entity_histories` calls chained together.
+    Consecutive histories of different entities form one window that is merged in memory,
+    and a window ends when an entity repeats, so only one window is held at a time.
+    """
+    window: List[History] = [first]
+    for history in histories:
+        if any(history.entity_id == other.entity_id for other in window):
+            yield from heapq.merge(*(h.states for h in window), key=timestamp)
+            window = []
+        window.append(history)
+    yield from heapq.merge(*(h.states for h in window), key=timestamp)
+
+
+def _stream(source: Source) -> Iterator[TimelineItem]:
+    """Turns a source into a stream of states or logbook entries sorted by time."""
+    if isinstance(source, History):
+        yield from source.states
+        return
+    items = iter(source)
+    first = next(items, None)
+    if isinstance(first, History):
+        yield from _windows(items, first)  # type: ignore[arg-type]
+    elif first is not None:
+        yield first
+        yield from items  # type: ignore[misc]
+
+
+def merge_timeline(*sources: Source) -> Iterator[TimelineItem]:
+    """
+    Lazily merges already sorted sources into one stream of :py:class:`State`'s and :py:class:`LogbookEntry`'s ordered by time,
+    holding only the next item of each source in memory.
+    A source is a :py:class:`History`, an iterable of states or logbook entries (e.g. :py:meth:`Client.get_logbook_entries`),
+    or an iterable of histories (e.g. :py:meth:`Client.get_entity_histories`).
+    Items logged at the same time keep the order of their sources.
+
+    .. code-block:: python
+
+        for item in merge_timeline(
+            client.get_entity_histories(entities=[door, alarm]),
+            client.get_logbook_entries(start_timestamp=start),
+        ):
+            print(timestamp(item), item)
+    """
+    return heapq.merge(*map(_stream, sources), key=timestamp)
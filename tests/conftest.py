@@ -1,14 +1,103 @@
 import asyncio
+import json
 import logging
 import os
-from typing import AsyncGenerator, Generator
+from pathlib import Path
+from typing import Any, AsyncGenerator, Generator, Optional
 
 import pytest
 import pytest_asyncio
 
-from homeassistant_api import Client
+from homeassistant_api import AsyncReplaySession, Client, Recorder, Recording, ReplaySession
+from homeassistant_api.recording import ReplayAdapter
 
 TIMEOUT = 300
+API_URL = "http://homeassistant.local:8123/api"
+SUN = {"entity_id": "sun.sun", "state": "above_horizon"}
+
+
+class Traffic:
+    """Records responses from :code:`API_URL` for a test and replays them offline."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._recorder = Recorder(path)
+
+    def add(
+        self,
+        endpoint: str,
+        *responses: Any,
+        method: str = "GET",
+        status: int = 200,
+        template: Optional[str] = None,
+    ) -> "Traffic":
+        """
+        Records the responses to :code:`endpoint`, which may include a query string, in order.
+        Strings are sent as text, anything else as JSON.
+        With :code:`template` the request is the rendering of that template.
+        """
+        for data in responses:
+            if isinstance(data, str):
+                content_type, body = "text/plain", data.encode()
+            else:
+                content_type, body = "application/json", json.dumps(data).encode()
+            self._recorder.record(
+                "POST" if template is not None else method,
+                f"{API_URL}/{endpoint}",
+                status=status,
+                headers={"Content-Type": content_type},
+                body=body,
+                elapsed=0.01,
+                request_body=None if template is None else {"template": template},
+            )
+        return self
+
+    def recording(self) -> Recording:
+        """Stops recording and loads the recording."""
+        self._recorder.close()
+        return Recording(self.path)
+
+    def session(self, **kwargs: Any) -> ReplaySession:
+        """Stops recording and returns a :py:class:`ReplaySession` of it."""
+        self._recorder.close()
+        return ReplaySession(self.path, **kwargs)
+
+    def async_session(self, **kwargs: Any) -> AsyncReplaySession:
+        """Stops recording and returns an :py:class:`AsyncReplaySession` of it."""
+        self._recorder.close()
+        return AsyncReplaySession(self.path, **kwargs)
+
+    def client(self, **kwargs: Any) -> Client:
+        """Returns a :py:class:`Client` replaying the recording."""
+        return Client(API_URL, "token", cache_session=self.session(), **kwargs)
+
+    def cached_client(self, **kwargs: Any) -> Client:
+        """Returns a :py:class:`Client` with its default cached session answering from the recording."""
+        client = Client(API_URL, "token", **kwargs)
+        client.cache_session.mount("http://", ReplayAdapter(self.recording()))
+        return client
+
+    def async_client(self, **kwargs: Any) -> Client:
+        """Returns an async :py:class:`Client` replaying the recording."""
+        return Client(
+            API_URL,
+            "token",
+            async_cache_session=self.async_session(),
+            use_async=True,
+            **kwargs,
+        )
+
+
+@pytest.fixture(name="traffic")
+def traffic_fixture(request: pytest.FixtureRequest, tmp_path: Path) -> Traffic:
+    """Records responses to a temporary file, named by indirect parametrization or :code:`traffic.jsonl`."""
+    return Traffic(str(tmp_path / getattr(request, "param", "traffic.jsonl")))
+
+
+@pytest.fixture(name="states")
+def states_fixture(traffic: Traffic) -> Traffic:
+    """Records a single response of :code:`GET /api/states`."""
+    return traffic.add("states", [SUN])
 
 
 @pytest.fixture(name="wait_for_server", scope="session")
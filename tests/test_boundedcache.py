@@ -0,0 +1,64 @@
+"""Module for testing the size-bounded response cache."""
+import os
+
+import pytest
+from conftest import Traffic
+
+from homeassistant_api.asyncboundedcache import AsyncBoundedCache
+from homeassistant_api.boundedcache import BoundedCache
+from homeassistant_api.boundedstore import BoundedStore
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "zstd"])
+def test_bounded_store_lru(compression) -> None:
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    store = BoundedStore(300, compression=compression)
+    for key in "abc":
+        store.set(key, key.encode() * 100)
+    assert store.get("a") == b"a" * 100
+    store.set("d", bytes(range(100)))  # Incompressible, so something has to go.
+    if compression is None:
+        assert list(store) == ["c", "a", "d"]
+    assert store.get("nothing") is None
+    stats = store.stats
+    assert stats.bytes_stored <= 300 and (stats.hits, stats.misses) == (1, 1)
+    assert stats.hit_ratio == 0.5
+    store.set("huge", os.urandom(1000))
+    assert "huge" not in store
+
+
+def test_bounded_store_lfu() -> None:
+    store = BoundedStore(200, policy="lfu")
+    store.set("often", b"1" * 100)
+    store.set("once", b"2" * 100)
+    store.get("often")
+    store.get("often")
+    store.get("once")
+    store.set("new", b"3" * 100)
+    assert list(store) == ["often", "new"]
+    assert store.stats.evictions == 1 and store.stats.bytes_evicted == 100
+    with pytest.raises(ValueError):
+        BoundedStore(policy="random")
+
+
+def test_default_session_is_bounded(states: Traffic) -> None:
+    client = states.cached_client(cache_max_bytes=1 << 20, cache_compression="zlib")
+    cache = client.cache_session.cache  # type: ignore[union-attr]
+    assert isinstance(cache, BoundedCache)
+    # The recording only answers once, the second request has to come from the cache.
+    assert client.request("states") == client.request("states")
+    assert cache.stats.entries == 1 and cache.stats.hits == 1
+    assert 0 < cache.stats.bytes_stored <= 1 << 20
+
+
+async def test_async_bounded_cache() -> None:
+    cache = AsyncBoundedCache(max_bytes=1 << 20)
+    await cache.responses.write("key", {"body": "value"})
+    assert await cache.responses.contains("key")
+    assert await cache.responses.read("key") == {"body": "value"}
+    assert await cache.responses.read("missing") is None
+    assert [key async for key in cache.responses.keys()] == ["key"]
+    await cache.responses.delete("key")
+    assert await cache.responses.size() == 0
+    assert cache.stats.hits == 1 and cache.stats.misses == 1
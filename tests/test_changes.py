@@ -0,0 +1,74 @@
+"""Module for testing change-only polling of states."""
+from conftest import Traffic
+
+from homeassistant_api.freshness import FINGERPRINT_TEMPLATE
+
+
+def make_json(entity_id: str, state: str, updated: str, context: str) -> dict:
+    return {
+        "entity_id": entity_id,
+        "state": state,
+        "attributes": {},
+        "last_changed": updated,
+        "last_updated": updated,
+        "context": {"id": context},
+    }
+
+
+FIRST = [
+    make_json("sun.sun", "above_horizon", "2023-03-11T22:41:05+00:00", "a"),
+    make_json("light.kitchen", "on", "2023-03-11T22:41:05+00:00", "b"),
+    make_json("light.hallway", "off", "2023-03-11T22:41:05+00:00", "c"),
+]
+SECOND = [
+    FIRST[0],
+    make_json("light.kitchen", "off", "2023-03-11T22:45:00+00:00", "d"),
+    make_json("switch.fan", "on", "2023-03-11T22:45:00+00:00", "e"),
+]
+
+
+def test_poll_changes(traffic: Traffic) -> None:
+    client = traffic.add("states", FIRST, SECOND, SECOND).client()
+
+    changes = client.poll_changes()
+    assert len(changes.added) == 3 and not changes.changed and not changes.removed
+
+    changes = client.poll_changes()
+    assert [state.entity_id for state in changes.added] == ["switch.fan"]
+    assert [state.state for state in changes.changed] == ["off"]
+    assert [state.entity_id for state in changes.removed] == ["light.hallway"]
+    assert changes.counts == {"added": 1, "changed": 1, "removed": 1, "unchanged": 1}
+
+    changes = client.poll_changes()
+    assert not changes and changes.unchanged == 3
+    assert sorted(client.change_tracker.states) == ["light.kitchen", "sun.sun", "switch.fan"]
+
+
+def test_poll_changes_skips_http_cache(traffic: Traffic) -> None:
+    client = traffic.add("states", FIRST, SECOND).cached_client()
+    client.poll_changes()
+    # The default session still holds the first states, the poll has to download them again.
+    assert [state.state for state in client.poll_changes().changed] == ["off"]
+
+
+def test_states_fingerprint(traffic: Traffic) -> None:
+    for fingerprint, data in (("3|a", FIRST), ("3|a", None), ("3|b", SECOND)):
+        traffic.add("template", fingerprint, template=FINGERPRINT_TEMPLATE)
+        if data is not None:
+            traffic.add("states", data)
+    client = traffic.client(states_fingerprint=True)
+    # The recording has two /api/states responses, a third download would be a replay miss.
+    assert len(client.get_states()) == 3
+    assert len(client.poll_changes().added) == 3
+    assert [state.state for state in client.poll_changes().changed] == ["off"]
+    assert client.states_freshness.hits == 1 and client.states_freshness.misses == 2
+
+
+def test_states_fingerprint_skips_http_cache(traffic: Traffic) -> None:
+    for fingerprint, data in (("3|a", FIRST), ("3|b", SECOND)):
+        traffic.add("template", fingerprint, template=FINGERPRINT_TEMPLATE)
+        traffic.add("states", data)
+    client = traffic.cached_client(states_fingerprint=True)
+    assert client.get_states()[1].state == "on"
+    # The session still holds the first response, the new fingerprint has to download the states again.
+    assert client.get_states()[1].state == "off"
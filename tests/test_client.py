@@ -1,10 +1,20 @@
+import asyncio
 import os
+import subprocess
+import sys
+import unittest.mock
+from typing import List
 
 import aiohttp_client_cache
+import pytest
 import requests_cache
 
+from conftest import Traffic
+
 from homeassistant_api import Client
 
+RUNNING = {"message": "API running."}
+
 
 def test_custom_cached_session() -> None:
     with Client(
@@ -47,3 +57,84 @@ async def test_default_async_session() -> None:
         use_async=True,
     ):
         pass
+
+
+def test_exit_closes_the_async_session_of_a_sync_client(traffic: Traffic) -> None:
+    client = traffic.add("", RUNNING).client()
+
+    async def use_async_session() -> aiohttp_client_cache.CachedSession:
+        return client.async_cache_session
+
+    with client:
+        session = asyncio.run(use_async_session())
+    assert session.closed and "async_cache_session" not in vars(client)
+
+
+async def test_exit_in_a_coroutine_closes_the_async_session(traffic: Traffic) -> None:
+    client = traffic.add("", RUNNING).client()
+    with client:
+        session = client.async_cache_session
+    await asyncio.sleep(0.1)  # The session is closed in a task on this loop.
+    assert session.closed
+
+
+async def test_aexit_closes_the_sync_session_of_an_async_client(traffic: Traffic) -> None:
+    client = traffic.add("", RUNNING).async_client()
+    with unittest.mock.patch.object(client.cache_session, "close") as close:
+        async with client:
+            pass
+    close.assert_called_once()
+    assert "cache_session" not in vars(client)
+
+
+@pytest.mark.parametrize(
+    "create, expected",
+    [
+        ("Client(URL, 'token', cache_session=False)", ["requests"]),
+        ("Client(URL, 'token')", ["requests", "requests_cache"]),
+        (
+            "asyncio.run(create())",
+            ["aiohttp", "aiohttp_client_cache"],
+        ),
+    ],
+)
+def test_lazy_imports(create: str, expected: List[str]) -> None:
+    """Makes sure each client only loads the http and cache libraries it uses, with or without the default cache."""
+    code = (
+        "import asyncio\n"
+        "import sys\n"
+        "from homeassistant_api import Client\n"
+        "URL = 'http://localhost:8123/api'\n"
+        "async def create():\n"
+        "    Client(URL, 'token', use_async=True)\n"
+        "loaded = lambda: sorted(m for m in {modules} if m in sys.modules)\n"
+        "print(loaded())\n"
+        "{create}\n"
+        "print(loaded())\n"
+    ).format(
+        modules=("aiohttp", "aiohttp_client_cache", "requests", "requests_cache"),
+        create=create,
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.splitlines() == ["[]", str(expected)]
+
+
+def test_lazy_helper_imports() -> None:
+    """Makes sure the modules of the client helpers are only loaded once a helper is used."""
+    code = (
+        "import sys\n"
+        "from homeassistant_api import Client\n"
+        "client = Client('http://localhost:8123/api', 'token', cache_session=False)\n"
+        "loaded = lambda: sorted(m for m in sys.modules if m.startswith('homeassistant_api.'))\n"
+        "before = loaded()\n"
+        "client.entity_index, client.response_cache\n"
+        "print(sorted(set(loaded()) - set(before)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == str(
+        ["homeassistant_api.index", "homeassistant_api.responsecache"]
+    )
@@ -0,0 +1,48 @@
+"""Module for testing delta-encoded compact histories."""
+from datetime import datetime, timedelta, timezone
+
+from homeassistant_api import History, State
+
+START = datetime(2023, 3, 11, tzinfo=timezone.utc)
+
+
+def test_compact_history() -> None:
+    attributes = {"unit_of_measurement": "W", "friendly_name": "Power", "icon": "mdi:flash"}
+    states = [
+        State(
+            entity_id="sensor.power",
+            state=str(second),
+            attributes=attributes,
+            last_changed=START + timedelta(seconds=second),
+        )
+        for second in range(5)
+    ]
+    states[2].attributes = {**attributes, "icon": "mdi:flash-off"}
+    states[3].attributes = {"restored": True}
+    history = History(states=tuple(states))
+    compact = history.compact()
+    assert len(compact) == 5
+    assert compact.entity_id == "sensor.power"
+    assert list(compact) == states
+    assert compact[-1] == states[-1]
+    assert compact[1:3] == tuple(states[1:3])
+    assert compact.to_history() == history
+    # The third state is stored as a change to the shared dict, the fourth as a new one.
+    assert len(compact._bases) == 2  # pylint: disable=protected-access
+
+
+def test_compact_history_keeps_value_types() -> None:
+    values = [START, START.isoformat(), (1, 2), [1, 2], START]
+    states = [
+        State(
+            entity_id="sensor.power",
+            state="on",
+            attributes={"value": value},
+            last_changed=START + timedelta(seconds=second),
+        )
+        for second, value in enumerate(values)
+    ]
+    compact = History(states=tuple(states)).compact()
+    assert [state.attributes["value"] for state in compact] == values
+    assert [type(state.attributes["value"]) for state in compact] == list(map(type, values))
+    assert len(compact._bases) == 4  # pylint: disable=protected-access
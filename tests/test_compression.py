@@ -0,0 +1,33 @@
+"""Module for testing deadband and swinging-door history compression."""
+from datetime import datetime, timedelta, timezone
+
+from homeassistant_api import History, State
+
+START = datetime(2023, 3, 11, tzinfo=timezone.utc)
+
+
+def test_history_compress() -> None:
+    states = [
+        State(
+            entity_id="sensor.power",
+            state=state,
+            last_changed=START + timedelta(seconds=second),
+        )
+        for second, state in enumerate(
+            ["10", "10", "10.2", "12", "14", "16", "unavailable", "16", "30"]
+        )
+    ]
+    history = History(states=tuple(states))
+    assert [s.state for s in history.compress().states] == [
+        "10", "10.2", "12", "14", "16", "unavailable", "16", "30"
+    ]
+    assert [s.state for s in history.compress(deadband=0.5).states] == [
+        "10", "12", "14", "16", "unavailable", "16", "30"
+    ]
+    # 12 lies within 0.1 of the line from 10.2 to 14, the states around "unavailable" are kept.
+    assert [s.state for s in history.compress(swinging_door=0.1).states] == [
+        "10", "10.2", "14", "16", "unavailable", "16", "30"
+    ]
+    assert [s.state for s in history.compress(deadband_percent=50).states] == [
+        "10", "16", "unavailable", "16", "30"
+    ]
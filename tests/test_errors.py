@@ -2,7 +2,7 @@
 
 import json
 import os
-import unittest
+import unittest.mock
 from typing import Dict
 
 import aiohttp
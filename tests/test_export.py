@@ -0,0 +1,77 @@
+"""Module for testing streaming history and logbook exports."""
+import csv
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+import pytest
+from conftest import Traffic
+
+from homeassistant_api import Client
+
+START = datetime(2023, 3, 11, tzinfo=timezone.utc)
+
+
+def history_url(start: datetime, end: datetime, first: bool) -> str:
+    query = f"filter_entity_id=sensor.power&end_time={quote(end.isoformat())}"
+    if not first:
+        query += "&skip_initial_state"
+    return f"history/period/{quote(start.isoformat())}?{query}"
+
+
+def make_state(hours: int, state: str, **extra) -> dict:
+    changed = (START + timedelta(hours=hours)).isoformat()
+    return {"state": state, "last_changed": changed, **extra}
+
+
+@pytest.fixture(name="client")
+def client_fixture(traffic: Traffic) -> Client:
+    """Records one day of history split into two windows."""
+    middle, end = START + timedelta(hours=12), START + timedelta(days=1)
+    first = make_state(
+        0, "1", entity_id="sensor.power", attributes={"unit_of_measurement": "W"}
+    )
+    traffic.add(history_url(START, middle, True), [[first, make_state(6, "2")]])
+    traffic.add(
+        history_url(middle, end, False),
+        [[make_state(18, "3", entity_id="sensor.power")]],
+    )
+    return traffic.client()
+
+
+def test_export_history_csv(client: Client, tmp_path: Path) -> None:
+    path = str(tmp_path / "history.csv")
+    rows = client.export_history(
+        ["sensor.power"],
+        START,
+        START + timedelta(days=1),
+        path,
+        window=timedelta(hours=12),
+        row_group_size=2,
+    )
+    assert rows == 3
+    with open(path, newline="", encoding="utf-8") as file:
+        exported = list(csv.DictReader(file))
+    assert [row["state"] for row in exported] == ["1", "2", "3"]
+    assert {row["entity_id"] for row in exported} == {"sensor.power"}
+    assert json.loads(exported[0]["attributes"]) == {"unit_of_measurement": "W"}
+
+
+def test_export_history_parquet(client: Client, tmp_path: Path) -> None:
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "history.parquet")
+    client.export_history(
+        ["sensor.power"],
+        START,
+        START + timedelta(days=1),
+        path,
+        format="parquet",
+        window=timedelta(hours=12),
+        row_group_size=2,
+    )
+    file = parquet.ParquetFile(path)
+    assert file.metadata.num_row_groups == 2
+    table = file.read()
+    assert table.column("state").to_pylist() == ["1", "2", "3"]
+    assert table.column("last_changed").to_pylist()[2] == START + timedelta(hours=18)
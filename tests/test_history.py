@@ -0,0 +1,39 @@
+"""Module for testing minimal entity history responses."""
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+from conftest import Traffic
+
+START = datetime(2023, 3, 11, tzinfo=timezone.utc)
+
+
+def test_minimal_history(traffic: Traffic) -> None:
+    changed = [(START + timedelta(seconds=second)).isoformat() for second in range(3)]
+    traffic.add(
+        f"history/period/{quote(START.isoformat())}"
+        "?filter_entity_id=sensor.power&minimal_response&no_attributes",
+        [
+            [
+                {
+                    "entity_id": "sensor.power",
+                    "state": "1",
+                    "attributes": {},
+                    "last_changed": changed[0],
+                    "last_updated": changed[0],
+                },
+                {"state": "2", "last_changed": changed[1]},
+                {"state": "3", "last_changed": changed[2]},
+            ]
+        ],
+    )
+    client = traffic.client()
+    power = client.prepare_entities([{"entity_id": "sensor.power", "state": "3"}])[
+        "sensor"
+    ].power
+    history = power.get_history(
+        start_timestamp=START, minimal_response=True, no_attributes=True
+    )
+    assert history is not None
+    assert history.entity_id == "sensor.power"
+    assert [state.state for state in history.states] == ["1", "2", "3"]
+    assert history.states[2].last_updated == START + timedelta(seconds=2)
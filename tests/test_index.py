@@ -0,0 +1,91 @@
+"""Module for testing entity, area and device indexes."""
+import json
+import re
+
+from conftest import Traffic
+
+from homeassistant_api import AreaIndex, EntityIndex, State
+
+
+def make_state(entity_id: str, state: str, **attributes) -> State:
+    return State(
+        entity_id=entity_id,
+        state=state,
+        attributes=attributes,
+        last_updated="2023-03-11T22:41:05+00:00",
+    )
+
+
+STATES = (
+    make_state("sensor.kitchen_temperature", "21.5", device_class="temperature", unit_of_measurement="°C"),
+    make_state("sensor.attic_temperature", "unavailable", device_class="temperature"),
+    make_state("sensor.attic_humidity", "unknown", device_class="humidity", floor="top"),
+    make_state("light.kitchen", "on", friendly_name="Kitchen", rgb_color=[255, 0, 0]),
+)
+
+
+def entity_ids(states) -> list:
+    return [state.entity_id for state in states]
+
+
+def test_entity_index_query() -> None:
+    index = EntityIndex(STATES)
+    assert entity_ids(
+        index.query(domain="sensor", device_class="temperature", state="unavailable")
+    ) == ["sensor.attic_temperature"]
+    assert entity_ids(index.query(state=("unavailable", "unknown"))) == [
+        "sensor.attic_humidity",
+        "sensor.attic_temperature",
+    ]
+    assert entity_ids(index.query("*.kitchen*")) == ["light.kitchen", "sensor.kitchen_temperature"]
+    assert entity_ids(index.query(re.compile(r"sensor\.attic_"))) == [
+        "sensor.attic_humidity",
+        "sensor.attic_temperature",
+    ]
+    assert entity_ids(index.query(floor="top")) == ["sensor.attic_humidity"]  # Not indexed.
+    assert entity_ids(index.query(rgb_color=[[255, 0, 0]])) == ["light.kitchen"]
+    assert len(index.query()) == len(STATES)
+
+
+def test_entity_index_query_unhashable_values() -> None:
+    index = EntityIndex(STATES, attribute_keys=("device_class", "rgb_color"))
+    assert entity_ids(index.query(rgb_color=[[255, 0, 0]])) == ["light.kitchen"]
+    assert index.query(rgb_color={"r": 255}) == ()
+    assert entity_ids(index.query(device_class=[{"r": 255}, "humidity"])) == [
+        "sensor.attic_humidity"
+    ]
+    assert index.query(state=[["on"]], domain={"light": 1}) == ()
+
+
+def test_entity_index_refresh() -> None:
+    index = EntityIndex(STATES)
+    index.index_attribute("friendly_name")
+    fixed = make_state("sensor.attic_temperature", "18.0", device_class="temperature")
+    changed = index.refresh([*STATES[:1], fixed, *STATES[2:3]])
+    assert entity_ids(changed) == ["sensor.attic_temperature"]
+    assert "light.kitchen" not in index
+    assert index.query(state="unavailable") == ()
+    assert index.query(friendly_name="Kitchen") == ()
+    assert entity_ids(index.query(device_class="temperature", state="18.0")) == [
+        "sensor.attic_temperature"
+    ]
+
+
+def test_area_index(traffic: Traffic) -> None:
+    rendered = {
+        "areas": {"kitchen": ["Kitchen", ["light.kitchen", "sensor.kitchen_temperature"], ["d1"]]},
+        "devices": {"d1": ["Thermometer", "kitchen", ["sensor.kitchen_temperature"]]},
+    }
+    traffic.add("template", json.dumps(rendered), template=AreaIndex.template)
+    client = traffic.client()
+    index = client.get_area_index()
+    assert client.get_area_index() is index  # Cached, the recording has one response.
+    assert "KITCHEN" in index and index.area_of("light.kitchen").name == "Kitchen"
+    assert index.devices.device_of("sensor.kitchen_temperature").name == "Thermometer"
+    entities = client.prepare_entities(
+        [{"entity_id": state.entity_id, "state": state.state} for state in STATES]
+    )
+    assert [entity.entity_id for entity in index.entities(entities, "kitchen")] == [
+        "light.kitchen",
+        "sensor.kitchen_temperature",
+    ]
@@ -0,0 +1,113 @@
+"""Module for testing the interval-aware logbook cache."""
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+from urllib.parse import quote
+
+import requests
+from conftest import API_URL, Traffic
+
+from homeassistant_api import Client, LogbookEntry
+from homeassistant_api.logbook import IntervalSet, LogbookCache
+
+START = datetime(2023, 3, 11, tzinfo=timezone.utc)
+
+
+def hours(count: float) -> datetime:
+    return START + timedelta(hours=count)
+
+
+def entry(hour: float) -> LogbookEntry:
+    return LogbookEntry(when=hours(hour), name=f"entry {hour}")
+
+
+def test_interval_set() -> None:
+    intervals = IntervalSet()
+    intervals.add(0, 10)
+    intervals.add(20, 30)
+    assert intervals.missing(5, 25) == [(10, 20)]
+    assert intervals.missing(-5, 40) == [(-5, 0), (10, 20), (30, 40)]
+    intervals.add(10, 20)
+    assert len(intervals) == 1 and intervals.missing(0, 30) == []
+    intervals.trim(15)
+    assert intervals.missing(0, 30) == [(0, 15)]
+
+
+def test_logbook_cache_eviction() -> None:
+    cache = LogbookCache(max_entries=3)
+    cache.add("light.hall", hours(0), hours(2), [entry(0), entry(1)])
+    cache.add("", hours(0), hours(2), [entry(0.5), entry(1.5)])
+    # The least recently used filter is dropped first.
+    assert cache.entries("light.hall", hours(0), hours(2)) is None
+    assert len(cache) == 2
+    cache.add("", hours(2), hours(4), [entry(2), entry(3)])
+    assert len(cache) == 3
+    assert cache.missing("", hours(0), hours(4)) == [(hours(0), hours(1.5))]
+    cached = cache.entries("", hours(1.5), hours(4))
+    assert cached is not None and [e.name for e in cached] == [
+        "entry 1.5", "entry 2", "entry 3"
+    ]
+
+
+def test_get_logbook_entries_cached(traffic: Traffic) -> None:
+    for start, end, logged in ((0, 2, (0.5, 1.5)), (2, 3, (2.5,))):
+        traffic.add(
+            f"logbook/{quote(hours(start).isoformat())}"
+            f"?entity=light.hall&end_time={quote(hours(end).isoformat())}",
+            [
+                {"when": hours(hour).isoformat(), "name": "Hall", "entity_id": "light.hall"}
+                for hour in logged
+            ],
+        )
+    client = traffic.client(logbook_cache_size=100)
+    first = list(client.get_logbook_entries(["light.hall"], hours(0), hours(2)))
+    assert [e.when for e in first] == [hours(0.5), hours(1.5)]
+    # Only the hour after the first range is requested, the replay has nothing else recorded.
+    second = list(client.get_logbook_entries("light.hall", hours(1), hours(3)))
+    assert [e.when for e in second] == [hours(1.5), hours(2.5)]
+    assert list(client.get_logbook_entries("light.hall", hours(0), hours(3))) == first + [
+        second[-1]
+    ]
+    assert (client.logbook_cache.hits, client.logbook_cache.misses) == (1, 2)
+
+
+class EmptySession(requests.Session):
+    """Answers every request with an empty list and remembers the requested paths."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.paths: List[str] = []
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        self.paths.append(url)
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = b"[]"
+        response.url = url
+        return response
+
+
+def test_recent_entries_are_not_cached() -> None:
+    session = EmptySession()
+    client = Client(API_URL, "token", cache_session=session, logbook_cache_size=100)
+    start = datetime.now(timezone.utc) - timedelta(hours=1)
+    assert not list(client.get_logbook_entries("light.hall", start))
+    assert len(session.paths) == 2  # The settled part and the last seconds.
+    # The recorder may still commit entries from the last seconds, so they are requested again.
+    assert not list(client.get_logbook_entries("light.hall", start))
+    assert session.paths[1] in session.paths[2:]
+
+
+def test_logbook_range_in_utc() -> None:
+    naive = datetime(2023, 3, 11, 12)
+    key, start, settled, end = Client.prepare_logbook_range(
+        ["light.b", "light.a"], naive, naive.astimezone(timezone.utc) + timedelta(hours=1), 10
+    )
+    assert key == "light.a,light.b"
+    assert start == naive.astimezone(timezone.utc) and start.tzinfo == timezone.utc
+    assert settled == end == start + timedelta(hours=1)
+    # Ranges reaching into the last seconds are only cached up to the margin.
+    _, _, settled, end = Client.prepare_logbook_range(
+        None, datetime.now(timezone.utc) - timedelta(minutes=1), None, 10
+    )
+    assert timedelta(seconds=9) < end - settled < timedelta(seconds=11)
@@ -0,0 +1,42 @@
+"""Module for testing the in-memory metadata snapshot."""
+
+import pytest
+from conftest import Traffic
+
+RESPONSES = {
+    "events": [{"event": "core_config_updated", "listener_count": 2}],
+    "components": ["api", "sun"],
+    "config": {"state": "RUNNING", "version": "2023.3.3"},
+}
+
+
+@pytest.fixture(name="metadata")
+def metadata_fixture(traffic: Traffic) -> Traffic:
+    """Records each metadata endpoint exactly once."""
+    for endpoint, data in RESPONSES.items():
+        traffic.add(endpoint, data)
+    return traffic
+
+
+def test_metadata_snapshot(metadata: Traffic) -> None:
+    client = metadata.client()
+    # Every lookup after the first is served from memory, the recording has one response each.
+    for _ in range(3):
+        event = client.get_event(" Core_Config_Updated ")
+        assert event is not None and event.listener_count == 2
+        assert client.get_event("missing") is None
+        assert client.get_components() == ("api", "sun")
+        assert client.get_config()["state"] == "RUNNING"
+    # Changing the returned config does not change the snapshot.
+    client.get_config()["state"] = "STOPPED"
+    assert client.get_config()["state"] == "RUNNING"
+
+
+async def test_async_metadata_snapshot(metadata: Traffic) -> None:
+    client = metadata.async_client()
+    for _ in range(3):
+        assert await client.async_get_event("core_config_updated") is not None
+        assert await client.async_get_components() == ("api", "sun")
+        assert (await client.async_get_config())["state"] == "RUNNING"
+    (await client.async_get_config())["state"] = "STOPPED"
+    assert client.metadata.config["state"] == "RUNNING"
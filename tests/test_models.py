@@ -1,10 +1,12 @@
 """Module that tests model methods."""
 import copy
+import json
 from datetime import datetime
 
 import pytest
 
-from homeassistant_api import Client
+from homeassistant_api import Client, Domain
+from homeassistant_api.models.lazy import LazyDict
 from homeassistant_api.models.states import State
 
 
@@ -91,6 +93,60 @@ async def test_async_get_domains(async_cached_client: Client) -> None:
         assert notify.thisservicedoesnotexistplease
 
 
+async def test_service_call_follows_client_mode() -> None:
+    client = Client("http://localhost:8123/api", "token", cache_session=False)
+    client.trigger_service = lambda domain, service, **_: (domain, service)  # type: ignore
+    light = Domain.from_json({"domain": "light", "services": {"toggle": {}}}, client=client)
+    # A sync client triggers synchronously, even when called from a coroutine.
+    assert light.toggle(entity_id="light.kitchen") == ("light", "toggle")
+
+
+def test_lazy_entities() -> None:
+    client = Client("http://localhost:8123/api", "token", cache_session=False)
+    entities = client.prepare_entities(
+        [
+            {"entity_id": "sun.sun", "state": "above_horizon"},
+            {"entity_id": "light.kitchen", "state": "on"},
+            {"entity_id": "light.hallway", "state": "off"},
+        ]
+    )
+    assert list(entities) == ["sun", "light"] and entities.built == 0
+    light = entities["light"]
+    assert entities.built == 1 and light.entities.built == 0
+    assert light.kitchen.state.state == "on"
+    assert light.entities.built == 1 and "hallway" in light.entities
+    assert light.model_dump()["entities"]["hallway"]["state"]["state"] == "off"
+    with pytest.raises(AttributeError):
+        assert light.thislightdoesnotexistplease
+
+
+def make_lazy() -> LazyDict[str, str]:
+    return LazyDict({"a": 1, "b": 2}, lambda key, raw: f"{key}{raw}")
+
+
+def test_lazy_dict_methods() -> None:
+    lazy = make_lazy()
+    lazy.update({"a": "new"}, c="c3")
+    assert list(lazy) == ["a", "c", "b"] and len(lazy) == 3
+    assert lazy.setdefault("b", "default") == "b2"
+    assert lazy.pop("a") == "new" and "a" not in lazy
+    lazy.clear()
+    assert len(lazy) == 0 and "b" not in lazy and lazy == {}
+
+    lazy = make_lazy()
+    assert lazy.popitem() == ("a", "a1") and lazy.popitem() == ("b", "b2")
+    assert make_lazy() | {"c": "c3"} == {"a": "a1", "b": "b2", "c": "c3"}
+    assert {"c": "c3"} | make_lazy() == {"c": "c3", "a": "a1", "b": "b2"}
+    lazy = make_lazy()
+    lazy |= {"a": "new"}
+    assert lazy == {"a": "new", "b": "b2"} and not lazy != {"a": "new", "b": "b2"}
+    assert make_lazy() != {"a": "a1"}
+    assert json.dumps(make_lazy().copy()) == '{"a": "a1", "b": "b2"}'
+    with pytest.raises(TypeError):
+        json.dumps(make_lazy())  # Not silently empty like a dict subclass.
+    assert repr(make_lazy()) == "{'a': 'a1', 'b': 'b2'}"
+
+
 def test_entity_get_history(cached_client: Client) -> None:
     entity = cached_client.get_entity(group_id="sun", slug="sun")
     assert entity is not None
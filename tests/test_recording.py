@@ -0,0 +1,94 @@
+"""Module for testing recording traffic and replaying it offline."""
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from conftest import API_URL, Traffic
+
+from homeassistant_api import Client, Recorder, Recording, ReplayMissError, State
+
+# The recording is gzip compressed to cover compressed files as well.
+pytestmark = pytest.mark.parametrize("traffic", ["traffic.jsonl.gz"], indirect=True)
+STATES = [
+    {
+        "entity_id": "sun.sun",
+        "state": "above_horizon",
+        "attributes": {"friendly_name": "Sun"},
+        "last_changed": "2023-03-11T22:41:05.183036+00:00",
+        "last_updated": "2023-03-11T22:41:05.183036+00:00",
+        "context": {"id": "01GV8HGYVAW3TEEX5V0Q1ZT7MQ"},
+    },
+    {
+        "entity_id": "person.test_user",
+        "state": "unknown",
+        "attributes": {},
+        "last_changed": "2023-03-11T22:41:05.183036+00:00",
+        "last_updated": "2023-03-11T22:41:05.183036+00:00",
+    },
+]
+
+
+@pytest.fixture(name="session")
+def session_fixture(traffic: Traffic) -> Traffic:
+    """Writes a small recording of a Home Assistant session to disk."""
+    traffic.add("", {"message": "API running."})
+    traffic.add("states", STATES)
+    traffic.add("template", "2", template="{{ states | count }}")
+    assert traffic.path.endswith(".gz")
+    return traffic
+
+
+def test_replay_session(session: Traffic) -> None:
+    client = session.client()
+    states = client.get_states()
+    assert [state.entity_id for state in states] == ["sun.sun", "person.test_user"]
+    assert client.get_rendered_template("{{ states | count }}") == "2"
+    with pytest.raises(ReplayMissError):
+        client.get_states()
+
+
+def test_record_replayed_traffic(session: Traffic, tmp_path: Path) -> None:
+    path = str(tmp_path / "rerecorded.jsonl")
+    with Client(
+        API_URL,
+        "token",
+        cache_session=session.session(loop=True),
+        record_to=path,
+    ) as client:
+        client.get_states()
+        client.get_states()
+    recording = Recording(path)
+    assert len(recording) == 3
+    assert all(exchange.status == 200 for exchange in recording)
+    assert "authorization" not in json.dumps([exchange.to_json() for exchange in recording])
+    assert [
+        State.from_json(state).entity_id
+        for state in json.loads(recording.match("GET", f"{API_URL}/states").body)
+    ] == ["sun.sun", "person.test_user"]
+
+
+async def test_async_replay_session(session: Traffic) -> None:
+    client = session.async_client()
+    states = await client.async_get_states()
+    assert [state.entity_id for state in states] == ["sun.sun", "person.test_user"]
+    assert await client.async_get_rendered_template("{{ states | count }}") == "2"
+    with pytest.raises(ReplayMissError):
+        await client.async_get_states()
+
+
+def test_realtime_replay(traffic: Traffic) -> None:
+    traffic.add("states", STATES)
+    time.sleep(0.2)
+    traffic.add("", {"message": "API running."})
+    client = Client(API_URL, "token", cache_session=traffic.session(realtime=True))
+    started = time.perf_counter()
+    client.get_states()
+    assert time.perf_counter() - started < 0.15
+    # The second response was recorded 0.2 seconds after the first and is replayed as late.
+    client.request("")
+    assert time.perf_counter() - started >= 0.2
+    # A new recording at the same path replaces the old one.
+    Recorder(traffic.path).close()
+    assert len(Recording(traffic.path)) == 0
@@ -0,0 +1,89 @@
+"""Module for testing the client-side service registry."""
+
+import pytest
+
+from homeassistant_api import Client, MalformedInputError
+
+SERVICES = [
+    {
+        "domain": "light",
+        "services": {
+            "turn_on": {
+                "name": "Turn on",
+                "fields": {
+                    "brightness_pct": {"selector": {"number": {"min": 0, "max": 100}}},
+                    "effect": {"selector": {"select": {"options": ["colorloop", "random"]}}},
+                },
+                "target": {"entity": {"domain": "light"}},
+            },
+        },
+    },
+    {
+        "domain": "notify",
+        "services": {
+            "persistent_notification": {
+                "fields": {
+                    "message": {"required": True, "selector": {"text": None}},
+                    "title": {"selector": {"text": None}},
+                },
+            },
+        },
+    },
+]
+
+
+@pytest.fixture(name="client")
+def client_fixture() -> Client:
+    """A client whose service registry is loaded without a server."""
+    client = Client("http://localhost:8123/api", "token", cache_session=False)
+    client.service_registry.update(SERVICES)
+    return client
+
+
+def test_registry_lookup(client: Client) -> None:
+    light = client.get_domain("light")  # Served from the registry, no request.
+    assert light is not None
+    assert light.turn_on.target == {"entity": {"domain": "light"}}
+    assert client.service_registry.get_service("notify", "persistent_notification")
+    assert client.service_registry.get_service("notify", "missing") is None
+
+
+def test_registry_validation(client: Client) -> None:
+    registry = client.service_registry
+    registry.validate("light", "turn_on", {"entity_id": "light.a", "brightness_pct": 50})
+    registry.validate("notify", "persistent_notification", {"message": "Hi"})
+    registry.validate("unknown", "service", {"anything": True})
+    # Selectors only describe the UI, so values are not checked against them by default.
+    registry.validate("light", "turn_on", {"brightness_pct": 150, "effect": "strobe"})
+    for domain, service, data in (
+        ("notify", "persistent_notification", {"title": "No message"}),
+        ("notify", "persistent_notification", {"message": "Hi", "colour": "red"}),
+    ):
+        with pytest.raises(MalformedInputError):
+            registry.validate(domain, service, data)
+    with pytest.raises(MalformedInputError):
+        client.trigger_service("notify", "persistent_notification", title="No message")
+
+
+def test_registry_value_checks() -> None:
+    client = Client(
+        "http://localhost:8123/api", "token", cache_session=False, check_service_values=True
+    )
+    registry = client.service_registry
+    registry.update(SERVICES)
+    registry.validate("light", "turn_on", {"brightness_pct": "50", "effect": "random"})
+    for data in ({"brightness_pct": 150}, {"brightness_pct": "bright"}, {"effect": "strobe"}):
+        with pytest.raises(MalformedInputError):
+            registry.validate("light", "turn_on", data)
+
+
+def test_registry_incremental_update(client: Client) -> None:
+    registry = client.service_registry
+    light, notify = registry.get_domain("light"), registry.get_domain("notify")
+    changed = [SERVICES[0], {"domain": "notify", "services": {}}]
+    registry.update(changed)
+    assert registry.get_domain("light") is light
+    assert registry.get_domain("notify") is not notify
+    registry.update(SERVICES[:1])
+    assert "notify" not in registry
+
@@ -0,0 +1,39 @@
+"""Module for testing the client-level response cache shared by sync and async requests."""
+from conftest import Traffic
+
+from homeassistant_api.responsecache import ResponseCache
+
+
+async def test_sync_response_serves_async(states: Traffic) -> None:
+    # Only one response is recorded, so the second request has to be answered from the cache.
+    client = states.client(
+        async_cache_session=states.async_session(), response_cache_ttl=60
+    )
+    states = client.get_states()
+    assert [state.state for state in await client.async_get_states()] == [
+        state.state for state in states
+    ]
+    assert client.response_cache.hits == 1
+
+
+async def test_async_response_serves_sync(states: Traffic) -> None:
+    client = states.async_client(cache_session=states.session(), response_cache_ttl=60)
+    assert "cache_session" not in vars(client)
+    states = await client.async_get_states()
+    assert client.get_states()[0].state == states[0].state
+    assert client.response_cache.hits == 1
+
+
+def test_keys_and_invalidation() -> None:
+    cache = ResponseCache(ttl=60)
+    assert cache.key("states/", "b=2&a=1") == cache.key("/states", {"a": 1, "b": "2"})
+    key, cached = cache.lookup("GET", "states", {"a": 1})
+    assert key is not None and cached is None
+    cache.store(key, ["state"])
+    assert cache.lookup("get", "states", "a=1") == (key, ["state"])
+    # Rendering a template changes nothing, calling a service may change any response.
+    assert cache.lookup("POST", "template") == (None, None)
+    assert len(cache) == 1
+    assert cache.lookup("POST", "services/light/turn_on") == (None, None)
+    assert len(cache) == 0
+    assert not ResponseCache().lookup("GET", "states")[0]
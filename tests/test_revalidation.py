@@ -0,0 +1,59 @@
+"""Module for testing stale-while-revalidate reads."""
+import asyncio
+import time
+
+from conftest import Traffic
+
+from homeassistant_api.revalidation import Revalidator
+
+POWER = [[{"entity_id": "sensor.power", "state": state}] for state in ("1", "2")]
+
+
+def test_get_states_stale_while_revalidate(traffic: Traffic) -> None:
+    client = traffic.add("states", *POWER).client(revalidate_after=0.05, stale_grace=10)
+    assert client.data_age("states") is None
+    assert client.get_states()[0].state == "1"
+    assert client.get_entities()["sensor"].power.state.state == "1"
+    time.sleep(0.1)
+    # Stale, so the old states are served while the new ones are fetched on a thread.
+    assert client.get_states()[0].state == "1"
+    age = client.data_age("states")
+    assert age is not None and age >= 0.1
+    client.revalidator.wait()
+    assert client.get_states()[0].state == "2"
+    age = client.data_age("states")
+    assert age is not None and age < 0.1
+
+
+def test_refresh_skips_http_cache(traffic: Traffic) -> None:
+    client = traffic.add("states", *POWER).cached_client(
+        revalidate_after=0.05, stale_grace=10
+    )
+    assert client.get_states()[0].state == "1"
+    time.sleep(0.1)
+    client.get_states()
+    client.revalidator.wait()
+    # The session still holds the first response, the refresh has to download the states again.
+    assert client.get_states()[0].state == "2"
+
+
+async def test_async_revalidator() -> None:
+    fetches = []
+
+    async def fetch(refresh: bool) -> int:
+        assert refresh
+        fetches.append(None)
+        return len(fetches)
+
+    revalidator = Revalidator(ttl=0.05, grace=0.2)
+    assert await revalidator.async_get("states", fetch) == 1
+    assert await revalidator.async_get("states", fetch) == 1
+    await asyncio.sleep(0.1)
+    assert await revalidator.async_get("states", fetch) == 1
+    # Only one refresh is started however often the stale response is read.
+    assert await revalidator.async_get("states", fetch) == 1
+    await asyncio.gather(*revalidator.refreshes())
+    assert await revalidator.async_get("states", fetch) == 2
+    await asyncio.sleep(0.3)
+    # Past the grace period the read waits for a new response.
+    assert await revalidator.async_get("states", fetch) == 3
@@ -0,0 +1,55 @@
+"""Module for testing the multi-rate poll scheduler."""
+from conftest import Traffic
+
+from homeassistant_api import PollScheduler
+
+SUN = {
+    "entity_id": "sun.sun",
+    "state": "above_horizon",
+    "last_updated": "2023-03-11T22:41:05+00:00",
+    "context": {"id": "a"},
+}
+KITCHEN = {
+    "entity_id": "light.kitchen",
+    "state": "on",
+    "last_updated": "2023-03-11T22:41:05+00:00",
+    "context": {"id": "b"},
+}
+
+
+async def test_poll_scheduler(traffic: Traffic) -> None:
+    traffic.add("states", [SUN, KITCHEN])
+    traffic.add("states/sun.sun", SUN)
+    scheduler = PollScheduler(traffic.async_client())
+    delivered = []
+
+    async def on_lights(states) -> None:
+        delivered.extend(state.entity_id for state in states)
+
+    sun = scheduler.register("sun.sun", 60, lambda states: delivered.extend(s.entity_id for s in states))
+    scheduler.register("light.*", 10, on_lights)
+
+    # Both are due, the glob needs /api/states which then serves the sun as well.
+    assert len(await scheduler.poll()) == 2
+    assert scheduler.requests == 1 and scheduler.merged_polls == 1
+    assert sorted(delivered) == ["light.kitchen", "sun.sun"]
+    assert await scheduler.poll() == []
+
+    # A single due entity is fetched on its own, and is not delivered again if it did not change.
+    sun.next_due = 0
+    assert await scheduler.poll() == [sun]
+    assert scheduler.requests == 2 and scheduler.merged_polls == 1
+    assert len(delivered) == 2
+
+
+async def test_poll_scheduler_skips_cache(traffic: Traffic) -> None:
+    for state in ("above_horizon", "below_horizon"):
+        traffic.add("states/sun.sun", {**SUN, "state": state, "context": {"id": state}})
+    scheduler = PollScheduler(traffic.async_client(response_cache_ttl=60))
+    delivered = []
+    sun = scheduler.register("sun.sun", 60, lambda states: delivered.extend(s.state for s in states))
+    await scheduler.poll()
+    sun.next_due = 0
+    # The client would answer the second poll from its response cache.
+    await scheduler.poll()
+    assert delivered == ["above_horizon", "below_horizon"]
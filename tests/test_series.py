@@ -0,0 +1,80 @@
+"""Module for testing numeric history reductions."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from homeassistant_api import History, State, align_histories
+from homeassistant_api.series import aggregate
+
+np = pytest.importorskip("numpy")
+
+START = datetime(2023, 3, 11, tzinfo=timezone.utc)
+
+
+def make_history(entity_id: str, *samples) -> History:
+    return History(
+        states=tuple(
+            State(
+                entity_id=entity_id,
+                state=state,
+                last_changed=START + timedelta(seconds=seconds),
+                last_updated=START + timedelta(seconds=seconds),
+            )
+            for seconds, state in samples
+        )
+    )
+
+
+def test_history_aggregate() -> None:
+    history = make_history(
+        "sensor.power", (0, "1"), (10, "unavailable"), (20, "3"), (30, "5")
+    )
+    result = history.aggregate(20, end=START.timestamp() + 40)
+    assert list(result["time"] - START.timestamp()) == [0, 20]
+    assert list(result["count"]) == [1, 2]
+    assert list(result["min"]) == [1, 3] and list(result["max"]) == [1, 5]
+    assert list(result["last"]) == [1, 5]
+    # 1 is held for 10 seconds before becoming unavailable, which does not count.
+    assert list(result["time_weighted"]) == [1, 4]
+
+
+def test_aggregate_last_sample_on_edge() -> None:
+    timestamps = np.array([0.0, 5, 10, 15, 20])
+    result = aggregate(timestamps, np.array([1.0, 2, 3, 4, 100]), 10)
+    assert list(result["time"]) == [0, 10, 20]
+    assert list(result["count"]) == [2, 2, 1]
+    assert list(result["max"]) == [2, 4, 100] and list(result["last"]) == [2, 4, 100]
+    # An explicit end is exclusive.
+    assert list(aggregate(timestamps, np.ones(5), 10, end=20)["count"]) == [2, 2]
+
+
+def test_history_downsample() -> None:
+    samples = [(i, str(float(i % 50))) for i in range(1000)]
+    samples[500] = (500, "1000")  # A peak that must survive downsampling.
+    timestamps, values = make_history("sensor.power", *samples).downsample(50)
+    assert len(values) == 50 and 1000 in values
+    assert timestamps[0] == START.timestamp() and np.all(np.diff(timestamps) > 0)
+
+
+def test_align_histories() -> None:
+    power = make_history("sensor.power", (0, "1"), (20, "unavailable"), (30, "3"))
+    temperature = make_history("sensor.temperature", (5, "20"), (25, "22"))
+    t0 = START.timestamp()
+
+    aligned = align_histories([power, temperature], 10, end=t0 + 40)
+    assert aligned.entity_ids == ("sensor.power", "sensor.temperature")
+    assert list(aligned.timestamps - t0) == [0, 10, 20, 30, 40]
+    assert aligned.values.tolist() == [
+        [1, 1, None, 3, 3],
+        [None, 20, 20, 22, 22],
+    ]
+
+    aligned = align_histories([power, temperature], 10, fill="none", end=t0 + 40)
+    assert aligned.values.tolist() == [
+        [1, None, None, 3, None],
+        [None, 20, None, 22, None],
+    ]
+
+    aligned = align_histories([temperature], 5, fill="interpolate")
+    assert list(aligned.timestamps - t0) == [5, 10, 15, 20, 25]
+    assert aligned.values.tolist() == [[20, 20.5, 21, 21.5, 22]]
@@ -0,0 +1,120 @@
+"""Module for testing the cross-process SQLite response cache."""
+import multiprocessing
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+import pytest
+from conftest import Traffic
+from requests_cache import CachedResponse
+
+from homeassistant_api import ReplayMissError
+from homeassistant_api.asyncsharedcache import AsyncSharedCache, AsyncSharedCachedSession
+from homeassistant_api.sharedcache import SharedCache
+from homeassistant_api.sharedstore import SharedStore
+
+
+def stale() -> CachedResponse:
+    return CachedResponse(status_code=200, expires=datetime(2000, 1, 1, tzinfo=timezone.utc))
+
+
+def _acquire(path: str, results) -> None:
+    results.put(SharedStore(path).acquire("states"))
+
+
+def test_single_flight_across_processes(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    SharedStore(path)
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_acquire, args=(path, results)) for _ in range(8)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert sorted(results.get() for _ in workers) == [False] * 7 + [True]
+
+
+def test_waiters_get_the_refreshed_response(tmp_path: Path) -> None:
+    cache = SharedCache(str(tmp_path / "cache.sqlite"), lock_timeout=5)
+    cache.responses["key"] = stale()
+    holding = threading.Event()
+
+    def refresh() -> None:
+        # Another worker finds the expired response first, so it takes the lock and fetches.
+        cache.responses["key"]
+        holding.set()
+        time.sleep(0.2)
+        cache.responses["key"] = CachedResponse(status_code=203)
+
+    thread = threading.Thread(target=refresh)
+    thread.start()
+    holding.wait()
+    assert cache.responses["key"].status_code == 203
+    thread.join()
+
+    cache.responses.serve_stale = True
+    cache.responses["other"] = stale()
+    thread = threading.Thread(target=lambda: cache.responses["other"])
+    thread.start()
+    thread.join()
+    assert cache.responses["other"].expires is None
+
+
+def test_shared_between_sessions(states: Traffic, tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    # Only one response is recorded, the second worker has to read it from the shared file.
+    workers = [states.cached_client(shared_cache=path) for _ in range(2)]
+    first, second = (
+        client.cache_session.get(client.endpoint("states")) for client in workers
+    )
+    assert not first.from_cache and second.from_cache  # type: ignore[attr-defined]
+    assert first.json() == second.json()
+
+
+async def test_async_shared_cache(tmp_path: Path) -> None:
+    cache = AsyncSharedCache(str(tmp_path / "cache.sqlite"))
+    await cache.responses.write("key", {"body": "value"})
+    assert await cache.responses.read("key") == {"body": "value"}
+    assert await cache.responses.read("missing") is None
+    assert await cache.responses.size() == 1
+    # Sync and async responses live in separate tables of the same file.
+    assert len(SharedCache(str(tmp_path / "cache.sqlite")).responses) == 0
+
+
+def test_uncached_responses_release_the_lock(traffic: Traffic, tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    traffic.add("states/sensor.missing", {"message": "Entity not found."}, status=404)
+    traffic.add("states", "Bad gateway", status=502)
+    client = traffic.cached_client(shared_cache=path)
+    for endpoint in ("states/sensor.missing", "states"):
+        assert client.cache_session.get(client.endpoint(endpoint)).status_code >= 400
+    with pytest.raises(ReplayMissError):
+        client.cache_session.get(client.endpoint("config"))
+    # Neither response was stored, so another worker must not wait for the locks.
+    assert SharedStore(path).count("locks") == 0
+
+
+async def test_async_failed_request_releases_the_lock(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    async with AsyncSharedCachedSession(cache=AsyncSharedCache(path)) as session:
+        with pytest.raises(aiohttp.ClientError):
+            await session.get("http://127.0.0.1:1/api/states")
+    assert SharedStore(path).count("locks") == 0
+
+
+def test_acquire_busy_timeout(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite")
+    store = SharedStore(path)
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    started = time.time()
+    # The async storage gives up quickly instead of blocking the event loop while another process writes.
+    assert not store.acquire("key", busy_timeout=0.05)
+    assert time.time() - started < 1
+    writer.execute("COMMIT")
+    assert store.acquire("key")
@@ -0,0 +1,72 @@
+"""Module for testing batched template rendering and template projections."""
+import json
+from typing import Any, Dict
+
+import pytest
+import requests
+from conftest import API_URL, Traffic
+
+from homeassistant_api import Client
+from homeassistant_api.errors import RequestTimeoutError
+from homeassistant_api.projection import prepare_projection
+from homeassistant_api.templates import combine_templates
+
+GOOD = "{{ states('sun.sun') }}"
+BAD = "{{ states('sun.sun') }"
+OTHER = "{{ 1 + 1 }}"
+
+
+def test_render_templates(traffic: Traffic) -> None:
+    outputs: Dict[str, str] = {"0": "above_horizon", "1": "2"}
+    for template, status, body in (
+        (combine_templates([GOOD, OTHER]), 200, json.dumps(outputs)),
+        # The bad template fails the batch, which is split until it is isolated.
+        (combine_templates([GOOD, BAD, OTHER]), 400, "Error rendering template"),
+        (GOOD, 200, "above_horizon"),
+        (combine_templates([BAD, OTHER]), 400, "Error rendering template"),
+        (BAD, 400, "Error rendering template"),
+        (OTHER, 200, "2"),
+    ):
+        traffic.add("template", body, status=status, template=template)
+    client = traffic.client(template_cache_ttl=60)
+    results = client.render_templates({"sun": GOOD, "sum": OTHER, "again": GOOD})
+    assert results == {"sun": "above_horizon", "sum": "2", "again": "above_horizon"}
+    assert not results.errors
+
+    client.template_cache.clear()
+    results = client.render_templates({"sun": GOOD, "bad": BAD, "sum": OTHER})
+    assert results == {"sun": "above_horizon", "sum": "2"}
+    assert list(results.errors) == ["bad"]
+
+    # Served from the cache, the recording has no more responses.
+    assert client.render_templates({"sum": OTHER}) == {"sum": "2"}
+
+
+class TimeoutSession(requests.Session):
+    def __init__(self) -> None:
+        super().__init__()
+        self.requests = 0
+
+    def request(self, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+        self.requests += 1
+        raise requests.exceptions.Timeout()
+
+
+def test_render_templates_timeout() -> None:
+    session = TimeoutSession()
+    client = Client(API_URL, "token", cache_session=session)
+    # A timeout says nothing about the templates, so the batch is not split to find a bad one.
+    with pytest.raises(RequestTimeoutError):
+        client.render_templates({"sun": GOOD, "bad": BAD, "sum": OTHER})
+    assert session.requests == 1
+
+
+def test_query_states(traffic: Traffic) -> None:
+    template, _ = prepare_projection("sensor.*_power", ["state", "unit_of_measurement"])
+    assert "states.sensor |" in template  # Only the sensor domain is searched.
+    rows = [["sensor.oven_power", "2000", "W"], ["sensor.tv_power", "80", "W"]]
+    traffic.add("template", json.dumps(rows), template=template)
+    assert traffic.client().query_states("sensor.*_power", ["state", "unit_of_measurement"]) == (
+        {"entity_id": "sensor.oven_power", "state": "2000", "unit_of_measurement": "W"},
+        {"entity_id": "sensor.tv_power", "state": "80", "unit_of_measurement": "W"},
+    )
@@ -0,0 +1,49 @@
+"""Module for testing merged timelines."""
+from datetime import datetime, timedelta, timezone
+
+from homeassistant_api import History, LogbookEntry, State, merge_timeline
+
+START = datetime(2023, 3, 11, tzinfo=timezone.utc)
+
+
+def make_history(entity_id: str, *seconds: int) -> History:
+    return History(
+        states=tuple(
+            State(
+                entity_id=entity_id,
+                state=str(second),
+                last_changed=START + timedelta(seconds=second),
+            )
+            for second in seconds
+        )
+    )
+
+
+def test_merge_timeline() -> None:
+    logbook = (
+        LogbookEntry(when=START + timedelta(seconds=second), name=f"log {second}")
+        for second in (5, 25)
+    )
+
+    def windows():
+        # Two get_entity_histories calls for consecutive windows, chained together.
+        yield make_history("binary_sensor.door", 0, 10)
+        yield make_history("alarm_control_panel.home", 3)
+        yield make_history("binary_sensor.door", 20, 30)
+        yield make_history("alarm_control_panel.home", 21)
+
+    merged = merge_timeline(windows(), logbook, make_history("light.hall", 7))
+    assert [
+        item.name if isinstance(item, LogbookEntry) else f"{item.entity_id} {item.state}"
+        for item in merged
+    ] == [
+        "binary_sensor.door 0",
+        "alarm_control_panel.home 3",
+        "log 5",
+        "light.hall 7",
+        "binary_sensor.door 10",
+        "binary_sensor.door 20",
+        "alarm_control_panel.home 21",
+        "log 25",
+        "binary_sensor.door 30",
+    ]